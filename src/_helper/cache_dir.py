@@ -0,0 +1,21 @@
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the directory for the caches of the log checker.
+
+    ``LMU_CACHE_DIR`` overrides the default, which is ``%LOCALAPPDATA%`` on
+    Windows and ``~/.cache`` elsewhere.
+
+    Returns:
+        Path: The cache directory (not necessarily existing yet).
+    """
+    override = os.environ.get("LMU_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "lmu_log_checker"
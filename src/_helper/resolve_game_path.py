@@ -1,20 +1,85 @@
 from __future__ import annotations
 
+import json
 import os
-import re
+import tempfile
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import (
+    Callable,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
-import psutil
+from .cache_dir import default_cache_dir
+from .vdf import find_key, parse_vdf
 
+T = TypeVar("T")
+R = TypeVar("R")
 
+GAME_DIR_NAME = "Le Mans Ultimate"
+
+# Le Mans Ultimate's Steam app id, the key of its entry in a library's apps map.
+LMU_APP_ID = "2399420"
+
+# Seconds a single filesystem probe may take before its path is skipped, e.g.
+# a sleeping disk or an unreachable network share.
+PROBE_TIMEOUT = 2.0
+
+# Where the last found game root is remembered between runs.
+GAME_ROOT_CACHE_FILE = "game_root.json"
+
+
+class SteamLibrary(NamedTuple):
+    """
+    A Steam library folder.
+
+    Attributes:
+        path (Path): The library directory, which contains ``steamapps``.
+        apps (FrozenSet[str]): The app ids installed in it; empty if unknown.
+    """
+
+    path: Path
+    apps: FrozenSet[str]
+
+
+@lru_cache(maxsize=None)
 def resolve_path() -> Path:
+    """
+    Locates the LMU install directory.
+
+    The root found by an earlier run is confirmed first, so usually only one
+    path is touched. Otherwise the library whose apps map lists LMU_APP_ID
+    is looked up in Steam's libraryfolders.vdf; only if none does are all
+    libraries and drives probed concurrently, each probe limited to
+    PROBE_TIMEOUT seconds, and the result is stored for the next run.
+    Within a process the result is memoized; ``resolve_path.cache_clear()``
+    forces a new search.
+
+    Returns:
+        Path: The game directory.
+
+    Raises:
+        FileNotFoundError: If the game could not be found.
+    """
+    game_root = _read_cached_game_root()
+    if game_root is not None:
+        return game_root
+
     game_root = _resolve_game_root()
     if game_root is None:
         raise FileNotFoundError(
             "Could not locate 'Le Mans Ultimate' in any Steam library. "
             "Set TRACE_PATH or DIRECT_INPUT in .env if auto-detection fails."
         )
+    _write_cached_game_root(game_root)
     return game_root
 
 
@@ -65,28 +130,48 @@ def resolve_direct_input_path() -> Path:
 
 
 def _resolve_game_root() -> Path | None:
-    for library_path in _iter_library_paths():
-        game_dir = library_path / "steamapps" / "common" / "Le Mans Ultimate"
-        if game_dir.is_dir():
+    drive_roots = list(_iter_drive_roots())
+    steam_roots = list(_iter_candidate_steam_roots(drive_roots))
+    libraries = [
+        library
+        for found in _probe_all(_read_libraries, steam_roots)
+        for library in found or []
+    ]
+
+    # Steam lists the installed apps of every library: go straight to the
+    # one that has LMU and confirm the directory named in its app manifest.
+    indexed = [library.path for library in libraries if LMU_APP_ID in library.apps]
+    for game_dir in _probe_all(_installed_game_dir, indexed):
+        if game_dir is not None:
             return game_dir
-    return None
 
+    # Libraries from old libraryfolders.vdf files (no apps map) or missing
+    # from it: probe the usual directory in every candidate.
+    game_dirs = [
+        library_path / "steamapps" / "common" / GAME_DIR_NAME
+        for library_path in _iter_library_paths(steam_roots, libraries, drive_roots)
+    ]
+    # The first hit in candidate order wins, as with a sequential search.
+    for game_dir, found in zip(game_dirs, _probe_all(_is_dir, game_dirs)):
+        if found:
+            return game_dir
+    return None
 
-def _iter_library_paths() -> Iterable[Path]:
-    candidates: List[Path] = []
 
-    for steam_root in _iter_candidate_steam_roots():
-        candidates.append(steam_root)
-        candidates.extend(_read_library_paths(steam_root))
+def _iter_library_paths(
+    steam_roots: List[Path], libraries: List[SteamLibrary], drive_roots: List[Path]
+) -> Iterable[Path]:
+    candidates: List[Path] = list(steam_roots)
+    candidates.extend(library.path for library in libraries)
 
-    for root in _iter_drive_roots():
+    for root in drive_roots:
         for name in ["SteamLibrary", "Steam", "Games"]:
             candidates.append(root / name)
 
     return _unique_paths(candidates)
 
 
-def _iter_candidate_steam_roots() -> Iterable[Path]:
+def _iter_candidate_steam_roots(drive_roots: List[Path]) -> Iterable[Path]:
     roots: List[Path] = []
     env_pf86 = os.environ.get("PROGRAMFILES(X86)")
     env_pf = os.environ.get("PROGRAMFILES")
@@ -98,7 +183,7 @@ def _iter_candidate_steam_roots() -> Iterable[Path]:
 
     roots.append(Path("C:/Steam"))
 
-    for drive_root in _iter_drive_roots():
+    for drive_root in drive_roots:
         roots.append(drive_root / "Steam")
         roots.append(drive_root / "Program Files (x86)" / "Steam")
         roots.append(drive_root / "Program Files" / "Steam")
@@ -107,29 +192,143 @@ def _iter_candidate_steam_roots() -> Iterable[Path]:
 
 
 def _iter_drive_roots() -> Iterable[Path]:
+    # Only needed when the game has to be searched for; keeps imports cheap.
+    import psutil
+
     for partition in psutil.disk_partitions():
         yield Path(partition.mountpoint)
 
 
-_VDF_PATH_RE = re.compile(r'"path"\s+"([^"]+)"', re.IGNORECASE)
-_VDF_NUMERIC_RE = re.compile(r'"\d+"\s+"([^"]+)"')
+def _read_libraries(steam_root: Path) -> List[SteamLibrary]:
+    """
+    Reads the Steam libraries listed in a Steam install's libraryfolders.vdf.
 
+    Current files map every library to ``{"path": ..., "apps": {appid: size}}``;
+    old ones map it straight to its path and list no apps.
 
-def _read_library_paths(steam_root: Path) -> List[Path]:
+    Args:
+        steam_root (Path): The Steam install directory.
+
+    Returns:
+        List[SteamLibrary]: The libraries; empty if the file is missing or invalid.
+    """
     library_file = steam_root / "steamapps" / "libraryfolders.vdf"
     if not library_file.is_file():
         return []
 
-    text = library_file.read_text(encoding="utf-8", errors="ignore")
-    paths: List[Path] = []
-    for line in text.splitlines():
-        match = _VDF_PATH_RE.search(line) or _VDF_NUMERIC_RE.search(line)
-        if not match:
-            continue
-        raw = match.group(1).replace("\\\\", "\\")
-        if raw:
-            paths.append(Path(raw))
-    return paths
+    try:
+        data = parse_vdf(library_file.read_text(encoding="utf-8", errors="ignore"))
+    except ValueError:
+        return []
+    folders = find_key(data, "libraryfolders")
+    if not isinstance(folders, dict):
+        return []
+
+    libraries: List[SteamLibrary] = []
+    for key, value in folders.items():
+        if not key.isdigit():
+            continue  # e.g. "TimeNextStatsReport" in old files.
+        path = value if isinstance(value, str) else find_key(value, "path")
+        apps = find_key(value, "apps")
+        if isinstance(path, str) and path:
+            app_ids = frozenset(apps) if isinstance(apps, dict) else frozenset()
+            libraries.append(SteamLibrary(Path(path), app_ids))
+    return libraries
+
+
+def _installed_game_dir(library_path: Path) -> Path | None:
+    # The install directory comes from the app manifest; it is only missing
+    # for broken installs, where the default name is still worth a try.
+    manifest = library_path / "steamapps" / f"appmanifest_{LMU_APP_ID}.acf"
+    install_dir: object = None
+    try:
+        state = parse_vdf(manifest.read_text(encoding="utf-8", errors="ignore"))
+        install_dir = find_key(state, "AppState", "installdir")
+    except (OSError, ValueError):
+        pass
+    if not isinstance(install_dir, str) or not install_dir:
+        install_dir = GAME_DIR_NAME
+
+    game_dir = library_path / "steamapps" / "common" / install_dir
+    return game_dir if game_dir.is_dir() else None
+
+
+def _is_dir(path: Path) -> bool:
+    return path.is_dir()
+
+
+def _probe_all(
+    probe: Callable[[T], R], items: Sequence[T], timeout: Optional[float] = None
+) -> List[Optional[R]]:
+    # Runs probe(item) for all items at once, one daemon thread each: a
+    # blocked filesystem call cannot be cancelled, but a daemon thread does
+    # not keep the process alive. Probes that fail or are still running
+    # after the timeout yield None.
+    timeout = PROBE_TIMEOUT if timeout is None else timeout
+    results: List[Optional[R]] = [None] * len(items)
+
+    def run(index: int, item: T) -> None:
+        try:
+            results[index] = probe(item)
+        except OSError:
+            pass
+
+    threads = [
+        threading.Thread(target=run, args=(index, item), daemon=True)
+        for index, item in enumerate(items)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return [
+        result if not thread.is_alive() else None
+        for result, thread in zip(results, threads)
+    ]
+
+
+def _game_root_cache_file() -> Path:
+    # Next to the log checker's rule cache.
+    return default_cache_dir() / GAME_ROOT_CACHE_FILE
+
+
+def _read_cached_game_root() -> Path | None:
+    cache_file = _game_root_cache_file()
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        game_root = Path(data["game_root"])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        _unlink_quietly(cache_file)
+        return None
+
+    # The game may have been moved or uninstalled since it was stored.
+    (found,) = _probe_all(_is_dir, [game_root])
+    if not found:
+        _unlink_quietly(cache_file)
+        return None
+    return game_root
+
+
+def _write_cached_game_root(game_root: Path) -> None:
+    cache_file = _game_root_cache_file()
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"game_root": str(game_root)}, file)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        return
+
+
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
 
 
 def _unique_paths(paths: Iterable[Path]) -> List[Path]:
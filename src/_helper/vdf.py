@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+VdfValue = Union[str, Dict[str, Any]]
+
+_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+# Token kinds produced by _tokenize.
+_STRING = "string"
+_OPEN = "{"
+_CLOSE = "}"
+_CONDITION = "condition"
+
+
+def parse_vdf(text: str) -> Dict[str, VdfValue]:
+    """
+    Parses Valve's KeyValues text format (.vdf, .acf).
+
+    Keys and values may be quoted (with ``\\n``, ``\\t``, ``\\\\`` and ``\\"``
+    escapes) or bare words; a value is either a string or a ``{ ... }``
+    block. ``//`` comments and platform conditions such as ``[$WIN32]`` are
+    skipped. A key that appears twice in a block keeps its last value, like
+    Steam does. Keys are case-sensitive here; use ``find_key`` to look them
+    up the way Steam does.
+
+    Args:
+        text (str): The file content.
+
+    Returns:
+        Dict[str, VdfValue]: The top-level keys.
+
+    Raises:
+        ValueError: If the braces do not match or a key has no value.
+    """
+    return _parse_block(_tokenize(text), nested=False)
+
+
+def find_key(node: Any, *keys: str) -> Optional[VdfValue]:
+    """
+    Follows a path of keys, ignoring their case.
+
+    Args:
+        node (Any): A block returned by parse_vdf.
+        *keys (str): The keys to follow, e.g. ``"AppState", "installdir"``.
+
+    Returns:
+        Optional[VdfValue]: The value, or None if a key is missing.
+    """
+    for key in keys:
+        if not isinstance(node, dict):
+            return None
+        if key in node:
+            node = node[key]
+            continue
+        wanted = key.lower()
+        node = next((v for k, v in node.items() if k.lower() == wanted), None)
+    return node
+
+
+def _parse_block(
+    tokens: Iterator[Tuple[str, str, int]], nested: bool
+) -> Dict[str, Any]:
+    block: Dict[str, Any] = {}
+    key: Optional[str] = None
+    key_line = 0
+    for kind, value, line in tokens:
+        if kind == _CONDITION:
+            continue
+        if kind == _CLOSE:
+            if key is not None:
+                raise ValueError(f"Line {key_line}: key {key!r} has no value.")
+            if not nested:
+                raise ValueError(f"Line {line}: unexpected '}}'.")
+            return block
+        if key is None:
+            if kind == _OPEN:
+                raise ValueError(f"Line {line}: a block needs a key.")
+            key, key_line = value, line
+            continue
+        block[key] = _parse_block(tokens, nested=True) if kind == _OPEN else value
+        key = None
+
+    if key is not None:
+        raise ValueError(f"Line {key_line}: key {key!r} has no value.")
+    if nested:
+        raise ValueError("Unexpected end of file: missing '}'.")
+    return block
+
+
+def _tokenize(text: str) -> Iterator[Tuple[str, str, int]]:
+    # Yields (kind, value, line) tuples.
+    position = 0
+    line = 1
+    length = len(text)
+    while position < length:
+        char = text[position]
+        if char == "\n":
+            line += 1
+            position += 1
+        elif char.isspace():
+            position += 1
+        elif text.startswith("//", position):
+            end = text.find("\n", position)
+            position = length if end == -1 else end
+        elif char in "{}":
+            yield (_OPEN if char == "{" else _CLOSE), char, line
+            position += 1
+        elif char == '"':
+            value, position, lines = _read_quoted(text, position + 1, line)
+            yield _STRING, value, line
+            line += lines
+        elif char == "[":
+            end = text.find("]", position)
+            if end == -1:
+                raise ValueError(f"Line {line}: unterminated condition.")
+            yield _CONDITION, text[position : end + 1], line
+            position = end + 1
+        else:
+            start = position
+            while (
+                position < length
+                and not text[position].isspace()
+                and text[position] not in '{}"'
+            ):
+                position += 1
+            yield _STRING, text[start:position], line
+
+
+def _read_quoted(text: str, position: int, line: int) -> Tuple[str, int, int]:
+    # Returns the unescaped string, the position after the closing quote and
+    # the number of newlines inside the string.
+    parts: List[str] = []
+    start = position
+    while True:
+        end = text.find('"', position)
+        backslash = text.find("\\", position, end if end != -1 else len(text))
+        if end == -1:
+            raise ValueError(f"Line {line}: unterminated string.")
+        if backslash == -1:
+            parts.append(text[position:end])
+            return "".join(parts), end + 1, text.count("\n", start, end)
+        parts.append(text[position:backslash])
+        escaped = text[backslash + 1 : backslash + 2]
+        # Unknown escapes are kept verbatim, e.g. in unescaped Windows paths.
+        parts.append(_ESCAPES.get(escaped, "\\" + escaped))
+        position = backslash + 2
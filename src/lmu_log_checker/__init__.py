@@ -1,3 +1,16 @@
-from .core import LogAnalyzer, LogLine, RegexRegistry
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core import LogAnalyzer, LogLine, RegexRegistry
+
+
+def __getattr__(name: str) -> Any:
+    # Loaded on first use, so `import lmu_log_checker` stays cheap.
+    if name in __all__:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["LogAnalyzer", "LogLine", "RegexRegistry"]
@@ -0,0 +1,4 @@
+from .harness import find_regressions, run_benchmarks
+from .synthetic import generate_trace
+
+__all__ = ["find_regressions", "generate_trace", "run_benchmarks"]
@@ -0,0 +1,108 @@
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from lmu_log_checker.bench.harness import (
+    DEFAULT_TOLERANCE,
+    find_regressions,
+    load_baselines,
+    measure_startup,
+    record_baseline,
+    relative_metrics,
+    run_benchmarks,
+)
+from lmu_log_checker.bench.synthetic import generate_trace, parse_size
+
+DEFAULT_BASELINE_PATH = (
+    Path(__file__).resolve().parents[3] / "tests" / "benchmark_baseline.json"
+)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the benchmark suite.
+
+    Args:
+        argv (Optional[List[str]]): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="LMU Log Checker benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic trace.txt.")
+    generate.add_argument("output", type=Path)
+    generate.add_argument("--size", default="1MB", help="e.g. 1MB, 500MB, 4GB")
+    generate.add_argument("--seed", type=int, default=0)
+
+    startup = commands.add_parser(
+        "startup", help="Time the import of the package and the start of the CLIs."
+    )
+    startup.add_argument("--repeats", type=int, default=5)
+
+    run = commands.add_parser("run", help="Measure the analyzer and the CLI.")
+    run.add_argument("--size", default="1MB", help="e.g. 1MB, 500MB, 4GB")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeats", type=int, default=3)
+    run.add_argument("--workdir", type=Path, default=None)
+    run.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    run.add_argument(
+        "--record",
+        action="store_true",
+        help="Store the ratios of the results as the baseline for the size.",
+    )
+    run.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of ``python -m lmu_log_checker.bench``.
+
+    Returns:
+        int: 1 if a metric regressed against the baseline, otherwise 0.
+    """
+    args = parse_args(argv)
+
+    if args.command == "generate":
+        trace = generate_trace(args.output, parse_size(args.size), seed=args.seed)
+        print(f"Wrote {trace.lines} lines ({trace.size} bytes) to {args.output}")
+        return 0
+
+    if args.command == "startup":
+        with tempfile.TemporaryDirectory() as tmp:
+            startup = measure_startup(tmp, repeats=args.repeats)
+        for metric, value in startup.items():
+            print(f"{metric:>19}: {value:,.1f}")
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_benchmarks(
+            parse_size(args.size),
+            args.workdir or tmp,
+            seed=args.seed,
+            repeats=args.repeats,
+        )
+    ratios = relative_metrics(results)
+    for metric, value in {**results, **ratios}.items():
+        print(f"{metric:>22}: {value:,.3f}")
+
+    if args.record:
+        record_baseline(args.baseline, args.size, results)
+        print(f"Recorded baseline for {args.size} in {args.baseline}")
+        return 0
+
+    baseline = load_baselines(args.baseline).get(args.size)
+    if baseline is None:
+        print(f"No baseline for {args.size}; use --record.")
+        return 0
+    regressions = find_regressions(ratios, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
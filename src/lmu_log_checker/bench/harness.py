@@ -0,0 +1,301 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+from lmu_log_checker.bench.synthetic import generate_trace
+from lmu_log_checker.core.log_analyzer import LogAnalyzer
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+PATTERNS_PATH = PACKAGE_DIR / "core" / "patterns.yaml"
+MAIN_PATH = PACKAGE_DIR / "main.py"
+
+# Metric -> command line of the fresh interpreters timed by measure_startup.
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    "startup_python_ms": ["-c", "pass"],
+    "startup_import_ms": ["-c", "import lmu_log_checker"],
+    "startup_cli_ms": [str(MAIN_PATH), "--help"],
+    "startup_debugger_ms": ["-c", "import lmu_settings_debug.main"],
+}
+
+# Ratio metric -> (measured metric, reference metric, factor). Dividing by a
+# reference measured on the same host makes the baseline portable: a faster
+# or slower machine changes both alike.
+RELATIVE_METRICS: Dict[str, Tuple[str, str, float]] = {
+    "analysis_ratio": ("analysis_ms", "reference_ms", 1.0),
+    "load_rules_ratio": ("load_rules_ms", "reference_ms", 1.0),
+    "report_json_ratio": ("report_json_ms", "reference_ms", 1.0),
+    "cli_ratio": ("cli_seconds", "reference_ms", 1e3),
+    "startup_import_ratio": ("startup_import_ms", "startup_python_ms", 1.0),
+    "startup_cli_ratio": ("startup_cli_ms", "startup_python_ms", 1.0),
+    "startup_debugger_ratio": ("startup_debugger_ms", "startup_python_ms", 1.0),
+}
+
+# Metrics where a larger value is better; for all others smaller is better.
+HIGHER_IS_BETTER = frozenset({"lines_per_sec"})
+
+# A metric may be this much worse than its baseline (1.0 = twice as slow).
+DEFAULT_TOLERANCE = 1.0
+
+# Lines processed by the reference workload, about 20ms on a current machine.
+REFERENCE_LINES = 20_000
+
+
+def run_benchmarks(
+    size: int, workdir: Union[str, Path], seed: int = 0, repeats: int = 3
+) -> Dict[str, float]:
+    """
+    Measures the analyzer and the CLI on a synthetic trace of the given size.
+
+    Every timing is the best of ``repeats`` runs. Peak RSS is the high-water
+    mark of the CLI process and is only measured on POSIX systems.
+
+    Args:
+        size (int): Size of the synthetic trace in bytes.
+        workdir (Union[str, Path]): Where the trace and the CLI environment are created.
+        seed (int): Seed of the trace generator.
+        repeats (int): How often every measurement is repeated.
+
+    Returns:
+        Dict[str, float]: lines, reference_ms, load_rules_ms, analysis_ms,
+                          lines_per_sec, report_json_ms, cli_seconds, the metrics of
+                          measure_startup and, on POSIX, peak_rss_mb.
+    """
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    trace_path = workdir / f"trace-{size}-{seed}.txt"
+    trace = generate_trace(trace_path, size, seed=seed)
+    rules_data = yaml.safe_load(PATTERNS_PATH.read_text(encoding="utf-8"))
+
+    results: Dict[str, float] = {"lines": float(trace.lines)}
+    results["reference_ms"] = 1000 * _best_of(repeats, _reference_workload)
+    results["load_rules_ms"] = 1000 * _best_of(
+        repeats, lambda: LogAnalyzer().load_rules(rules_data)
+    )
+
+    def analyze(keep_events: bool) -> LogAnalyzer:
+        analyzer = LogAnalyzer(keep_events=keep_events)
+        analyzer.load_rules(rules_data)
+        analyzer.process_stream(trace_path)
+        return analyzer
+
+    # Like the CLI: events are aggregated, not kept.
+    analysis_seconds = _best_of(repeats, lambda: analyze(keep_events=False))
+    results["analysis_ms"] = 1000 * analysis_seconds
+    results["lines_per_sec"] = trace.lines / analysis_seconds
+
+    analyzer = analyze(keep_events=True)
+    results["report_json_ms"] = 1000 * _best_of(repeats, analyzer.generate_report_json)
+
+    cli_runs = [_run_cli(trace_path, workdir) for _ in range(repeats)]
+    results["cli_seconds"] = min(seconds for seconds, _ in cli_runs)
+    peak_rss = [rss for _, rss in cli_runs if rss is not None]
+    if peak_rss:
+        results["peak_rss_mb"] = min(peak_rss)
+    results.update(measure_startup(workdir, repeats))
+    return results
+
+
+def measure_startup(workdir: Union[str, Path], repeats: int = 3) -> Dict[str, float]:
+    """
+    Measures how long fresh interpreters take to import the package and start the CLIs.
+
+    The environment has neither TRACE_PATH nor DIRECT_INPUT and stdin is
+    closed: a command that resolved the settings on import would scan for
+    the game or prompt for the paths, and fail.
+
+    Args:
+        workdir (Union[str, Path]): The working directory of the interpreters.
+        repeats (int): How often every command is timed.
+
+    Returns:
+        Dict[str, float]: The best wall time in ms per key of STARTUP_COMMANDS;
+                          ``startup_python_ms`` is the bare interpreter for reference.
+    """
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("TRACE_PATH", "DIRECT_INPUT")
+    }
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PACKAGE_DIR.parent), os.environ.get("PYTHONPATH", "")]
+    )
+
+    def start(arguments: List[str]) -> None:
+        process = subprocess.run(
+            [sys.executable, *arguments],
+            env=env,
+            cwd=workdir,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        _check_cli(process.returncode, process.stderr)
+
+    return {
+        metric: 1000 * _best_of(repeats, lambda: start(arguments))
+        for metric, arguments in STARTUP_COMMANDS.items()
+    }
+
+
+def relative_metrics(results: Dict[str, float]) -> Dict[str, float]:
+    """
+    Turns absolute results into the host-independent ratios of RELATIVE_METRICS.
+
+    Args:
+        results (Dict[str, float]): The results of run_benchmarks.
+
+    Returns:
+        Dict[str, float]: The ratios whose inputs were measured.
+    """
+    ratios = {}
+    for name, (metric, reference, factor) in RELATIVE_METRICS.items():
+        value, base = results.get(metric), results.get(reference)
+        if value is not None and base:
+            ratios[name] = value * factor / base
+    return ratios
+
+
+def load_baselines(path: Union[str, Path]) -> Dict[str, Dict[str, float]]:
+    """
+    Reads the recorded baselines.
+
+    Args:
+        path (Union[str, Path]): The baseline JSON file.
+
+    Returns:
+        Dict[str, Dict[str, float]]: size label -> ratio metric -> value,
+                                     empty if the file does not exist.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def record_baseline(
+    path: Union[str, Path], label: str, results: Dict[str, float]
+) -> None:
+    """
+    Stores the ratios of results as the baseline for a size label.
+
+    Args:
+        path (Union[str, Path]): The baseline JSON file.
+        label (str): The size label, e.g. ``1MB``.
+        results (Dict[str, float]): The results of run_benchmarks.
+    """
+    baselines = load_baselines(path)
+    baselines[label] = {
+        metric: round(value, 3) for metric, value in relative_metrics(results).items()
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def find_regressions(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (Dict[str, float]): Metrics to check, usually relative_metrics of
+                                    the results of run_benchmarks.
+        baseline (Dict[str, float]): The recorded baseline for the same size.
+        tolerance (float): How much worse a metric may get, relative to the baseline.
+
+    Returns:
+        List[str]: One description per regressed metric; empty if there are none.
+    """
+    regressions = []
+    for metric, expected in baseline.items():
+        actual = results.get(metric)
+        if actual is None or metric == "lines" or expected <= 0:
+            continue
+        if metric in HIGHER_IS_BETTER:
+            regressed = actual * (1 + tolerance) < expected
+        else:
+            regressed = actual > expected * (1 + tolerance)
+        if regressed:
+            regressions.append(f"{metric}: {actual:.3f} (baseline {expected:.3f})")
+    return regressions
+
+
+def _reference_workload() -> None:
+    # Fixed, stdlib-only work of the same kind as the analysis (regex search,
+    # string handling, dict updates), timed to normalize the other metrics.
+    pattern = re.compile(r"(?P<key>\w+)=(?P<value>\d+)ms")
+    counts: Dict[str, int] = {}
+    for i in range(REFERENCE_LINES):
+        line = f"{i}.00s Render.cpp {i % 977}: frame_{i % 97}={i % 300}ms"
+        _, _, message = line.partition(": ")
+        match = pattern.search(message)
+        if match:
+            key = match.group("key")
+            counts[key] = counts.get(key, 0) + int(match.group("value"))
+
+
+def _best_of(repeats: int, func: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _run_cli(trace_path: Path, workdir: Path) -> Tuple[float, Optional[float]]:
+    direct_input = workdir / "direct_input.json"
+    if not direct_input.exists():
+        direct_input.write_text("{}", encoding="utf-8")
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            [str(PACKAGE_DIR.parent), os.environ.get("PYTHONPATH", "")]
+        ),
+        TRACE_PATH=str(trace_path),
+        DIRECT_INPUT=str(direct_input),
+        LMU_CACHE_DIR=str(workdir / "cache"),
+    )
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, str(MAIN_PATH)],
+        env=env,
+        cwd=workdir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if not hasattr(os, "wait4"):
+        _, stderr = process.communicate()
+        _check_cli(process.returncode, stderr)
+        return time.perf_counter() - start, None
+
+    # wait4 reports the resource usage of exactly this child.
+    assert process.stderr is not None
+    with process.stderr:
+        stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    _check_cli(process.returncode, stderr)
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return seconds, usage.ru_maxrss / divisor
+
+
+def _check_cli(returncode: int, stderr: bytes) -> None:
+    if returncode != 0:
+        raise RuntimeError(
+            f"CLI exited with {returncode}: {stderr.decode(errors='replace')}"
+        )
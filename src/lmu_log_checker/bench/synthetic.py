@@ -0,0 +1,260 @@
+import random
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Tuple, Union
+
+# Lines are written in batches of this many to keep the generator fast.
+WRITE_BATCH_LINES = 10_000
+
+MessageFactory = Callable[[random.Random], str]
+
+_CARS = ("BMW_M4_GT3", "Ferrari_499P", "Porsche_963", "Oreca_07", "Aston_Vantage")
+_DEVICES = (
+    "Simucube 2 Pro",
+    "Fanatec CSL DD",
+    "Heusinkveld Sprint Pedals",
+    "MOZA R9 Base",
+    "Logitech G923",
+)
+_CPUS = (
+    "AMD Ryzen 7 7800X3D 8-Core Processor",
+    "Intel(R) Core(TM) i9-13900K",
+    "AMD Ryzen 9 5950X 16-Core Processor",
+)
+_GPUS = ("NVIDIA GeForce RTX 4080", "AMD Radeon RX 7900 XTX", "NVIDIA GeForce RTX 3070")
+_PARAMS = ("FWLiftHeightPlus", "RWDragBase", "BrakeDuctSetting", "DiffPreload")
+_SESSION_STATES = ("Loading", "Running", "Paused", "Finished")
+_SESSION_TYPES = ("Practice1", "Qualify1", "Warmup", "Race1")
+
+
+def _asset(rng: random.Random, ext: str) -> str:
+    return f"{rng.choice(_CARS)}\\{rng.choice(('body', 'wheel', 'cockpit'))}_{rng.randint(0, 99):02d}.{ext}"
+
+
+# One message factory per rule in patterns.yaml, with the file it is logged
+# from. Every factory produces a message that the rule's regex matches.
+RULE_SAMPLES: Dict[str, Tuple[str, MessageFactory]] = {
+    "STATE_ENTER_GAME": ("game.cpp", lambda rng: "Entered Game::Enter()"),
+    "STATE_ENTER_TRACK": ("game.cpp", lambda rng: "Entered Track::Enter()"),
+    "STATE_EXIT_GAME": ("game.cpp", lambda rng: "Entered Game::Exit()"),
+    "STATE_SESSION_CHANGE": (
+        "game.cpp",
+        lambda rng: "Changing session state from {} to {}".format(
+            *rng.sample(_SESSION_STATES, 2)
+        ),
+    ),
+    "STATE_SESSION_TYPE": (
+        "game.cpp",
+        lambda rng: "Changing session from {} to {}".format(
+            *rng.sample(_SESSION_TYPES, 2)
+        ),
+    ),
+    "STATE_GAME_PHASE": (
+        "game.cpp",
+        lambda rng: f"Changing state from {rng.randint(0, 9)} to {rng.randint(0, 9)}",
+    ),
+    "HW_CPU_INFO": (
+        "main.cpp",
+        lambda rng: f'Hardware info: CPU: "{rng.choice(_CPUS)}" {rng.choice((8, 16, 24))} cores',
+    ),
+    "HW_RAM_INFO": (
+        "main.cpp",
+        lambda rng: f"Memory: virtual: 131071MB physical: {rng.choice((16384, 32768, 65536))}MB",
+    ),
+    "HW_GPU_DETECT": (
+        "main.cpp",
+        lambda rng: f"D3D9 Video Card: {rng.choice(_GPUS)} (VRAM: {rng.choice((8176, 16376, 24560))} MB)",
+    ),
+    "HW_INPUT_DEVICE": (
+        "hwinput.cpp",
+        lambda rng: f"Device - Name:{rng.choice(_DEVICES)} VIPDID 0x{rng.getrandbits(32):08x}",
+    ),
+    "HW_STEER_RANGE_FAIL": (
+        "hwinput.cpp",
+        lambda rng: "Failed to read steering wheel range from driver",
+    ),
+    "HW_STEER_RANGE_SET": (
+        "hwinput.cpp",
+        lambda rng: f"Setting steering wheel range to {rng.choice((540, 900, 1080))} degrees",
+    ),
+    "ERR_OPENING": (
+        "Config.cpp",
+        lambda rng: f"Error opening UserData\\player\\{rng.choice(_CARS)}.svm",
+    ),
+    "ERR_TEXTURE_MISSING": (
+        "Texture.cpp",
+        lambda rng: f"TextureManager::remove: texture {_asset(rng, 'dds')} not found",
+    ),
+    "ERR_ITEM_MISSING": (
+        "ContentLoadi",
+        lambda rng: f"Failed to find item: {rng.choice(_CARS)}_{rng.randint(1, 9)}",
+    ),
+    "ERR_MAS_FILE_MISSING": (
+        "Masfile.cpp",
+        lambda rng: f'Error opening MAS file "{rng.choice(_CARS)}.mas"',
+    ),
+    "ERR_AUDIO_MISSING": (
+        "ContentLoadi",
+        lambda rng: f"Could not find audio file: {_asset(rng, 'wav')}",
+    ),
+    "PHYS_FFB_RESET": (
+        "hwinput.cpp",
+        lambda rng: rng.choice(("Resetting gamepad", "Resetting FFB device")),
+    ),
+    "SYS_SLOW_FRAME": (
+        "Render.cpp",
+        lambda rng: f"Frame time spike: {rng.randint(30, 400)}ms",
+    ),
+    "PHYS_FFB_THROTTLING": (
+        "hwinput.cpp",
+        lambda rng: "Force feedback strength safety reduction engaged at "
+        f"{rng.uniform(5, 80):.2f}% due to slow physics ticks ({rng.uniform(250, 395):.2f}Hz).",
+    ),
+    "PHYS_FFB_RESTORED": (
+        "hwinput.cpp",
+        lambda rng: "Force feedback strength safety reduction disengaged",
+    ),
+    "PHYS_PARAM_DEPRECATED": (
+        "ContentLoadi",
+        lambda rng: f"Car with {rng.choice(_CARS)} uses {rng.choice(_PARAMS)}. "
+        f"Please update it to use {rng.choice(_PARAMS)}V2",
+    ),
+    "PHYS_PARAM_LOAD_FAIL": (
+        "ContentLoadi",
+        lambda rng: f"Failed to load {rng.randint(1, 4)} double values for: {rng.choice(_PARAMS)}",
+    ),
+}
+
+# Realistic lines that no rule matches. Several share words with the rules
+# ("Error", "Failed", "Device", "Changing") so the literal prefilter and the
+# regexes both get exercised.
+NOISE_SAMPLES: List[Tuple[str, MessageFactory]] = [
+    (
+        "ContentLoadi",
+        lambda rng: f"Loading {_asset(rng, 'gmt')} ({rng.randint(1, 9000)} KB)",
+    ),
+    (
+        "ContentLoadi",
+        lambda rng: f"Found {rng.randint(1, 300)} items in {rng.choice(_CARS)}.veh",
+    ),
+    ("Masfile.cpp", lambda rng: f"Opened MAS file {rng.choice(_CARS)}.mas"),
+    (
+        "Render.cpp",
+        lambda rng: f"Render target resized to {rng.choice((1920, 2560, 3840))}x"
+        f"{rng.choice((1080, 1440, 2160))}",
+    ),
+    ("Render.cpp", lambda rng: f"Frame {rng.randint(0, 10**6)} presented"),
+    (
+        "game.cpp",
+        lambda rng: f"Changing camera to {rng.choice(('cockpit', 'tv', 'chase'))}",
+    ),
+    (
+        "net.cpp",
+        lambda rng: f"Network packet {rng.randint(0, 65535)} received from 10.0.0."
+        f"{rng.randint(1, 254)}",
+    ),
+    (
+        "hwinput.cpp",
+        lambda rng: f"Device {rng.choice(_DEVICES)} polled in {rng.randint(1, 900)}us",
+    ),
+    (
+        "hwinput.cpp",
+        lambda rng: f"Force feedback update {rng.uniform(0, 1):.3f}",
+    ),
+    ("main.cpp", lambda rng: f"Error count: {rng.randint(0, 3)}"),
+    (
+        "Texture.cpp",
+        lambda rng: f"TextureManager::add: texture {_asset(rng, 'dds')} loaded",
+    ),
+    ("Sound.cpp", lambda rng: f"Failed voice allocation retried {rng.randint(1, 5)}x"),
+]
+
+
+class SyntheticTrace(NamedTuple):
+    """
+    Summary of a generated trace.
+
+    Attributes:
+        lines (int): Number of lines written.
+        size (int): Number of bytes written.
+        planted (Dict[str, int]): Number of lines written from each rule's samples.
+    """
+
+    lines: int
+    size: int
+    planted: Dict[str, int]
+
+
+def generate_trace(
+    target: Union[str, Path, BinaryIO],
+    size: int,
+    seed: int = 0,
+    match_ratio: float = 0.05,
+) -> SyntheticTrace:
+    """
+    Writes a deterministic synthetic trace.txt of about ``size`` bytes.
+
+    The same seed and size always produce the same bytes. Lines from the
+    rule samples are mixed into the noise with probability ``match_ratio``,
+    a few raw lines without the ``<time>s <file> <line>: `` prefix are mixed
+    in as well, and the timestamps increase monotonically like a real session.
+
+    Args:
+        target (Union[str, Path, BinaryIO]): A file path or a binary file object.
+        size (int): Approximate size in bytes; writing stops at the first line past it.
+        seed (int): Seed of the generator.
+        match_ratio (float): Share of lines that match a rule.
+
+    Returns:
+        SyntheticTrace: What was written.
+    """
+    if isinstance(target, (str, Path)):
+        with open(target, "wb") as file:
+            return generate_trace(file, size, seed=seed, match_ratio=match_ratio)
+
+    rng = random.Random(seed)
+    rules = list(RULE_SAMPLES.items())
+    planted = {rule_id: 0 for rule_id in RULE_SAMPLES}
+    timestamp = 0.0
+    written = lines = 0
+    batch: List[str] = []
+
+    while written < size:
+        timestamp += rng.expovariate(200.0)
+        roll = rng.random()
+        if roll < match_ratio:
+            rule_id, (source, factory) = rules[rng.randrange(len(rules))]
+            planted[rule_id] += 1
+        else:
+            source, factory = NOISE_SAMPLES[rng.randrange(len(NOISE_SAMPLES))]
+        if roll > 0.999:
+            line = f"  continued: {factory(rng)}\r\n"
+        else:
+            line = (
+                f"{timestamp:.2f}s {source} {rng.randint(1, 9999)}: {factory(rng)}\r\n"
+            )
+        batch.append(line)
+        written += len(line.encode("utf-8"))
+        lines += 1
+        if len(batch) >= WRITE_BATCH_LINES:
+            target.write("".join(batch).encode("utf-8"))
+            batch.clear()
+
+    target.write("".join(batch).encode("utf-8"))
+    return SyntheticTrace(lines, written, planted)
+
+
+def parse_size(value: str) -> int:
+    """
+    Parses a size such as ``512KB``, ``1MB`` or ``2GB`` (binary units).
+
+    Args:
+        value (str): The size, optionally with a KB/MB/GB suffix.
+
+    Returns:
+        int: The size in bytes.
+    """
+    text = value.strip().upper().removesuffix("B")
+    for suffix, factor in (("K", 1024), ("M", 1024**2), ("G", 1024**3)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
@@ -1,5 +1,26 @@
-from .log_analyzer import LogAnalyzer
-from .models import LogLine
-from .regex_registry import RegexRegistry
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .log_analyzer import LogAnalyzer
+    from .models import LogLine
+    from .regex_registry import RegexRegistry
+
+# Public name -> defining submodule. They are imported on first access, so
+# importing a single submodule (e.g. ``core.ingest``) does not load pydantic.
+_EXPORTS = {
+    "LogAnalyzer": ".log_analyzer",
+    "LogLine": ".models",
+    "RegexRegistry": ".regex_registry",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = ["LogAnalyzer", "LogLine", "RegexRegistry"]
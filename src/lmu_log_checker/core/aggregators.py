@@ -0,0 +1,321 @@
+import hashlib
+import heapq
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from lmu_log_checker.core.models import EventRecord
+
+# Rules whose events are listed individually in the critical section.
+CRITICAL_RULES = ("PHYS_FFB_THROTTLING",)
+
+
+class Aggregator(ABC):
+    """
+    Receives every detected event while the analyzer is still matching.
+
+    Aggregators are attached with ``LogAnalyzer.add_aggregator`` and keep
+    their own, ideally bounded, state, so a report can be produced without
+    holding on to every event.
+    """
+
+    @abstractmethod
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        """
+        Consumes one event.
+
+        Args:
+            rule_id (str): The ID of the rule that triggered the event.
+            timestamp (float): The timestamp from the log line.
+            found_in_file (str): The source file where the event was found.
+            message (str): The original log message.
+            captured_data (Dict[str, Any]): Data extracted via regex groups.
+        """
+
+    def add_records(self, records: Iterable[EventRecord]) -> None:
+        """
+        Consumes events that were detected earlier, in detection order.
+        """
+        for record in records:
+            self.add(*record)
+
+    def add_report(self, report: Iterable[Dict[str, Any]]) -> None:
+        """
+        Consumes events in the dictionary form of ``generate_report_json``.
+        """
+        for event in report:
+            self.add(
+                event["rule_id"],
+                event["timestamp"],
+                event["found_in_file"],
+                event["message"],
+                event.get("captured_data") or {},
+            )
+
+
+class RuleCountAggregator(Aggregator):
+    """
+    Counts the events per rule.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        self.counts[rule_id] += 1
+
+    def merge(self, other: "RuleCountAggregator") -> None:
+        """
+        Adds the counts of another aggregator, e.g. of another trace.
+        """
+        self.counts.update(other.counts)
+
+
+class UniqueDetailAggregator(Aggregator):
+    """
+    Collects a bounded sample of the distinct captured details of every rule.
+
+    Up to ``max_tracked`` distinct details per rule are counted exactly; past
+    that the count is reported as a lower bound. The shown samples are the
+    distinct details with the smallest seeded hash (a bottom-k sample): a
+    repeated detail always hashes the same, so each distinct detail has the
+    same chance to be shown however often it occurs.
+    """
+
+    def __init__(self, samples: int = 5, max_tracked: int = 1000, seed: int = 0):
+        """
+        Initializes the aggregator.
+
+        Args:
+            samples (int): Number of sample details kept per rule.
+            max_tracked (int): Number of distinct details tracked exactly per rule.
+            seed (int): Seed of the sample's hash, for reproducible reports.
+        """
+        self.samples = samples
+        self.max_tracked = max_tracked
+        self._hash_key = str(seed).encode("utf-8")
+        self._distinct: Dict[str, Set[str]] = {}
+        self._overflow: Set[str] = set()
+        # Max-heaps of (-hash, detail): the root is the next one to replace.
+        self._reservoirs: Dict[str, List[Tuple[int, str]]] = {}
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        if not captured_data:
+            return
+        detail = ", ".join([str(v) for v in captured_data.values() if v])
+        if detail:
+            self.add_detail(rule_id, detail)
+
+    def add_detail(self, key: str, detail: str) -> None:
+        """
+        Records one detail string under the given key.
+
+        Args:
+            key (str): Usually the rule id.
+            detail (str): The detail to record.
+        """
+        distinct = self._distinct.setdefault(key, set())
+        if detail in distinct:
+            return
+        if len(distinct) < self.max_tracked:
+            distinct.add(detail)
+        else:
+            self._overflow.add(key)
+
+        # Past max_tracked a detail may arrive here again; its hash, and so
+        # its chance to be kept, stays the same.
+        self._offer(key, (-self._hash(detail), detail))
+
+    def merge(self, other: "UniqueDetailAggregator") -> None:
+        """
+        Adds the details of another aggregator, e.g. of another trace.
+
+        The merged sample equals the one of a single aggregator fed all
+        details, since both keep the details with the smallest hashes.
+
+        Args:
+            other (UniqueDetailAggregator): An aggregator with the same seed.
+
+        Raises:
+            ValueError: If the seeds differ.
+        """
+        if other._hash_key != self._hash_key:
+            raise ValueError("Cannot merge detail samples of different seeds.")
+        for key, details in other._distinct.items():
+            distinct = self._distinct.setdefault(key, set())
+            for detail in details:
+                if detail in distinct:
+                    continue
+                if len(distinct) >= self.max_tracked:
+                    self._overflow.add(key)
+                    break
+                distinct.add(detail)
+        self._overflow |= other._overflow
+        for key, reservoir in other._reservoirs.items():
+            for entry in reservoir:
+                self._offer(key, entry)
+
+    def unique_count(self, key: str) -> Tuple[int, bool]:
+        """
+        Returns the number of distinct details and whether it is a lower bound.
+        """
+        return len(self._distinct.get(key, ())), key in self._overflow
+
+    def sample(self, key: str) -> List[str]:
+        """
+        Returns the sampled details of a key.
+        """
+        reservoir = self._reservoirs.get(key, [])
+        return [detail for _, detail in sorted(reservoir, reverse=True)]
+
+    def _offer(self, key: str, entry: Tuple[int, str]) -> None:
+        reservoir = self._reservoirs.setdefault(key, [])
+        if entry in reservoir:
+            return
+        if len(reservoir) < self.samples:
+            heapq.heappush(reservoir, entry)
+        elif entry > reservoir[0]:
+            heapq.heapreplace(reservoir, entry)
+
+    def _hash(self, detail: str) -> int:
+        digest = hashlib.blake2b(
+            detail.encode("utf-8", "surrogatepass"), digest_size=8, key=self._hash_key
+        ).digest()
+        return int.from_bytes(digest, "big")
+
+
+class HardwareInfoAggregator(Aggregator):
+    """
+    Collects the CPU description and the detected input devices.
+    """
+
+    def __init__(self, max_devices: int = 256) -> None:
+        self.max_devices = max_devices
+        self.cpu: Optional[str] = None
+        self.devices: Set[str] = set()
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        if rule_id == "HW_CPU_INFO":
+            self.cpu = (
+                f"{captured_data.get('cpu_model')} ({captured_data.get('cores')} cores)"
+            )
+        elif rule_id == "HW_INPUT_DEVICE" and len(self.devices) < self.max_devices:
+            device_name = captured_data.get("device_name")
+            if device_name is not None:
+                self.devices.add(device_name.strip())
+
+    def merge(self, other: "HardwareInfoAggregator") -> None:
+        """
+        Adds the hardware of another aggregator; the first CPU seen is kept.
+        """
+        if self.cpu is None:
+            self.cpu = other.cpu
+        for device in sorted(other.devices):
+            if len(self.devices) >= self.max_devices:
+                break
+            self.devices.add(device)
+
+
+class CriticalEventAggregator(Aggregator):
+    """
+    Keeps the first ``limit`` events of the critical rules and counts the rest.
+    """
+
+    def __init__(self, rule_ids: Iterable[str] = CRITICAL_RULES, limit: int = 100):
+        self.rule_ids = frozenset(rule_ids)
+        self.limit = limit
+        self.events: List[Tuple[float, Dict[str, Any]]] = []
+        self.dropped = 0
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        if rule_id not in self.rule_ids:
+            return
+        if len(self.events) < self.limit:
+            self.events.append((timestamp, captured_data))
+        else:
+            self.dropped += 1
+
+    def merge(self, other: "CriticalEventAggregator") -> None:
+        """
+        Appends the events of another aggregator, e.g. of a later trace.
+        """
+        room = max(0, self.limit - len(self.events))
+        self.events.extend(other.events[:room])
+        self.dropped += other.dropped + len(other.events[room:])
+
+
+class SummaryAggregator(Aggregator):
+    """
+    Everything the analysis report needs, built online in bounded memory.
+    """
+
+    def __init__(self) -> None:
+        self.rule_counts = RuleCountAggregator()
+        self.details = UniqueDetailAggregator()
+        self.hardware = HardwareInfoAggregator()
+        self.critical = CriticalEventAggregator()
+        self._parts: List[Aggregator] = [
+            self.rule_counts,
+            self.details,
+            self.hardware,
+            self.critical,
+        ]
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        for part in self._parts:
+            part.add(rule_id, timestamp, found_in_file, message, captured_data)
+
+    def merge(self, other: "SummaryAggregator") -> None:
+        """
+        Adds the summary of another trace, so a batch can be reported without
+        keeping its events.
+
+        Args:
+            other (SummaryAggregator): The summary to add.
+        """
+        self.rule_counts.merge(other.rule_counts)
+        self.details.merge(other.details)
+        self.hardware.merge(other.hardware)
+        self.critical.merge(other.critical)
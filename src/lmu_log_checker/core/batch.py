@@ -0,0 +1,147 @@
+import glob
+import lzma
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from lmu_log_checker.core.aggregators import SummaryAggregator
+from lmu_log_checker.core.fleet import FleetStats, FleetStatsAggregator
+from lmu_log_checker.core.ingest import COMPRESSED_SUFFIXES
+from lmu_log_checker.core.log_analyzer import LogAnalyzer
+
+# Glob and suffixes used to find trace files when a directory is given.
+TRACE_FILE_GLOB = "trace*"
+TRACE_FILE_SUFFIXES = (".txt",) + COMPRESSED_SUFFIXES
+
+# Analyzer of the current worker process, created once by _init_worker.
+_worker_analyzer: Optional[LogAnalyzer] = None
+
+
+class BatchReport(BaseModel):
+    """
+    Merged result of analyzing many trace files.
+
+    No events are kept: every worker feeds the bounded aggregators of one
+    file and only those are sent back and merged, so the memory does not
+    grow with the size of the archive.
+
+    Attributes:
+        event_counts (Dict[str, Dict[str, int]]): rule_id -> number of events, for every
+                                                  analyzed file, keyed by path.
+        errors (Dict[str, str]): Files that could not be analyzed, with the reason.
+        fleet (FleetStats): The merged distributions and inventory of all files.
+        summary (SummaryAggregator): The merged report aggregators of all files.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    event_counts: Dict[str, Dict[str, int]] = {}
+    errors: Dict[str, str] = {}
+    fleet: FleetStats = FleetStats()
+    summary: SummaryAggregator = Field(default_factory=SummaryAggregator)
+
+    def rule_counts(self) -> Dict[str, Dict[str, int]]:
+        """
+        Counts the events per rule for every file.
+
+        Returns:
+            Dict[str, Dict[str, int]]: rule_id -> trace file -> number of events.
+        """
+        counts: Dict[str, Dict[str, int]] = {}
+        for trace_file, file_counts in self.event_counts.items():
+            for rule_id, count in file_counts.items():
+                counts.setdefault(rule_id, {})[trace_file] = count
+        return counts
+
+
+def collect_trace_files(target: Union[str, Path]) -> List[Path]:
+    """
+    Resolves a directory, glob pattern or single file to a sorted list of traces.
+
+    Args:
+        target (Union[str, Path]): A directory (searched recursively for trace*.txt
+                                   and compressed trace archives), a glob pattern
+                                   or a file path.
+
+    Returns:
+        List[Path]: The trace files found.
+    """
+    path = Path(target)
+    if path.is_dir():
+        return sorted(
+            p
+            for p in path.rglob(TRACE_FILE_GLOB)
+            if p.name.endswith(TRACE_FILE_SUFFIXES) and p.is_file()
+        )
+    if path.is_file():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(str(target), recursive=True))
+
+
+def analyze_batch(
+    target: Union[str, Path, List[Path]],
+    rules_data: Dict[str, Any],
+    max_workers: Optional[int] = None,
+) -> BatchReport:
+    """
+    Analyzes many trace files in parallel worker processes.
+
+    Every worker compiles the ruleset once and then analyzes the files it is
+    handed one after another. Compressed archives are decompressed by a
+    reader thread inside the worker, overlapping with the parsing.
+
+    Args:
+        target (Union[str, Path, List[Path]]): A directory, glob pattern or list of files.
+        rules_data (Dict[str, Any]): The ruleset, as passed to LogAnalyzer.load_rules.
+        max_workers (Optional[int]): Number of worker processes, defaults to the CPU count.
+
+    Returns:
+        BatchReport: The per-file counts, the merged summaries and the errors.
+    """
+    files = target if isinstance(target, list) else collect_trace_files(target)
+    batch_report = BatchReport()
+    if not files:
+        return batch_report
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(rules_data,),
+    ) as executor:
+        results = executor.map(_analyze_file, [str(f) for f in files])
+        for trace_file, error, summary, fleet in results:
+            if error is not None:
+                batch_report.errors[trace_file] = error
+            else:
+                batch_report.event_counts[trace_file] = dict(summary.rule_counts.counts)
+                batch_report.summary.merge(summary)
+                batch_report.fleet.merge(fleet)
+
+    return batch_report
+
+
+def _init_worker(rules_data: Dict[str, Any]) -> None:
+    global _worker_analyzer
+    _worker_analyzer = LogAnalyzer()
+    _worker_analyzer.keep_events = False
+    _worker_analyzer.load_rules(rules_data)
+
+
+def _analyze_file(
+    trace_file: str,
+) -> Tuple[str, Optional[str], SummaryAggregator, FleetStats]:
+    assert _worker_analyzer is not None
+    summary = SummaryAggregator()
+    fleet = FleetStatsAggregator()
+    _worker_analyzer.add_aggregator(summary)
+    _worker_analyzer.add_aggregator(fleet)
+    try:
+        _worker_analyzer.process_stream(trace_file)
+    except (OSError, EOFError, UnicodeDecodeError, lzma.LZMAError) as exc:
+        return trace_file, f"{type(exc).__name__}: {exc}", summary, FleetStats()
+    finally:
+        _worker_analyzer.remove_aggregator(summary)
+        _worker_analyzer.remove_aggregator(fleet)
+    return trace_file, None, summary, fleet.stats()
@@ -0,0 +1,432 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import parse_qs, urlsplit
+
+from lmu_log_checker.core.models import AnalysisRule, EventRecord
+from lmu_log_checker.core.export import iter_ndjson, parse_field_list
+from lmu_log_checker.core.ingest import compression_of
+from lmu_log_checker.core.parallel import (
+    analyze_chunk,
+    analyze_file,
+    init_worker,
+    split_chunks,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Results are streamed back after every chunk of about this size.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Upper bound for the request line and headers.
+MAX_HEADER_SIZE = 64 * 1024
+
+# Bytes read from the socket at a time while spooling an upload.
+UPLOAD_BLOCK_SIZE = 256 * 1024
+
+# Largest upload that is spooled; bigger bodies are answered with 413.
+MAX_BODY_SIZE = 2 * 1024 * 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class AnalysisDaemon:
+    """
+    Local HTTP service that analyzes submitted traces with warm rules.
+
+    The rules are loaded once, and every worker process of the pool compiles
+    them once at start-up, so a submission only pays for parsing. Each trace
+    is split into chunks of about ``chunk_size`` bytes that are parsed by the
+    pool; the events of a chunk are streamed back as NDJSON as soon as it and
+    all chunks before it are done, so the output order equals a sequential
+    run.
+
+    Backpressure works on two levels: at most ``max_pending`` submissions
+    are admitted at once (others get ``503`` with ``Retry-After``), and every
+    submission keeps at most ``window`` chunks in flight, which also stalls
+    parsing while a client reads its results slowly.
+
+    Endpoints:
+        ``POST /analyze`` with the trace as body (Content-Length required, at
+        most ``max_body_size`` bytes), or ``POST /analyze?path=/abs/trace.txt``
+        for a file inside ``trace_dir``; without a ``trace_dir`` only uploads
+        are accepted. Gzip, xz and bz2 archives are accepted either way. The optional
+        ``fields`` and ``rules`` parameters (comma separated) select the
+        exported fields and the rules whose events are returned.
+        ``GET /health`` returns the state of the daemon as JSON.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[AnalysisRule],
+        workers: Optional[int] = None,
+        max_pending: int = 8,
+        window: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        spool_dir: Optional[Union[str, Path]] = None,
+        max_body_size: int = MAX_BODY_SIZE,
+        trace_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Initializes the daemon and starts its worker pool.
+
+        Args:
+            rules (Sequence[AnalysisRule]): The validated rules.
+            workers (Optional[int]): Number of worker processes, defaults to the CPU count.
+            max_pending (int): Number of submissions admitted at the same time.
+            window (Optional[int]): Chunks in flight per submission, defaults to 2 per worker.
+            chunk_size (int): Approximate size of a streamed chunk in bytes.
+            spool_dir (Optional[Union[str, Path]]): Where uploads are buffered, defaults
+                                                    to the system temp directory.
+            max_body_size (int): Largest accepted upload in bytes.
+            trace_dir (Optional[Union[str, Path]]): The only directory ``?path=`` may read
+                                                    from; None disables ``?path=``.
+        """
+        self.rules = list(rules)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.window = window or 2 * self.workers
+        self.chunk_size = chunk_size
+        self.spool_dir = spool_dir
+        self.max_body_size = max_body_size
+        self.trace_dir = Path(trace_dir).resolve() if trace_dir is not None else None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+        rules_data = {"rules": [rule.model_dump() for rule in self.rules]}
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(rules_data,),
+        )
+        # Starts every worker now: the rules are compiled before the first
+        # submission, and no forked worker inherits a client socket.
+        for future in [self._executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.Server:
+        """
+        Starts listening on a TCP port.
+
+        Args:
+            host (str): The interface to bind, only localhost by default.
+            port (int): The port; 0 picks a free one.
+
+        Returns:
+            asyncio.Server: The running server.
+        """
+        self._server = await asyncio.start_server(
+            self._handle, host, port, limit=MAX_HEADER_SIZE
+        )
+        return self._server
+
+    async def start_unix(self, path: Union[str, Path]) -> asyncio.Server:
+        """
+        Starts listening on a Unix domain socket (POSIX only).
+
+        Args:
+            path (Union[str, Path]): The socket path.
+
+        Returns:
+            asyncio.Server: The running server.
+        """
+        self._server = await asyncio.start_unix_server(
+            self._handle, str(path), limit=MAX_HEADER_SIZE
+        )
+        return self._server
+
+    async def close(self) -> None:
+        """
+        Stops the server and the worker pool.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(cancel_futures=True)
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Returns the state of the daemon.
+        """
+        return {
+            "status": "ok",
+            "rules": len(self.rules),
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    async def analyze(self, path: Union[str, Path]) -> AsyncIterator[List[EventRecord]]:
+        """
+        Parses a trace on the worker pool and yields its events chunk by chunk.
+
+        Args:
+            path (Union[str, Path]): The trace file.
+
+        Yields:
+            List[EventRecord]: The events of the next chunk, in file order.
+        """
+        loop = asyncio.get_running_loop()
+        # Sniffing and splitting read the file, so they run on a thread and
+        # never stall the other connections.
+        if await loop.run_in_executor(None, compression_of, path):
+            # Archives cannot be split; one worker decompresses and parses it.
+            yield await loop.run_in_executor(self._executor, analyze_file, str(path))
+            return
+
+        ranges = iter(await loop.run_in_executor(None, self._split, path))
+        in_flight: Deque[asyncio.Future] = deque()
+
+        def submit_next() -> None:
+            chunk = next(ranges, None)
+            if chunk is not None:
+                in_flight.append(
+                    loop.run_in_executor(
+                        self._executor, analyze_chunk, str(path), *chunk
+                    )
+                )
+
+        for _ in range(self.window):
+            submit_next()
+        try:
+            while in_flight:
+                records = await in_flight.popleft()
+                submit_next()
+                yield records
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            await self._dispatch(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, headers = _parse_head(head)
+        except (asyncio.LimitOverrunError, ValueError):
+            await _respond(writer, 400, {"error": "Malformed request."})
+            return
+
+        url = urlsplit(target)
+        if url.path == "/health":
+            await _respond(writer, 200, self.health())
+            return
+        if url.path != "/analyze":
+            await _respond(writer, 404, {"error": f"Unknown path {url.path}."})
+            return
+        if method != "POST":
+            await _respond(writer, 405, {"error": "Use POST."})
+            return
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            await _respond(
+                writer, 503, {"error": "Too many submissions."}, {"Retry-After": "1"}
+            )
+            return
+
+        self.pending += 1
+        try:
+            await self._analyze_request(reader, writer, url.query, headers)
+        finally:
+            self.pending -= 1
+
+    async def _analyze_request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        query: str,
+        headers: Dict[str, str],
+    ) -> None:
+        params = parse_qs(query)
+        local_path = params.get("path", [None])[0]
+        fields = parse_field_list(params.get("fields", [None])[0])
+        rule_ids = parse_field_list(params.get("rules", [None])[0])
+        try:
+            iter_ndjson([], fields)
+        except ValueError as exc:
+            await _respond(writer, 400, {"error": str(exc)})
+            return
+
+        spooled: Optional[str] = None
+        if local_path is not None:
+            resolved = Path(local_path).resolve()
+            if self.trace_dir is None or not resolved.is_relative_to(self.trace_dir):
+                await _respond(
+                    writer, 403, {"error": "Reading local files is not allowed."}
+                )
+                return
+            if not resolved.is_file():
+                await _respond(writer, 404, {"error": f"No such file {local_path}."})
+                return
+            path = str(resolved)
+        else:
+            length = headers.get("content-length")
+            if length is None or not length.isdigit():
+                await _respond(writer, 411, {"error": "Content-Length required."})
+                return
+            if int(length) > self.max_body_size:
+                await _respond(
+                    writer,
+                    413,
+                    {"error": f"The body exceeds {self.max_body_size} bytes."},
+                )
+                return
+            spooled = path = await self._spool(reader, int(length))
+
+        try:
+            await self._stream_events(writer, path, fields, rule_ids)
+        finally:
+            if spooled is not None:
+                os.unlink(spooled)
+
+    def _split(self, path: Union[str, Path]) -> List[Tuple[int, int]]:
+        size = os.path.getsize(path)
+        return split_chunks(path, max(1, -(-size // self.chunk_size)))
+
+    async def _spool(self, reader: asyncio.StreamReader, length: int) -> str:
+        loop = asyncio.get_running_loop()
+        fd, name = tempfile.mkstemp(suffix=".txt", dir=self.spool_dir)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                remaining = length
+                while remaining:
+                    block = await reader.read(min(UPLOAD_BLOCK_SIZE, remaining))
+                    if not block:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    # A slow disk must not block the event loop.
+                    await loop.run_in_executor(None, file.write, block)
+                    remaining -= len(block)
+        except BaseException:
+            os.unlink(name)
+            raise
+        return name
+
+    async def _stream_events(
+        self,
+        writer: asyncio.StreamWriter,
+        path: str,
+        fields: Optional[Sequence[str]],
+        rule_ids: Optional[Sequence[str]],
+    ) -> None:
+        writer.write(
+            _head(
+                200,
+                {
+                    "Content-Type": "application/x-ndjson",
+                    "Transfer-Encoding": "chunked",
+                },
+            )
+        )
+        started = time.perf_counter()
+        count = 0
+        try:
+            async for records in self.analyze(path):
+                lines = list(iter_ndjson(records, fields, rule_ids))
+                if lines:
+                    count += len(lines)
+                    await _write_chunk(writer, "".join(lines))
+            summary: Dict[str, Any] = {
+                "done": True,
+                "events": count,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+            self.completed += 1
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as exc:
+            summary = {"done": False, "events": count, "error": str(exc)}
+        await _write_chunk(writer, json.dumps(summary) + "\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def _parse_head(head: bytes) -> Tuple[str, str, Dict[str, str]]:
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return method.upper(), target, headers
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _respond(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    payload = json.dumps(body).encode("utf-8")
+    writer.write(
+        _head(
+            status,
+            {
+                "Content-Type": "application/json",
+                "Content-Length": str(len(payload)),
+                **(headers or {}),
+            },
+        )
+        + payload
+    )
+    await writer.drain()
+
+
+async def _write_chunk(writer: asyncio.StreamWriter, text: str) -> None:
+    data = text.encode("utf-8")
+    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+    # Waits while the client is slow, which in turn holds back new chunks.
+    await writer.drain()
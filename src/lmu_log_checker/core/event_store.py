@@ -0,0 +1,325 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lmu_log_checker.core.models import EventRecord
+
+# Code stored for a captured group that did not participate in the match.
+NONE_CODE = -1
+
+
+class EventStore:
+    """
+    Columnar, array-backed storage for analysis events.
+
+    Every event is stored as one entry in a handful of typed arrays: an
+    interned integer rule code, a float64 timestamp, interned codes for the
+    source file and message, and a slice of interned capture values. Repeated
+    strings (the same missing file reported thousands of times) are therefore
+    stored once, and per-rule counts and time-window queries run over the
+    arrays instead of walking event objects.
+
+    Time-window queries use binary search while timestamps are non-decreasing
+    (the normal case for a single trace) and fall back to a linear scan
+    otherwise, e.g. after the game restarted during ``--follow``.
+    """
+
+    def __init__(self, records: Iterable[EventRecord] = ()):
+        """
+        Initializes the store, optionally with existing records.
+
+        Args:
+            records (Iterable[EventRecord]): Records to add, in detection order.
+        """
+        self._rule_ids: List[str] = []
+        self._rule_codes: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        self._layouts: List[Tuple[str, ...]] = []
+        self._layout_codes: Dict[Tuple[str, ...], int] = {}
+
+        self.rule_code = array("I")
+        self.timestamp = array("d")
+        self._file_code = array("i")
+        self._message_code = array("i")
+        self._layout_code = array("I")
+        self._capture_start = array("I")
+        self._capture_values = array("i")
+        self._sorted = True
+
+        self.extend(records)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __iter__(self) -> Iterator[EventRecord]:
+        return self.iter_records()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The reverse lookup tables are rebuilt on unpickling.
+        state = self.__dict__.copy()
+        for key in ("_rule_codes", "_string_codes", "_layout_codes"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._rule_codes = {rule_id: i for i, rule_id in enumerate(self._rule_ids)}
+        self._string_codes = {value: i for i, value in enumerate(self._strings)}
+        self._layout_codes = {keys: i for i, keys in enumerate(self._layouts)}
+
+    @property
+    def rule_ids(self) -> List[str]:
+        """
+        The interned rule ids; ``rule_ids[code]`` is the id of a rule code.
+        """
+        return self._rule_ids
+
+    def append(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        """
+        Appends one event.
+
+        Args:
+            rule_id (str): The ID of the rule that triggered the event.
+            timestamp (float): The timestamp from the log line.
+            found_in_file (str): The source file where the event was found.
+            message (str): The original log message.
+            captured_data (Dict[str, Any]): Data extracted via regex groups.
+
+        Raises:
+            TypeError: If a captured value is neither a string nor None.
+        """
+        for value in captured_data.values():
+            if value is not None and not isinstance(value, str):
+                # Interning str(value) would silently turn 1 into "1".
+                raise TypeError(
+                    f"Captured values must be str or None, got {type(value).__name__}."
+                )
+        if self.timestamp and timestamp < self.timestamp[-1]:
+            self._sorted = False
+
+        self.rule_code.append(self._code_rule(rule_id))
+        self.timestamp.append(timestamp)
+        self._file_code.append(self._intern(found_in_file))
+        self._message_code.append(self._intern(message))
+        self._layout_code.append(self._code_layout(tuple(captured_data)))
+        self._capture_start.append(len(self._capture_values))
+        for value in captured_data.values():
+            self._capture_values.append(
+                NONE_CODE if value is None else self._intern(value)
+            )
+
+    def extend(self, records: Iterable[EventRecord]) -> None:
+        """
+        Appends many events.
+
+        Args:
+            records (Iterable[EventRecord]): The records to add, in detection order.
+        """
+        for record in records:
+            self.append(*record)
+
+    def record(self, index: int) -> EventRecord:
+        """
+        Rebuilds the EventRecord stored at ``index``.
+
+        Args:
+            index (int): The position of the event.
+
+        Returns:
+            EventRecord: The event.
+        """
+        strings = self._strings
+        keys = self._layouts[self._layout_code[index]]
+        start = self._capture_start[index]
+        values = self._capture_values[start : start + len(keys)]
+        return EventRecord(
+            self._rule_ids[self.rule_code[index]],
+            self.timestamp[index],
+            strings[self._file_code[index]],
+            strings[self._message_code[index]],
+            {
+                key: None if code == NONE_CODE else strings[code]
+                for key, code in zip(keys, values)
+            },
+        )
+
+    def iter_records(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[EventRecord]:
+        """
+        Yields the records in ``[start, stop)`` in detection order.
+        """
+        stop = len(self) if stop is None else stop
+        for index in range(start, stop):
+            yield self.record(index)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Counts the events per rule.
+
+        Returns:
+            Dict[str, int]: rule_id -> number of events, most common first.
+        """
+        return {
+            self._rule_ids[code]: count
+            for code, count in Counter(self.rule_code).most_common()
+        }
+
+    def index_range(self, t0: float, t1: float) -> Tuple[int, int]:
+        """
+        Returns the index range of the events with ``t0 <= timestamp < t1``.
+
+        Only valid while timestamps are sorted; see ``is_sorted``.
+        """
+        return bisect_left(self.timestamp, t0), bisect_left(self.timestamp, t1)
+
+    @property
+    def is_sorted(self) -> bool:
+        """
+        True while the timestamps are non-decreasing in detection order.
+        """
+        return self._sorted
+
+    def indices_between(
+        self, t0: float, t1: float, rule_id: Optional[str] = None
+    ) -> List[int]:
+        """
+        Returns the positions of the events with ``t0 <= timestamp < t1``.
+
+        Args:
+            t0 (float): Start of the window (inclusive).
+            t1 (float): End of the window (exclusive).
+            rule_id (Optional[str]): Only return events of this rule.
+
+        Returns:
+            List[int]: The matching positions in detection order.
+        """
+        if self._sorted:
+            candidates: Iterable[int] = range(*self.index_range(t0, t1))
+        else:
+            candidates = (i for i, ts in enumerate(self.timestamp) if t0 <= ts < t1)
+
+        if rule_id is None:
+            return list(candidates)
+        code = self._rule_codes.get(rule_id)
+        rule_code = self.rule_code
+        return [i for i in candidates if rule_code[i] == code]
+
+    def between(
+        self, t0: float, t1: float, rule_id: Optional[str] = None
+    ) -> List[EventRecord]:
+        """
+        Returns the events with ``t0 <= timestamp < t1``.
+        """
+        return [self.record(i) for i in self.indices_between(t0, t1, rule_id)]
+
+    def count_between(self, t0: float, t1: float, rule_id: Optional[str] = None) -> int:
+        """
+        Counts the events with ``t0 <= timestamp < t1``.
+        """
+        if rule_id is None and self._sorted:
+            start, stop = self.index_range(t0, t1)
+            return stop - start
+        return len(self.indices_between(t0, t1, rule_id))
+
+    def timestamps(self, rule_id: Optional[str] = None) -> array:
+        """
+        Returns the timestamps of all events, or of one rule, in detection order.
+        """
+        if rule_id is None:
+            return array("d", self.timestamp)
+        code = self._rule_codes.get(rule_id)
+        return array(
+            "d",
+            (ts for ts, c in zip(self.timestamp, self.rule_code) if c == code),
+        )
+
+    def window_rates(
+        self, window: float, rule_id: Optional[str] = None
+    ) -> List[Tuple[float, float]]:
+        """
+        Buckets the events into consecutive windows and returns their rates.
+
+        Args:
+            window (float): The window length in seconds.
+            rule_id (Optional[str]): Only count events of this rule.
+
+        Returns:
+            List[Tuple[float, float]]: (window start, events per second) for every
+                                       window from the first to the last event.
+
+        Raises:
+            ValueError: If the window is not positive.
+        """
+        _check_window(window)
+        timestamps = sorted(self.timestamps(rule_id))
+        if not timestamps:
+            return []
+
+        origin = timestamps[0]
+        bins: Counter[int] = Counter(int((ts - origin) // window) for ts in timestamps)
+        return [(origin + i * window, bins[i] / window) for i in range(max(bins) + 1)]
+
+    def max_window_count(
+        self, window: float, rule_id: Optional[str] = None
+    ) -> Tuple[float, int]:
+        """
+        Finds the sliding window of the given length holding the most events.
+
+        Args:
+            window (float): The window length in seconds.
+            rule_id (Optional[str]): Only count events of this rule.
+
+        Returns:
+            Tuple[float, int]: The window start and its number of events
+                               (0.0, 0 if there are no events).
+
+        Raises:
+            ValueError: If the window is not positive.
+        """
+        _check_window(window)
+        timestamps = sorted(self.timestamps(rule_id))
+        best_start, best_count = 0.0, 0
+        left = 0
+        for right, ts in enumerate(timestamps):
+            while ts - timestamps[left] >= window:
+                left += 1
+            if right - left + 1 > best_count:
+                best_start, best_count = timestamps[left], right - left + 1
+        return best_start, best_count
+
+    def _code_rule(self, rule_id: str) -> int:
+        code = self._rule_codes.get(rule_id)
+        if code is None:
+            code = self._rule_codes[rule_id] = len(self._rule_ids)
+            self._rule_ids.append(rule_id)
+        return code
+
+    def _code_layout(self, keys: Tuple[str, ...]) -> int:
+        code = self._layout_codes.get(keys)
+        if code is None:
+            code = self._layout_codes[keys] = len(self._layouts)
+            self._layouts.append(keys)
+        return code
+
+    def _intern(self, value: str) -> int:
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+
+def _check_window(window: float) -> None:
+    # A zero window divides by zero, and a negative one never advances.
+    if not window > 0:
+        raise ValueError(f"The window must be positive, got {window}.")
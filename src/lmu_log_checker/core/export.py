@@ -0,0 +1,227 @@
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+from lmu_log_checker.core.aggregators import Aggregator
+from lmu_log_checker.core.ingest import LogSource, iter_log_lines
+from lmu_log_checker.core.models import EventRecord
+
+# The fields of an exported event, in the order of EventRecord.
+EXPORT_FIELDS: Tuple[str, ...] = EventRecord._fields
+
+
+class NdjsonExporter(Aggregator):
+    """
+    Writes every event as one line of JSON the moment it is detected.
+
+    Attached to an analyzer with ``keep_events=False``, a trace of any size
+    is exported in constant memory, and a consumer reading the other end of
+    a pipe sees the first events while the analysis is still running.
+    """
+
+    def __init__(
+        self,
+        target: TextIO,
+        fields: Optional[Sequence[str]] = None,
+        rule_ids: Optional[Iterable[str]] = None,
+    ):
+        """
+        Initializes the exporter.
+
+        Args:
+            target (TextIO): Where the lines are written, e.g. a file or sys.stdout.
+            fields (Optional[Sequence[str]]): The fields to export (see EXPORT_FIELDS),
+                                              all by default.
+            rule_ids (Optional[Iterable[str]]): Only export events of these rules.
+
+        Raises:
+            ValueError: If an unknown field is requested.
+        """
+        self.target = target
+        self.written = 0
+        self._format = _formatter(fields)
+        self._rule_ids = frozenset(rule_ids) if rule_ids is not None else None
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        if self._rule_ids is not None and rule_id not in self._rule_ids:
+            return
+        self.target.write(
+            self._format(rule_id, timestamp, found_in_file, message, captured_data)
+        )
+        self.written += 1
+
+    def flush(self) -> None:
+        """
+        Flushes the target, e.g. after each poll in follow mode.
+
+        Lines are buffered like any other file writes, which keeps exporting
+        a large trace cheap; a reader tailing the target only sees them once
+        they are flushed.
+        """
+        self.target.flush()
+
+
+def check_fields(fields: Optional[Sequence[str]]) -> None:
+    """
+    Checks that only known export fields are requested.
+
+    Args:
+        fields (Optional[Sequence[str]]): The fields to export, all if None.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    _formatter(fields)
+
+
+def iter_ndjson(
+    records: Iterable[EventRecord],
+    fields: Optional[Sequence[str]] = None,
+    rule_ids: Optional[Iterable[str]] = None,
+) -> Iterator[str]:
+    """
+    Lazily formats events as newline-terminated JSON lines.
+
+    Args:
+        records (Iterable[EventRecord]): The events, e.g. ``analyzer.event_store``.
+        fields (Optional[Sequence[str]]): The fields to export, all by default.
+        rule_ids (Optional[Iterable[str]]): Only export events of these rules.
+
+    Returns:
+        Iterator[str]: One line per exported event.
+
+    Raises:
+        ValueError: If an unknown field is requested, before anything is formatted.
+    """
+    format_record = _formatter(fields)
+    wanted = frozenset(rule_ids) if rule_ids is not None else None
+    return (
+        format_record(*record)
+        for record in records
+        if wanted is None or record.rule_id in wanted
+    )
+
+
+def write_ndjson(
+    records: Iterable[EventRecord],
+    target: TextIO,
+    fields: Optional[Sequence[str]] = None,
+    rule_ids: Optional[Iterable[str]] = None,
+) -> int:
+    """
+    Writes already detected events as NDJSON.
+
+    Args:
+        records (Iterable[EventRecord]): The events to write.
+        target (TextIO): Where the lines are written.
+        fields (Optional[Sequence[str]]): The fields to export, all by default.
+        rule_ids (Optional[Iterable[str]]): Only export events of these rules.
+
+    Returns:
+        int: The number of lines written.
+    """
+    written = 0
+    for line in iter_ndjson(records, fields, rule_ids):
+        target.write(line)
+        written += 1
+    return written
+
+
+def read_ndjson(source: LogSource) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily reads events exported as NDJSON.
+
+    Blank lines are skipped. Like traces, exports may be gzip, xz or bz2
+    compressed.
+
+    Args:
+        source: A path, a binary file object or an iterable of lines.
+
+    Yields:
+        Dict[str, Any]: One event per line, with the exported fields.
+
+    Raises:
+        ValueError: If a line is not a JSON object.
+    """
+    for number, line in enumerate(iter_log_lines(source), start=1):
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Line {number} is not valid JSON: {exc}") from exc
+        if not isinstance(event, dict):
+            raise ValueError(f"Line {number} is not a JSON object.")
+        yield event
+
+
+def parse_field_list(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parses a comma separated list such as ``rule_id,timestamp``.
+
+    Args:
+        value (Optional[str]): The list, or None.
+
+    Returns:
+        Optional[Tuple[str, ...]]: The non-empty items, or None if value is None.
+    """
+    if value is None:
+        return None
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _formatter(fields: Optional[Sequence[str]]) -> Callable[..., str]:
+    if fields is None:
+        return _format_all
+
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown export field(s) {', '.join(unknown)}; "
+            f"choose from {', '.join(EXPORT_FIELDS)}."
+        )
+    indices = [EXPORT_FIELDS.index(field) for field in fields]
+    names = list(fields)
+
+    def format_selected(*record: Any) -> str:
+        return json.dumps({name: record[i] for name, i in zip(names, indices)}) + "\n"
+
+    return format_selected
+
+
+def _format_all(
+    rule_id: str,
+    timestamp: float,
+    found_in_file: str,
+    message: str,
+    captured_data: Dict[str, Any],
+) -> str:
+    # Same keys and order as EventRecord.to_dict(), without the copy.
+    return (
+        json.dumps(
+            {
+                "rule_id": rule_id,
+                "timestamp": timestamp,
+                "found_in_file": found_in_file,
+                "message": message,
+                "captured_data": captured_data,
+            }
+        )
+        + "\n"
+    )
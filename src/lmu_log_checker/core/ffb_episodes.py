@@ -0,0 +1,215 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from lmu_log_checker.core.aggregators import Aggregator
+
+ENGAGE_RULE = "PHYS_FFB_THROTTLING"
+DISENGAGE_RULE = "PHYS_FFB_RESTORED"
+
+# Default length of the window used to find the worst stretch of a session.
+DEFAULT_WINDOW = 60.0
+
+
+class FfbEpisode(NamedTuple):
+    """
+    One FFB throttling episode, from the first engage to the disengage.
+
+    Attributes:
+        start (float): Timestamp of the first engage message.
+        end (Optional[float]): Timestamp of the disengage message, None if the trace ended first.
+        duration (float): Length of the episode (up to the session end if open).
+        min_physics_hz (float): Lowest physics rate reported during the episode (NaN if unknown).
+        max_reduction_pct (float): Highest FFB reduction reported during the episode (NaN if unknown).
+        time_to_recovery (Optional[float]): Time from the lowest physics rate until the
+                                            disengage, None if the trace ended first.
+    """
+
+    start: float
+    end: Optional[float]
+    duration: float
+    min_physics_hz: float
+    max_reduction_pct: float
+    time_to_recovery: Optional[float]
+
+
+class FfbSessionStats(NamedTuple):
+    """
+    Session-level throttling totals.
+
+    Attributes:
+        episodes (int): Number of episodes.
+        throttled_time (float): Total seconds spent throttled.
+        episodes_per_minute (float): Episodes per minute of session time.
+        worst_window_start (float): Start of the window with the most throttled time.
+        worst_window_throttled (float): Seconds throttled within that window.
+    """
+
+    episodes: int
+    throttled_time: float
+    episodes_per_minute: float
+    worst_window_start: float
+    worst_window_throttled: float
+
+
+class FfbEpisodeDetector(Aggregator):
+    """
+    Pairs throttling engage/disengage events into episodes while matching.
+
+    Repeated engage messages before a disengage belong to the same episode
+    and only update its worst values. Episodes are kept in parallel typed
+    arrays, and the session statistics are computed with prefix sums and
+    binary searches over them, so they stay cheap for thousands of episodes.
+    """
+
+    def __init__(self) -> None:
+        self.starts = array("d")
+        self.ends = array("d")  # NaN while an episode is open
+        self.min_hz = array("d")
+        self.max_pct = array("d")
+        self.worst_at = array("d")
+        self.first_timestamp: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+        self._open = False
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+
+        if rule_id == ENGAGE_RULE:
+            hz = _to_float(captured_data.get("physics_hz"))
+            pct = _to_float(captured_data.get("reduction_pct"))
+            if not self._open:
+                self._open = True
+                self.starts.append(timestamp)
+                self.ends.append(math.nan)
+                self.min_hz.append(hz)
+                self.max_pct.append(pct)
+                self.worst_at.append(timestamp)
+                return
+            if math.isnan(self.min_hz[-1]) or hz < self.min_hz[-1]:
+                self.min_hz[-1] = hz
+                self.worst_at[-1] = timestamp
+            if math.isnan(self.max_pct[-1]) or pct > self.max_pct[-1]:
+                self.max_pct[-1] = pct
+        elif rule_id == DISENGAGE_RULE and self._open:
+            self._open = False
+            self.ends[-1] = timestamp
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def episodes(self, session_end: Optional[float] = None) -> List[FfbEpisode]:
+        """
+        Returns all episodes in order.
+
+        Args:
+            session_end (Optional[float]): Where an open episode ends, defaults to the last event.
+
+        Returns:
+            List[FfbEpisode]: The episodes.
+        """
+        ends = self._closed_ends(session_end)
+        return [
+            FfbEpisode(
+                start,
+                None if math.isnan(raw_end) else raw_end,
+                end - start,
+                hz,
+                pct,
+                None if math.isnan(raw_end) else raw_end - worst,
+            )
+            for start, raw_end, end, hz, pct, worst in zip(
+                self.starts, self.ends, ends, self.min_hz, self.max_pct, self.worst_at
+            )
+        ]
+
+    def stats(
+        self, window: float = DEFAULT_WINDOW, session_end: Optional[float] = None
+    ) -> FfbSessionStats:
+        """
+        Computes the session-level totals.
+
+        Args:
+            window (float): Length of the sliding window for the worst stretch.
+            session_end (Optional[float]): Where an open episode ends, defaults to the last event.
+
+        Returns:
+            FfbSessionStats: The totals.
+        """
+        ends = self._closed_ends(session_end)
+        starts = self.starts
+        durations = [end - start for start, end in zip(starts, ends)]
+        throttled_time = sum(durations)
+
+        span_end = session_end if session_end is not None else self.last_timestamp
+        span_minutes = (
+            (span_end - self.first_timestamp) / 60.0
+            if span_end is not None and self.first_timestamp is not None
+            else 0.0
+        )
+        per_minute = len(starts) / span_minutes if span_minutes > 0 else 0.0
+
+        worst_start, worst_throttled = self._worst_window(
+            starts, ends, durations, window
+        )
+        return FfbSessionStats(
+            len(starts), throttled_time, per_minute, worst_start, worst_throttled
+        )
+
+    def _closed_ends(self, session_end: Optional[float]) -> array:
+        fallback = session_end if session_end is not None else self.last_timestamp
+        return array(
+            "d",
+            (
+                (
+                    (fallback if fallback is not None else start)
+                    if math.isnan(end)
+                    else end
+                )
+                for start, end in zip(self.starts, self.ends)
+            ),
+        )
+
+    @staticmethod
+    def _worst_window(
+        starts: array, ends: array, durations: List[float], window: float
+    ) -> Tuple[float, float]:
+        if not starts:
+            return 0.0, 0.0
+
+        # prefix[i] is the throttled time of the first i episodes.
+        prefix = [0.0, *accumulate(durations)]
+        best_start, best = starts[0], 0.0
+        # The optimum window either starts at an episode start or ends at an
+        # episode end, so only those candidates are evaluated.
+        candidates = list(starts) + [end - window for end in ends]
+        for a in candidates:
+            b = a + window
+            first = bisect_right(ends, a)
+            last = bisect_left(starts, b) - 1
+            if first > last:
+                continue
+            covered = prefix[last + 1] - prefix[first]
+            covered -= max(0.0, a - starts[first])
+            covered -= max(0.0, ends[last] - b)
+            if covered > best:
+                best_start, best = a, covered
+        return best_start, best
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
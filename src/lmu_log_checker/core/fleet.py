@@ -0,0 +1,354 @@
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from pydantic import BaseModel, PrivateAttr
+
+from lmu_log_checker.core.aggregators import Aggregator
+
+# metric -> (rule id, captured group) of the distributions kept per fleet.
+FLEET_METRICS: Dict[str, Tuple[str, str]] = {
+    "physics_hz": ("PHYS_FFB_THROTTLING", "physics_hz"),
+    "reduction_pct": ("PHYS_FFB_THROTTLING", "reduction_pct"),
+    "slow_frame_ms": ("SYS_SLOW_FRAME", "ms"),
+}
+
+# inventory -> (rule id, captured group) of the hardware counted per trace.
+FLEET_INVENTORY: Dict[str, Tuple[str, str]] = {
+    "cpu": ("HW_CPU_INFO", "cpu_model"),
+    "gpu": ("HW_GPU_DETECT", "gpu_name"),
+    "input_device": ("HW_INPUT_DEVICE", "device_name"),
+}
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LogHistogram(BaseModel):
+    """
+    Quantile sketch over positive values with logarithmically spaced buckets.
+
+    A value ``x`` is counted in bucket ``ceil(log(x) / log(gamma))`` with
+    ``gamma = (1 + a) / (1 - a)``, so every quantile is answered with a
+    relative error of at most ``a = relative_accuracy``. Merging adds the
+    bucket counts, which is associative and commutative; the memory is
+    bounded by ``max_buckets``, past which the lowest buckets are folded
+    together (this keeps merges associative, only the lowest quantiles lose
+    accuracy). Values <= 0 are counted separately.
+
+    Attributes:
+        relative_accuracy (float): The relative error bound of the quantiles.
+        max_buckets (int): The maximum number of buckets kept.
+        buckets (Dict[int, int]): Bucket index -> number of values.
+        zero_count (int): Number of values <= 0.
+        count (int): Number of values.
+        min (Optional[float]): The smallest value.
+        max (Optional[float]): The largest value.
+    """
+
+    relative_accuracy: float = 0.01
+    max_buckets: int = 2048
+    buckets: Dict[int, int] = {}
+    zero_count: int = 0
+    count: int = 0
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    _log_gamma: float = PrivateAttr(0.0)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not 0 < self.relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+        accuracy = self.relative_accuracy
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+        Counts a value.
+
+        Args:
+            value (float): The value.
+            count (int): How often to count it.
+        """
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            self.zero_count += count
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """
+        Adds the values of another histogram to this one.
+
+        Args:
+            other (LogHistogram): A histogram with the same relative accuracy.
+
+        Raises:
+            ValueError: If the relative accuracies differ.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge histograms of different accuracy.")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile.
+
+        Args:
+            q (float): The quantile between 0 and 1, e.g. 0.99.
+
+        Returns:
+            Optional[float]: The estimate, or None if no value was counted.
+        """
+        if self.count == 0 or self.min is None or self.max is None:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+        gamma = math.exp(self._log_gamma)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # The point of the bucket with the smallest relative error.
+                estimate = 2 * gamma**index / (gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def _collapse(self) -> None:
+        indices = sorted(self.buckets)
+        keep_from = indices[-self.max_buckets]
+        folded = sum(self.buckets.pop(index) for index in indices if index < keep_from)
+        self.buckets[keep_from] += folded
+
+
+class CountMap(BaseModel):
+    """
+    Mergeable counts of distinct values with a bounded number of keys.
+
+    While at most ``max_keys`` distinct values are seen, the counts are exact
+    and merging is associative. Past that only the most frequent values are
+    kept and the counts of the dropped ones are added to ``other``.
+
+    Attributes:
+        max_keys (int): The maximum number of values kept.
+        counts (Dict[str, int]): Value -> count.
+        other (int): The count of the values that were dropped.
+    """
+
+    max_keys: int = 1000
+    counts: Dict[str, int] = {}
+    other: int = 0
+
+    def add(self, key: str, count: int = 1) -> None:
+        """
+        Counts a value.
+
+        Args:
+            key (str): The value.
+            count (int): How often to count it.
+        """
+        self.counts[key] = self.counts.get(key, 0) + count
+        if len(self.counts) > self.max_keys:
+            self._trim()
+
+    def merge(self, other: "CountMap") -> None:
+        """
+        Adds the counts of another map to this one.
+
+        Args:
+            other (CountMap): The map to add.
+        """
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.other += other.other
+        if len(self.counts) > self.max_keys:
+            self._trim()
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Returns the most frequent values, ties in alphabetical order.
+
+        Args:
+            n (Optional[int]): How many to return, all by default.
+
+        Returns:
+            List[Tuple[str, int]]: (value, count) pairs.
+        """
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if n is None else ranked[:n]
+
+    def _trim(self) -> None:
+        for key, count in self.most_common()[self.max_keys :]:
+            del self.counts[key]
+            self.other += count
+
+
+class FleetStats(BaseModel):
+    """
+    Distributions and hardware inventory of any number of traces.
+
+    Every trace analysis emits one FleetStats (see FleetStatsAggregator);
+    the stats of many traces, processes or rigs are combined with ``merge``
+    in any order and grouping, and the result stays bounded in size.
+
+    Attributes:
+        traces (int): Number of traces merged into these stats.
+        histograms (Dict[str, LogHistogram]): Metric -> distribution of its values.
+        inventory (Dict[str, CountMap]): Inventory -> number of traces per value.
+    """
+
+    traces: int = 0
+    histograms: Dict[str, LogHistogram] = {}
+    inventory: Dict[str, CountMap] = {}
+
+    def merge(self, other: "FleetStats") -> None:
+        """
+        Adds the stats of other traces to these stats.
+
+        Args:
+            other (FleetStats): The stats to add.
+        """
+        self.traces += other.traces
+        for metric, histogram in other.histograms.items():
+            if metric in self.histograms:
+                self.histograms[metric].merge(histogram)
+            else:
+                self.histograms[metric] = histogram.model_copy(deep=True)
+        for name, counts in other.inventory.items():
+            if name in self.inventory:
+                self.inventory[name].merge(counts)
+            else:
+                self.inventory[name] = counts.model_copy(deep=True)
+
+    @classmethod
+    def combine(cls, stats: Iterable["FleetStats"]) -> "FleetStats":
+        """
+        Merges any number of stats into new stats.
+
+        Args:
+            stats (Iterable[FleetStats]): The stats to merge.
+
+        Returns:
+            FleetStats: The merged stats.
+        """
+        combined = cls()
+        for item in stats:
+            combined.merge(item)
+        return combined
+
+    def percentiles(
+        self, metric: str, quantiles: Sequence[float] = DEFAULT_QUANTILES
+    ) -> Dict[float, Optional[float]]:
+        """
+        Estimates quantiles of a metric.
+
+        Args:
+            metric (str): A key of FLEET_METRICS.
+            quantiles (Sequence[float]): The quantiles between 0 and 1.
+
+        Returns:
+            Dict[float, Optional[float]]: Quantile -> estimate (None without data).
+        """
+        histogram = self.histograms.get(metric, LogHistogram())
+        return {q: histogram.quantile(q) for q in quantiles}
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Writes the stats as JSON.
+        """
+        Path(path).write_text(self.model_dump_json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FleetStats":
+        """
+        Reads stats written by ``save``.
+        """
+        return cls.model_validate_json(Path(path).read_text(encoding="utf-8"))
+
+
+class FleetStatsAggregator(Aggregator):
+    """
+    Builds the FleetStats of one trace while it is analyzed.
+
+    Metric values are counted per event; inventory values are counted once
+    per trace, so the merged inventory tells in how many traces a CPU, GPU
+    or input device was seen.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_keys: int = 1000):
+        """
+        Initializes the aggregator.
+
+        Args:
+            relative_accuracy (float): The relative error bound of the histograms.
+            max_keys (int): The number of distinct values kept per inventory.
+        """
+        self.max_keys = max_keys
+        self.histograms = {
+            metric: LogHistogram(relative_accuracy=relative_accuracy)
+            for metric in FLEET_METRICS
+        }
+        self._seen: Dict[str, Set[str]] = {name: set() for name in FLEET_INVENTORY}
+        self._metrics_by_rule: Dict[str, List[Tuple[str, str]]] = {}
+        for metric, (rule_id, group) in FLEET_METRICS.items():
+            self._metrics_by_rule.setdefault(rule_id, []).append((metric, group))
+        self._inventory_by_rule = {
+            rule_id: (name, group) for name, (rule_id, group) in FLEET_INVENTORY.items()
+        }
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        for metric, group in self._metrics_by_rule.get(rule_id, ()):
+            try:
+                self.histograms[metric].add(float(captured_data[group]))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        inventory = self._inventory_by_rule.get(rule_id)
+        if inventory is not None:
+            name, group = inventory
+            value = captured_data.get(group)
+            seen = self._seen[name]
+            if value and len(seen) < self.max_keys:
+                seen.add(str(value).strip())
+
+    def stats(self) -> FleetStats:
+        """
+        Returns the stats of the analyzed trace.
+
+        Returns:
+            FleetStats: Stats with ``traces == 1``.
+        """
+        return FleetStats(
+            traces=1,
+            histograms={
+                metric: histogram.model_copy(deep=True)
+                for metric, histogram in self.histograms.items()
+            },
+            inventory={
+                name: CountMap(
+                    max_keys=self.max_keys, counts={value: 1 for value in seen}
+                )
+                for name, seen in self._seen.items()
+            },
+        )
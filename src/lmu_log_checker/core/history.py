@@ -0,0 +1,427 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from _helper.cache_dir import default_cache_dir
+from lmu_log_checker.core.ingest import iter_file_blocks
+from lmu_log_checker.core.log_analyzer import LogAnalyzer
+from lmu_log_checker.core.models import EventRecord
+
+HISTORY_FILE_NAME = "history.sqlite3"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+THROTTLING_RULE = "PHYS_FFB_THROTTLING"
+
+# Bump whenever the table layout changes; older databases are rebuilt.
+SCHEMA_VERSION = 2
+
+# Bump whenever matching or the stored event format changes: runs stored by
+# older code are then analyzed again instead of replayed.
+RESULTS_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    trace_hash TEXT NOT NULL,
+    ruleset_hash TEXT NOT NULL,
+    rig TEXT,
+    trace_path TEXT,
+    trace_size INTEGER,
+    trace_mtime_ns INTEGER,
+    session_time REAL NOT NULL,
+    analyzed_at REAL NOT NULL,
+    event_count INTEGER NOT NULL,
+    UNIQUE (trace_hash, ruleset_hash)
+);
+CREATE INDEX IF NOT EXISTS runs_by_rig ON runs (rig, session_time);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (session_time);
+CREATE INDEX IF NOT EXISTS runs_by_path ON runs (trace_path);
+
+CREATE TABLE IF NOT EXISTS events (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    rule_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    found_in_file TEXT NOT NULL,
+    message TEXT NOT NULL,
+    captured_data TEXT NOT NULL,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rule_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    rule_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (rule_id, run_id)
+) WITHOUT ROWID;
+"""
+
+
+class RuleCountRow(NamedTuple):
+    """
+    The count of one rule in one analyzed trace.
+    """
+
+    trace_path: Optional[str]
+    rig: Optional[str]
+    session_time: float
+    events: int
+
+
+class WeeklyCountRow(NamedTuple):
+    """
+    The events of one rule in one ISO 8601 week (``YYYY-Www``, e.g. ``2025-W01``).
+    """
+
+    week: str
+    sessions: int
+    affected_sessions: int
+    events: int
+
+
+def file_hash(path: Union[str, Path]) -> str:
+    """
+    Hashes the content of a file in blocks, without loading it at once.
+
+    Args:
+        path (Union[str, Path]): The file to hash.
+
+    Returns:
+        str: The hex sha256 digest of the content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_history_path() -> Path:
+    """
+    Returns the default location of the history database, next to the rule cache.
+    """
+    return default_cache_dir() / HISTORY_FILE_NAME
+
+
+class HistoryStore:
+    """
+    Local SQLite history of analyzed traces.
+
+    Every run is keyed by the hash of the trace content and the hash of the
+    ruleset, so re-analyzing an unchanged trace with unchanged rules is a
+    lookup instead of a parse. Events are written in a single transaction per
+    run, and the per-rule counts are kept in their own indexed table so the
+    cross-session queries never scan the events.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Opens (and if needed creates) the history database.
+
+        Args:
+            path (Optional[Union[str, Path]]): The database file, see default_history_path.
+                                               ``":memory:"`` keeps it in memory.
+        """
+        if path is None:
+            path = default_history_path()
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(str(path))
+        self._connection.create_function("iso_week", 1, _iso_week, deterministic=True)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._migrate()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        self._connection.close()
+
+    def lookup(self, trace_hash: str, ruleset_hash: str) -> Optional[List[EventRecord]]:
+        """
+        Returns the stored events of a trace analyzed with a ruleset.
+
+        Args:
+            trace_hash (str): The hash of the trace content, see file_hash.
+            ruleset_hash (str): The hash of the ruleset.
+
+        Returns:
+            Optional[List[EventRecord]]: The events in detection order, None if not stored.
+        """
+        row = self._connection.execute(
+            "SELECT id FROM runs WHERE trace_hash = ? AND ruleset_hash = ?",
+            (trace_hash, ruleset_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        cursor = self._connection.execute(
+            "SELECT rule_id, timestamp, found_in_file, message, captured_data "
+            "FROM events WHERE run_id = ? ORDER BY seq",
+            (row[0],),
+        )
+        return [
+            EventRecord(rule_id, timestamp, found_in_file, message, json.loads(data))
+            for rule_id, timestamp, found_in_file, message, data in cursor
+        ]
+
+    def unchanged_trace_hash(
+        self, trace_path: Union[str, Path], file_stat: os.stat_result
+    ) -> Optional[str]:
+        """
+        Returns the stored hash of a trace file that did not change since its run.
+
+        The file counts as unchanged while its size and modification time
+        equal the ones recorded with the run, so its content is not read.
+
+        Args:
+            trace_path (Union[str, Path]): The trace file, as passed to record_run.
+            file_stat (os.stat_result): The current ``os.stat`` of the file.
+
+        Returns:
+            Optional[str]: The trace hash, None if no run of this file is stored.
+        """
+        row = self._connection.execute(
+            "SELECT trace_hash FROM runs WHERE trace_path = ? AND trace_size = ? "
+            "AND trace_mtime_ns = ? ORDER BY analyzed_at DESC LIMIT 1",
+            (str(trace_path), file_stat.st_size, file_stat.st_mtime_ns),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def record_run(
+        self,
+        trace_hash: str,
+        ruleset_hash: str,
+        records: Iterable[EventRecord],
+        rig: Optional[str] = None,
+        trace_path: Optional[Union[str, Path]] = None,
+        session_time: Optional[float] = None,
+        file_stat: Optional[os.stat_result] = None,
+    ) -> int:
+        """
+        Stores the events of one analyzed trace, replacing earlier runs of it.
+
+        A trace is one session, so a run stored with another ruleset (or by
+        older code) is replaced too and the session is never counted twice.
+
+        Args:
+            trace_hash (str): The hash of the trace content, see file_hash.
+            ruleset_hash (str): The hash of the ruleset.
+            records (Iterable[EventRecord]): The detected events in detection order.
+            rig (Optional[str]): Name of the machine the trace was recorded on.
+            trace_path (Optional[Union[str, Path]]): Where the trace was read from.
+            session_time (Optional[float]): Unix time of the session, defaults to the
+                                            trace modification time or now.
+            file_stat (Optional[os.stat_result]): The ``os.stat`` of the trace taken
+                                                  before it was read, see
+                                                  unchanged_trace_hash.
+
+        Returns:
+            int: The id of the stored run.
+        """
+        now = time.time()
+        if session_time is None:
+            try:
+                if file_stat is None and trace_path:
+                    file_stat = Path(trace_path).stat()
+                session_time = file_stat.st_mtime if file_stat else now
+            except OSError:
+                session_time = now
+
+        counts: Dict[str, int] = {}
+        rows = []
+        for seq, record in enumerate(records):
+            counts[record.rule_id] = counts.get(record.rule_id, 0) + 1
+            rows.append(
+                (
+                    seq,
+                    record.rule_id,
+                    record.timestamp,
+                    record.found_in_file,
+                    record.message,
+                    json.dumps(record.captured_data),
+                )
+            )
+
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM runs WHERE trace_hash = ?", (trace_hash,)
+            )
+            cursor = self._connection.execute(
+                "INSERT INTO runs (trace_hash, ruleset_hash, rig, trace_path, "
+                "trace_size, trace_mtime_ns, session_time, analyzed_at, event_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    trace_hash,
+                    ruleset_hash,
+                    rig,
+                    str(trace_path) if trace_path is not None else None,
+                    file_stat.st_size if file_stat is not None else None,
+                    file_stat.st_mtime_ns if file_stat is not None else None,
+                    session_time,
+                    now,
+                    len(rows),
+                ),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None
+            self._connection.executemany(
+                "INSERT INTO events (run_id, seq, rule_id, timestamp, found_in_file, "
+                "message, captured_data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, *row) for row in rows),
+            )
+            self._connection.executemany(
+                "INSERT INTO rule_counts (run_id, rule_id, count) VALUES (?, ?, ?)",
+                ((run_id, rule_id, count) for rule_id, count in counts.items()),
+            )
+        return run_id
+
+    def rule_counts(
+        self, rule_id: str, rig: Optional[str] = None
+    ) -> List[RuleCountRow]:
+        """
+        Returns the count of a rule in every stored session, oldest first.
+
+        Sessions in which the rule did not fire are included with a count of 0.
+
+        Args:
+            rule_id (str): The rule to count.
+            rig (Optional[str]): Only sessions recorded on this rig.
+
+        Returns:
+            List[RuleCountRow]: One row per stored session.
+        """
+        query = (
+            "SELECT runs.trace_path, runs.rig, runs.session_time, "
+            "COALESCE(rule_counts.count, 0) FROM runs "
+            "LEFT JOIN rule_counts ON rule_counts.run_id = runs.id "
+            "AND rule_counts.rule_id = ?"
+        )
+        params: List[Any] = [rule_id]
+        if rig is not None:
+            query += " WHERE runs.rig = ?"
+            params.append(rig)
+        query += " ORDER BY runs.session_time, runs.id"
+        return [RuleCountRow(*row) for row in self._connection.execute(query, params)]
+
+    def weekly_counts(
+        self, rule_id: str = THROTTLING_RULE, rig: Optional[str] = None
+    ) -> List[WeeklyCountRow]:
+        """
+        Sums the events of a rule per ISO week of the session time (UTC).
+
+        Args:
+            rule_id (str): The rule to count, FFB throttling by default.
+            rig (Optional[str]): Only sessions recorded on this rig.
+
+        Returns:
+            List[WeeklyCountRow]: One row per week with stored sessions, oldest first.
+        """
+        query = (
+            "SELECT iso_week(runs.session_time) AS week, "
+            "COUNT(*), COUNT(rule_counts.count), COALESCE(SUM(rule_counts.count), 0) "
+            "FROM runs LEFT JOIN rule_counts ON rule_counts.run_id = runs.id "
+            "AND rule_counts.rule_id = ?"
+        )
+        params: List[Any] = [rule_id]
+        if rig is not None:
+            query += " WHERE runs.rig = ?"
+            params.append(rig)
+        query += " GROUP BY week ORDER BY week"
+        return [WeeklyCountRow(*row) for row in self._connection.execute(query, params)]
+
+    def _migrate(self) -> None:
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version == SCHEMA_VERSION:
+            return
+        with self._connection:
+            for table in ("rule_counts", "events", "runs"):
+                self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _iso_week(timestamp: float) -> str:
+    # SQLite only knows %G-%V since 3.46, so ISO weeks are computed here; the
+    # days around New Year belong to the week of their Thursday.
+    year, week, _ = datetime.fromtimestamp(timestamp, timezone.utc).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def results_key(ruleset_hash: str) -> str:
+    """
+    Combines a ruleset hash with the version of the stored results.
+
+    Args:
+        ruleset_hash (str): The hash of the ruleset, e.g. file_hash of patterns.yaml.
+
+    Returns:
+        str: The key runs are stored and looked up under.
+    """
+    return f"{ruleset_hash}|v{RESULTS_FORMAT_VERSION}"
+
+
+def analyze_cached(
+    analyzer: LogAnalyzer,
+    history: HistoryStore,
+    trace_path: Union[str, Path],
+    ruleset_hash: str,
+    rig: Optional[str] = None,
+) -> bool:
+    """
+    Analyzes a trace file, or replays its stored events if it was analyzed before.
+
+    Either way the events reach the analyzer's store and aggregators exactly
+    as if the trace had been parsed. New results are written to the history.
+
+    A trace whose size and modification time are unchanged since its stored
+    run is replayed without reading it. Any other trace is read once: it is
+    hashed while it is parsed, so a moved or touched copy of an analyzed
+    trace is parsed again (and its run replaced) rather than replayed.
+
+    Args:
+        analyzer (LogAnalyzer): The analyzer with loaded rules and ``keep_events`` set.
+        history (HistoryStore): The history to look up and record in.
+        trace_path (Union[str, Path]): The trace file.
+        ruleset_hash (str): The hash of the loaded ruleset; combined with
+                            RESULTS_FORMAT_VERSION, see results_key.
+        rig (Optional[str]): Name of the machine the trace was recorded on.
+
+    Returns:
+        bool: True on a cache hit.
+    """
+    # Taken before reading: a trace that grows meanwhile no longer matches.
+    file_stat = os.stat(trace_path)
+    ruleset_hash = results_key(ruleset_hash)
+    trace_hash = history.unchanged_trace_hash(trace_path, file_stat)
+    if trace_hash is not None:
+        records = history.lookup(trace_hash, ruleset_hash)
+        if records is not None:
+            analyzer.extend_records(records)
+            return True
+
+    digest = hashlib.sha256()
+    first = len(analyzer.event_store)
+    analyzer.process_stream(iter_file_blocks(trace_path, on_read=digest.update))
+    history.record_run(
+        digest.hexdigest(),
+        ruleset_hash,
+        analyzer.event_store.iter_records(first),
+        rig=rig,
+        trace_path=trace_path,
+        file_stat=file_stat,
+    )
+    return False
@@ -0,0 +1,213 @@
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import threading
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+# Size of the read buffer used when a trace is opened from a path.
+# Large enough to keep syscalls rare, small enough to keep memory bounded.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Number of decompressed blocks the reader thread may run ahead of the parser.
+PREFETCH_DEPTH = 4
+
+# Suffixes of the compressed trace archives that are read transparently.
+COMPRESSED_SUFFIXES = (".gz", ".xz", ".bz2")
+
+LogSource = Union[str, "os.PathLike[str]", BinaryIO, Iterable[str], Iterable[bytes]]
+
+# Leading bytes of every supported archive format.
+_MAGIC_BYTES: List[Tuple[bytes, str]] = [
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"BZh", "bz2"),
+]
+
+_OPENERS: Dict[str, Callable[..., Any]] = {
+    "gzip": gzip.open,
+    "xz": lzma.open,
+    "bz2": bz2.open,
+}
+
+
+def compression_of(path: Union[str, "os.PathLike[str]"]) -> Optional[str]:
+    """
+    Detects whether a file is a compressed archive from its first bytes.
+
+    Args:
+        path: The file to inspect.
+
+    Returns:
+        Optional[str]: ``gzip``, ``xz`` or ``bz2``, or None for plain text.
+    """
+    with open(path, "rb") as file:
+        head = file.read(6)
+    for magic, compression in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def iter_log_lines(
+    source: LogSource,
+    encoding: str = "utf-8",
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[str]:
+    """
+    Lazily yields the lines of a log source without loading it into memory.
+
+    Line boundaries follow ``str.splitlines()``, so feeding the result to the
+    analyzer gives the same lines as reading the whole file and splitting it.
+    Paths to gzip, xz and bz2 archives are decompressed on the fly by a
+    reader thread that runs ahead of the parser, so decompression overlaps
+    with matching and nothing is written to disk.
+
+    Args:
+        source: A path to a (possibly compressed) log file, a binary file
+            object or any iterable of (possibly newline-terminated) ``str``
+            or ``bytes`` chunks.
+        encoding: The encoding used to decode ``bytes`` input.
+        buffer_size: The read buffer size used when ``source`` is a path.
+
+    Yields:
+        str: The individual log lines without line terminators.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        yield from _split_lines(iter_file_blocks(source, buffer_size), encoding)
+        return
+
+    yield from _split_lines(source, encoding)
+
+
+def iter_file_blocks(
+    path: Union[str, "os.PathLike[str]"],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    on_read: Optional[Callable[[bytes], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Lazily yields the content of a (possibly compressed) log file in blocks.
+
+    Every block ends on a line boundary, so the blocks can be fed to
+    ``iter_log_lines`` or ``LogAnalyzer.process_stream`` directly.
+
+    Args:
+        path: The log file; gzip, xz and bz2 archives are decompressed.
+        buffer_size: The size of the blocks read from the file.
+        on_read: Called with the raw bytes of the file as they are read,
+            before decompression, e.g. the ``update`` method of a hash. By
+            the time the iterator is exhausted it has seen the whole file.
+
+    Yields:
+        bytes: The (decompressed) content of the file.
+    """
+    compression = compression_of(path)
+    with open(path, "rb", buffering=buffer_size) as file:
+        raw = (
+            file if on_read is None else cast(BinaryIO, _ObservedReader(file, on_read))
+        )
+        if compression is None:
+            yield from _read_blocks(raw, buffer_size)
+        else:
+            with _OPENERS[compression](raw, "rb") as archive:
+                yield from _prefetch_blocks(archive, buffer_size)
+        if on_read is not None:
+            # A decompressor may stop before trailing bytes after the archive.
+            for _ in iter(lambda: raw.read(buffer_size), b""):
+                pass
+
+
+def _split_lines(chunks: Iterable[Union[str, bytes]], encoding: str) -> Iterator[str]:
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode(encoding)
+        # Binary files only split on b"\n"; splitlines() also handles "\r\n",
+        # lone "\r" and the other separators text mode + splitlines() honour.
+        yield from chunk.splitlines()
+
+
+def _read_blocks(file: BinaryIO, block_size: int) -> Iterator[bytes]:
+    # Decoding and splitting whole blocks is much cheaper than doing it line
+    # by line; every block is extended to the next b"\n" so no line is cut.
+    while True:
+        block = file.read(block_size)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += file.readline()
+        yield block
+
+
+def _prefetch_blocks(file: BinaryIO, block_size: int) -> Iterator[bytes]:
+    # Runs _read_blocks on a separate thread. zlib, lzma and bz2
+    # release the GIL while decompressing, so this runs in parallel with the
+    # parser; the bounded queue keeps at most PREFETCH_DEPTH blocks in memory.
+    blocks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=PREFETCH_DEPTH)
+    errors: List[BaseException] = []
+    stop = threading.Event()
+
+    def put(block: Optional[bytes]) -> bool:
+        while not stop.is_set():
+            try:
+                blocks.put(block, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        try:
+            for block in _read_blocks(file, block_size):
+                if not put(block):
+                    return
+        except BaseException as exc:
+            errors.append(exc)
+        put(None)
+
+    reader = threading.Thread(target=read, name="trace-decompress", daemon=True)
+    reader.start()
+    try:
+        while True:
+            block = blocks.get()
+            if block is None:
+                break
+            yield block
+        if errors:
+            raise errors[0]
+    finally:
+        # Also reached when the consumer stops early; the reader then gives
+        # up on its next put and the archive can be closed safely.
+        stop.set()
+        reader.join()
+
+
+class _ObservedReader:
+    # Passes the bytes read from a file to a callback; only implements what
+    # _read_blocks and the decompressors use.
+
+    def __init__(self, file: BinaryIO, on_read: Callable[[bytes], None]):
+        self._file = file
+        self._on_read = on_read
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._on_read(data)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        data = self._file.readline(size)
+        self._on_read(data)
+        return data
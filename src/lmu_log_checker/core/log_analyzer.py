@@ -1,9 +1,52 @@
+import io
 import re
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
-from lmu_log_checker.core.models import AnalysisEvent, AnalysisRule, LogLine
+from lmu_log_checker.core.aggregators import Aggregator
+from lmu_log_checker.core.event_store import EventStore
+from lmu_log_checker.core.ingest import LogSource, iter_log_lines
+from lmu_log_checker.core.matcher import (
+    AdaptiveRuleMatcher,
+    RuleMatcher,
+    exclusive_runs,
+)
+from lmu_log_checker.core.models import AnalysisEvent, AnalysisRule, EventRecord
+from lmu_log_checker.core.profiling import ProfilingRuleMatcher, RuleProfiler
+from lmu_log_checker.core.rule_lint import check_rules
+from lmu_log_checker.core.templates import TemplateMiner
+
+
+def parse_rules(
+    rules_data: Dict[str, Any], lint: bool = True, measure: bool = False
+) -> List[AnalysisRule]:
+    """
+    Validates rule definitions into AnalysisRule models.
+
+    Args:
+        rules_data: A dictionary containing a 'rules' key with a list of rule definitions.
+        lint: Run the rule linter (see ``rule_lint.check_rules``) over the result.
+        measure: Let the linter also time the rules (slow, depends on machine load).
+
+    Returns:
+        List[AnalysisRule]: The rules in declaration order; non-dict entries are skipped.
+
+    Raises:
+        RuleLintError: If linting is enabled and a rule is rejected.
+    """
+    rules_list = rules_data.get("rules", [])
+    if not isinstance(rules_list, list):
+        raise ValueError("The 'rules' key in rules_data must be a list.")
+
+    rules = [
+        AnalysisRule(**rule_data)
+        for rule_data in rules_list
+        if isinstance(rule_data, dict)
+    ]
+    if lint:
+        check_rules(rules, measure=measure)
+    return rules
 
 
 class LogAnalyzer(BaseModel):
@@ -19,7 +62,107 @@ class LogAnalyzer(BaseModel):
     )
 
     rules: List[AnalysisRule] = []
-    events: List[AnalysisEvent] = []
+
+    # Set to False to only feed the attached aggregators and not store events.
+    keep_events: bool = True
+
+    # Try the rules of an exclusive group most frequent first (see
+    # AdaptiveRuleMatcher); set to False to always use declaration order.
+    adaptive_order: bool = True
+
+    # Matches are stored in a columnar EventStore; AnalysisEvent models are
+    # only built (and cached) when ``events`` is accessed.
+    _store: EventStore = PrivateAttr(default_factory=EventStore)
+    _event_models: List[AnalysisEvent] = []
+    _aggregators: List[Aggregator] = []
+
+    # Dispatch index: trigger_file -> matcher over the candidate rules in
+    # declaration order, already merged with the unscoped rules. Lines from
+    # files that no rule is scoped to only ever see the unscoped rules.
+    _matchers_by_file: Dict[str, RuleMatcher] = {}
+    _unscoped_matcher: RuleMatcher = RuleMatcher([])
+    _indexed_rules: Optional[List[AnalysisRule]] = None
+    _indexed_count: int = 0
+
+    # Set while rule profiling is enabled; the dispatch index is then built
+    # from ProfilingRuleMatchers instead.
+    _profiler: Optional[RuleProfiler] = None
+
+    # Hit counts from a saved profile, used to seed the adaptive matchers.
+    _rule_priors: Dict[str, int] = {}
+
+    # Set while template mining is enabled; receives every well-formed line
+    # that no rule matched.
+    _template_miner: Optional[TemplateMiner] = None
+
+    @property
+    def events(self) -> List[AnalysisEvent]:
+        """
+        The detected events as AnalysisEvent models, in detection order.
+        """
+        if len(self._event_models) != len(self._store):
+            self._event_models.extend(
+                record.to_model()
+                for record in self._store.iter_records(len(self._event_models))
+            )
+        return self._event_models
+
+    @events.setter
+    def events(self, events: List[AnalysisEvent]) -> None:
+        self._store = EventStore(EventRecord.from_model(event) for event in events)
+        self._event_models = list(events)
+
+    @property
+    def records(self) -> List[EventRecord]:
+        """
+        A snapshot of the detected events as EventRecords, in detection order.
+        """
+        return list(self._store)
+
+    @property
+    def event_store(self) -> EventStore:
+        """
+        The columnar store holding the detected events.
+        """
+        return self._store
+
+    def extend_records(self, records: Iterable[EventRecord]) -> None:
+        """
+        Appends events that were detected elsewhere, e.g. in a worker process.
+
+        Args:
+            records: The records to append, in detection order.
+        """
+        sinks = self._event_sinks()
+        for record in records:
+            for sink in sinks:
+                sink(*record)
+
+    def add_aggregator(self, aggregator: Aggregator) -> None:
+        """
+        Attaches an aggregator that is fed every event while matching.
+
+        Args:
+            aggregator: The aggregator to attach.
+        """
+        self._aggregators.append(aggregator)
+
+    def remove_aggregator(self, aggregator: Aggregator) -> None:
+        """
+        Detaches an aggregator attached with add_aggregator.
+
+        Args:
+            aggregator: The aggregator to detach.
+        """
+        self._aggregators.remove(aggregator)
+
+    def _event_sinks(self) -> List[Callable[..., None]]:
+        sinks: List[Callable[..., None]] = [
+            aggregator.add for aggregator in self._aggregators
+        ]
+        if self.keep_events:
+            sinks.insert(0, self._store.append)
+        return sinks
 
     def load_rules(self, rules_data: Dict[str, Any]) -> None:
         """
@@ -28,17 +171,149 @@ class LogAnalyzer(BaseModel):
         Args:
             rules_data: A dictionary containing a 'rules' key with a list of rule definitions.
         """
-        rules_list = rules_data.get("rules", [])
-        if not isinstance(rules_list, list):
-            raise ValueError("The 'rules' key in rules_data must be a list.")
+        self.add_rules(parse_rules(rules_data))
 
-        for rule_data in rules_list:
-            if not isinstance(rule_data, dict):
-                continue
-            rule = AnalysisRule(**rule_data)
+    def add_rules(self, rules: Iterable[AnalysisRule]) -> None:
+        """
+        Adds already validated rules, e.g. from the compiled ruleset cache.
+
+        Args:
+            rules: The rules to add, in declaration order.
+        """
+        for rule in rules:
             rule.compile()
             self.rules.append(rule)
 
+        self._build_dispatch_index()
+
+    def enable_rule_profiling(self) -> RuleProfiler:
+        """
+        Starts recording per-rule attempts, hits and time for subsequent matching.
+
+        Profiling swaps in instrumented matchers, so the regular path stays
+        free of any bookkeeping while it is disabled. It only covers matching
+        in this process, not ``analyze_parallel`` workers.
+
+        Returns:
+            RuleProfiler: The profiler that collects the counters.
+        """
+        if self._profiler is None:
+            self._profiler = RuleProfiler()
+            self._build_dispatch_index()
+        return self._profiler
+
+    def disable_rule_profiling(self) -> None:
+        """
+        Switches back to the uninstrumented matchers.
+        """
+        if self._profiler is not None:
+            self._profiler = None
+            self._build_dispatch_index()
+
+    @property
+    def rule_profiler(self) -> Optional[RuleProfiler]:
+        """
+        The active profiler, or None while profiling is disabled.
+        """
+        return self._profiler
+
+    def enable_template_mining(
+        self, miner: Optional[TemplateMiner] = None
+    ) -> TemplateMiner:
+        """
+        Starts clustering the messages that match no rule into templates.
+
+        Args:
+            miner (Optional[TemplateMiner]): The miner to feed, a new one by default.
+
+        Returns:
+            TemplateMiner: The miner that collects the templates.
+        """
+        if miner is not None or self._template_miner is None:
+            self._template_miner = miner or TemplateMiner()
+        return self._template_miner
+
+    def disable_template_mining(self) -> None:
+        """
+        Stops feeding unmatched messages to the template miner.
+        """
+        self._template_miner = None
+
+    @property
+    def template_miner(self) -> Optional[TemplateMiner]:
+        """
+        The active template miner, or None while mining is disabled.
+        """
+        return self._template_miner
+
+    def set_rule_priors(self, counts: Dict[str, int]) -> None:
+        """
+        Seeds the adaptive evaluation order with hit counts from an earlier run.
+
+        Args:
+            counts (Dict[str, int]): rule_id -> hits, e.g. from rule_hit_counts().
+        """
+        self._rule_priors = dict(counts)
+        self._build_dispatch_index()
+
+    def rule_hit_counts(self) -> Dict[str, int]:
+        """
+        Returns the hits of the rules in exclusive groups, including the priors.
+
+        Returns:
+            Dict[str, int]: rule_id -> hits, suitable for set_rule_priors().
+        """
+        priors = self._rule_priors
+        grouped = {rule.id for rule in self.rules if rule.exclusive_group}
+        counts = {rule_id: priors.get(rule_id, 0) for rule_id in grouped}
+        for matcher in self._matchers():
+            if isinstance(matcher, AdaptiveRuleMatcher):
+                for rule_id, hits in matcher.hits.items():
+                    if rule_id in grouped:
+                        counts[rule_id] += hits - priors.get(rule_id, 0)
+        return counts
+
+    def _matchers(self) -> List[RuleMatcher]:
+        self._ensure_dispatch_index()
+        return [*self._matchers_by_file.values(), self._unscoped_matcher]
+
+    def _make_matcher(self, rules: List[AnalysisRule]) -> RuleMatcher:
+        if self._profiler is not None:
+            return ProfilingRuleMatcher(rules, self._profiler)
+        if self.adaptive_order and exclusive_runs(rules):
+            return AdaptiveRuleMatcher(rules, priors=self._rule_priors)
+        return RuleMatcher(rules)
+
+    def _build_dispatch_index(self) -> None:
+        """
+        Precomputes the candidate rules and their matcher for every trigger file.
+        """
+        by_file: Dict[str, RuleMatcher] = {}
+        for rule in self.rules:
+            if rule.trigger_file and rule.trigger_file not in by_file:
+                by_file[rule.trigger_file] = self._make_matcher(
+                    [
+                        candidate
+                        for candidate in self.rules
+                        if not candidate.trigger_file
+                        or candidate.trigger_file == rule.trigger_file
+                    ]
+                )
+
+        self._matchers_by_file = by_file
+        self._unscoped_matcher = self._make_matcher(
+            [rule for rule in self.rules if not rule.trigger_file]
+        )
+        self._indexed_rules = self.rules
+        self._indexed_count = len(self.rules)
+
+    def _ensure_dispatch_index(self) -> None:
+        # Rules may have been assigned or appended without load_rules().
+        if self._indexed_rules is not self.rules or self._indexed_count != len(
+            self.rules
+        ):
+            self._build_dispatch_index()
+
     def process_log_file(self, file_content: str) -> None:
         """
         Processes the content of a log file and matches it against loaded rules.
@@ -46,35 +321,39 @@ class LogAnalyzer(BaseModel):
         Args:
             file_content: The string content of the log file.
         """
-        for line in file_content.splitlines():
-            match = self.LOG_PATTERN.match(line)
-            if not match:
-                continue
+        self.process_stream(io.StringIO(file_content))
 
-            data = match.groupdict()
-            log_entry = LogLine(
-                timestamp=float(data["timestamp"]),
-                file=data["file"],
-                line_number=int(data["line_number"]),
-                message=data["message"],
-            )
+    def process_stream(self, source: LogSource) -> None:
+        """
+        Processes a log source line by line in bounded memory.
+
+        Args:
+            source: A path to a log file, a binary file object or any iterable
+                of log lines (see ``iter_log_lines``).
+        """
+        self._ensure_dispatch_index()
+        log_match = self.LOG_PATTERN.match
+        matchers_get = self._matchers_by_file.get
+        unscoped_matcher = self._unscoped_matcher
+        sinks = self._event_sinks()
+        unmatched = self._template_miner.add if self._template_miner else None
 
-            for rule in self.rules:
-                if rule.trigger_file and rule.trigger_file != log_entry.file:
-                    continue
+        for line in iter_log_lines(source):
+            log_match_result = log_match(line)
+            if not log_match_result:
+                continue
 
-                extracted_data = rule.match(log_entry.message)
+            timestamp, file, _, message = log_match_result.groups()
+            result = matchers_get(file, unscoped_matcher).match(message)
+            if result is None:
+                if unmatched is not None:
+                    unmatched(file, message)
+                continue
 
-                if extracted_data is not None:
-                    event = AnalysisEvent(
-                        rule_id=rule.id,
-                        message=log_entry.message,
-                        timestamp=log_entry.timestamp,
-                        found_in_file=log_entry.file,
-                        captured_data=extracted_data,
-                    )
-                    self.events.append(event)
-                    break
+            rule, extracted_data = result
+            event_timestamp = float(timestamp)
+            for sink in sinks:
+                sink(rule.id, event_timestamp, file, message, extracted_data)
 
     def generate_report_json(self) -> List[Dict[str, Any]]:
         """
@@ -83,4 +362,14 @@ class LogAnalyzer(BaseModel):
         Returns:
             A list of dictionaries representing the analysis events.
         """
-        return [event.model_dump() for event in self.events]
+        return list(self.iter_report_json())
+
+    def iter_report_json(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields the report of ``generate_report_json`` one event at a time.
+
+        Yields:
+            A dictionary representing the next analysis event.
+        """
+        for record in self._store:
+            yield record.to_dict()
@@ -0,0 +1,344 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lmu_log_checker.core.models import AnalysisRule
+
+# Literals shorter than this reject too few lines to be worth the check.
+MIN_LITERAL_LENGTH = 3
+
+_QUANTIFIERS = "*+?"
+
+
+def required_literals(pattern: str) -> Optional[Tuple[str, ...]]:
+    """
+    Extracts lowercase literals of which at least one must occur in any match.
+
+    The extraction is deliberately conservative: it only looks at the top-level
+    sequence of each alternative, skips groups and character classes and gives
+    up on anything it does not understand. A line that contains none of the
+    returned literals can therefore never match the pattern.
+
+    Args:
+        pattern (str): The regular expression of an AnalysisRule.
+
+    Returns:
+        Optional[Tuple[str, ...]]: One required literal per top-level
+                                   alternative, or None if no usable literal
+                                   could be found.
+    """
+    try:
+        if re.compile(pattern).flags & re.VERBOSE:
+            return None
+    except re.error:
+        return None
+
+    literals: List[str] = []
+    for branch in _split_top_level_branches(pattern):
+        runs = _literal_runs(branch)
+        if not runs:
+            return None
+        longest = max(runs, key=len)
+        if len(longest) < MIN_LITERAL_LENGTH or not longest.isascii():
+            return None
+        literals.append(longest.lower())
+    return tuple(literals)
+
+
+def _split_top_level_branches(pattern: str) -> List[str]:
+    branches: List[str] = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i = _skip_escape(pattern, i)
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _literal_runs(branch: str) -> List[str]:
+    runs: List[str] = []
+    run: List[str] = []
+    last_was_literal = False
+    i = 0
+
+    def close_run() -> None:
+        if run:
+            runs.append("".join(run))
+            run.clear()
+
+    while i < len(branch):
+        char = branch[i]
+        if char in _QUANTIFIERS or char == "{":
+            # The quantified atom is optional or repeated: it may not be
+            # part of a contiguous literal.
+            if last_was_literal:
+                run.pop()
+            close_run()
+            if char == "{":
+                # Anything after a brace is left alone; "{" may be a literal
+                # or a quantifier depending on its contents.
+                break
+            i += 1
+            # Lazy "?" / possessive "+" modifiers belong to the quantifier.
+            if i < len(branch) and branch[i] in "?+":
+                i += 1
+            last_was_literal = False
+            continue
+
+        close_literal = True
+        if char == "\\":
+            escaped = branch[i + 1 : i + 2]
+            if escaped and not escaped.isalnum():
+                run.append(escaped)
+                close_literal = False
+            # \x41, \101, \u0041 or \N{...} also end the run, as a whole.
+            i = _skip_escape(branch, i)
+        elif char == "[":
+            i = _skip_class(branch, i)
+        elif char == "(":
+            i = _skip_group(branch, i)
+        elif char in ".^$":
+            i += 1
+        else:
+            run.append(char)
+            close_literal = False
+            i += 1
+
+        if close_literal:
+            close_run()
+        last_was_literal = not close_literal
+
+    close_run()
+    return runs
+
+
+def _skip_escape(pattern: str, start: int) -> int:
+    # Returns the index after the escape starting with the backslash at start.
+    escaped = pattern[start + 1 : start + 2]
+    i = start + 2
+    if escaped == "x":
+        return _skip_while(pattern, i, "0123456789abcdefABCDEF", 2)
+    if escaped == "u":
+        return _skip_while(pattern, i, "0123456789abcdefABCDEF", 4)
+    if escaped == "U":
+        return _skip_while(pattern, i, "0123456789abcdefABCDEF", 8)
+    if escaped == "N" and pattern[i : i + 1] == "{":
+        end = pattern.find("}", i)
+        return len(pattern) if end == -1 else end + 1
+    if escaped.isdigit():
+        # An octal escape (\0, \101) or a group reference (\1, \12).
+        return _skip_while(pattern, i, "0123456789", 2)
+    return i
+
+
+def _skip_while(pattern: str, start: int, chars: str, limit: int) -> int:
+    i = start
+    while i < len(pattern) and i - start < limit and pattern[i] in chars:
+        i += 1
+    return i
+
+
+def _skip_class(pattern: str, start: int) -> int:
+    i = start + 1
+    if pattern[i : i + 1] == "^":
+        i += 1
+    if pattern[i : i + 1] == "]":
+        i += 1
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i = _skip_escape(pattern, i)
+            continue
+        if pattern[i] == "]":
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_group(pattern: str, start: int) -> int:
+    depth = 0
+    i = start
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i = _skip_escape(pattern, i)
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+class RuleMatcher:
+    """
+    Evaluates an ordered list of rules with a literal prefilter.
+
+    Every rule is paired with the literals its pattern requires. For ASCII
+    messages the regex of a rule only runs if one of its literals occurs in
+    the lowercased message, so lines that match no rule are rejected with a
+    few substring scans. Non-ASCII messages skip the prefilter, because
+    case-insensitive regex matching and ``str.lower()`` disagree on some
+    Unicode characters.
+    """
+
+    __slots__ = ("rules", "_entries")
+
+    def __init__(self, rules: Sequence[AnalysisRule]):
+        """
+        Initializes the matcher for the given rules.
+
+        Args:
+            rules (Sequence[AnalysisRule]): The candidate rules in evaluation order.
+        """
+        self.rules = list(rules)
+        self._entries = [
+            (rule, required_literals(rule.pattern), rule.regex.search)
+            for rule in self.rules
+        ]
+
+    def match(self, message: str) -> Optional[Tuple[AnalysisRule, Dict[str, Any]]]:
+        """
+        Returns the first rule matching the message and its captured data.
+
+        Args:
+            message (str): The log message to check.
+
+        Returns:
+            Optional[Tuple[AnalysisRule, Dict[str, Any]]]: The matching rule and
+                                                           its named groups, or None.
+        """
+        if not message.isascii():
+            for rule, _, search in self._entries:
+                match = search(message)
+                if match:
+                    return rule, match.groupdict()
+            return None
+
+        lowered = message.lower()
+        for rule, literals, search in self._entries:
+            if literals is not None:
+                for literal in literals:
+                    if literal in lowered:
+                        break
+                else:
+                    continue
+
+            match = search(message)
+            if match:
+                return rule, match.groupdict()
+        return None
+
+
+def exclusive_runs(rules: Sequence[AnalysisRule]) -> List[Tuple[int, int]]:
+    """
+    Finds the stretches of rules that may be evaluated in any order.
+
+    Only consecutive rules of the same exclusive group can be reordered:
+    moving a rule past a rule outside its group could change which rule
+    matches first.
+
+    Args:
+        rules (Sequence[AnalysisRule]): The candidate rules in evaluation order.
+
+    Returns:
+        List[Tuple[int, int]]: ``(start, stop)`` slices of at least two rules.
+    """
+    runs = []
+    start = 0
+    for index in range(1, len(rules) + 1):
+        group = rules[start].exclusive_group
+        if (
+            index < len(rules)
+            and group is not None
+            and rules[index].exclusive_group == group
+        ):
+            continue
+        if index - start > 1:
+            runs.append((start, index))
+        start = index
+    return runs
+
+
+class AdaptiveRuleMatcher(RuleMatcher):
+    """
+    A RuleMatcher that tries the most frequent rules of exclusive groups first.
+
+    Hits are counted per rule, and every ``reorder_interval`` hits each run
+    of consecutive rules from the same exclusive group (see exclusive_runs)
+    is sorted by hit count. Rules outside the runs keep their position, so
+    the result is the same as in declaration order as long as the groups
+    really are mutually exclusive. Counts can be seeded from a saved profile.
+    """
+
+    __slots__ = ("hits", "reorder_interval", "_runs", "_pending")
+
+    def __init__(
+        self,
+        rules: Sequence[AnalysisRule],
+        priors: Optional[Dict[str, int]] = None,
+        reorder_interval: int = 256,
+    ):
+        """
+        Initializes the matcher for the given rules.
+
+        Args:
+            rules (Sequence[AnalysisRule]): The candidate rules in declaration order.
+            priors (Optional[Dict[str, int]]): Hit counts from earlier runs, rule_id -> hits.
+            reorder_interval (int): Number of hits between two reorderings.
+        """
+        super().__init__(rules)
+        self._runs = exclusive_runs(self.rules)
+        self.reorder_interval = reorder_interval
+        self.hits: Dict[str, int] = {
+            rule.id: (priors or {}).get(rule.id, 0) for rule in self.rules
+        }
+        self._pending = 0
+        self.reorder()
+
+    def match(self, message: str) -> Optional[Tuple[AnalysisRule, Dict[str, Any]]]:
+        result = RuleMatcher.match(self, message)
+        if result is not None:
+            self.hits[result[0].id] += 1
+            self._pending += 1
+            if self._pending >= self.reorder_interval:
+                self.reorder()
+        return result
+
+    def reorder(self) -> None:
+        """
+        Sorts every exclusive run by hit count, keeping the order of ties.
+        """
+        self._pending = 0
+        hits = self.hits
+        entries = self._entries
+        for start, stop in self._runs:
+            entries[start:stop] = sorted(
+                entries[start:stop], key=lambda entry: -hits[entry[0].id]
+            )
+
+    @property
+    def evaluation_order(self) -> List[str]:
+        """
+        The rule ids in the order they are currently tried.
+        """
+        return [entry[0].id for entry in self._entries]
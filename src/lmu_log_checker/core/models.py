@@ -1,5 +1,5 @@
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, NamedTuple, Optional
 
 from pydantic import BaseModel, Field
 
@@ -32,6 +32,10 @@ class AnalysisRule(BaseModel):
         pattern (str): The regular expression pattern used for matching.
         trigger_file (Optional[str]): If provided, the rule only applies to logs from this file.
         solution (Optional[str]): A suggested fix or action if the rule matches.
+        payload (Optional[Dict[str, Any]]): Extra data attached to every match, e.g. the
+                                            'new_state' of a state machine rule.
+        exclusive_group (Optional[str]): Rules sharing a group never match the same line,
+                                         so they may be evaluated in any order.
     """
 
     id: str
@@ -40,6 +44,8 @@ class AnalysisRule(BaseModel):
     pattern: str
     trigger_file: Optional[str] = None
     solution: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    exclusive_group: Optional[str] = None
 
     _compiled: Optional[re.Pattern] = None
 
@@ -49,6 +55,16 @@ class AnalysisRule(BaseModel):
         """
         self._compiled = re.compile(self.pattern, re.IGNORECASE)
 
+    @property
+    def regex(self) -> re.Pattern:
+        """
+        The compiled regex pattern, compiled on first access.
+        """
+        if not self._compiled:
+            self.compile()
+        assert self._compiled is not None
+        return self._compiled
+
     def match(self, text: str) -> Optional[Dict[str, Any]]:
         """
         Matches the rule's pattern against the provided text.
@@ -85,3 +101,55 @@ class AnalysisEvent(BaseModel):
     found_in_file: str
     message: str
     captured_data: Dict[str, Any] = Field(default_factory=dict)
+
+
+class EventRecord(NamedTuple):
+    """
+    Compact, tuple-backed form of an AnalysisEvent used on the analyzer hot path.
+
+    The fields mirror AnalysisEvent, so the pydantic model is only built when a
+    caller actually asks for it.
+    """
+
+    rule_id: str
+    timestamp: float
+    found_in_file: str
+    message: str
+    captured_data: Dict[str, Any]
+
+    @classmethod
+    def from_model(cls, event: AnalysisEvent) -> "EventRecord":
+        """
+        Creates a record from an existing AnalysisEvent.
+        """
+        return cls(
+            event.rule_id,
+            event.timestamp,
+            event.found_in_file,
+            event.message,
+            event.captured_data,
+        )
+
+    def to_model(self) -> AnalysisEvent:
+        """
+        Builds the AnalysisEvent for this record without re-validating it.
+        """
+        return AnalysisEvent.model_construct(
+            rule_id=self.rule_id,
+            timestamp=self.timestamp,
+            found_in_file=self.found_in_file,
+            message=self.message,
+            captured_data=self.captured_data,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the same dictionary as ``AnalysisEvent.model_dump()``.
+        """
+        return {
+            "rule_id": self.rule_id,
+            "timestamp": self.timestamp,
+            "found_in_file": self.found_in_file,
+            "message": self.message,
+            "captured_data": dict(self.captured_data),
+        }
@@ -0,0 +1,162 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from lmu_log_checker.core.ingest import compression_of
+from lmu_log_checker.core.log_analyzer import LogAnalyzer
+from lmu_log_checker.core.models import EventRecord
+
+# Files are not split into chunks smaller than this; below it the process
+# start-up costs more than parsing the chunk on one core.
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Bytes handed to the analyzer at a time while a worker walks its chunk.
+BLOCK_SIZE = 1024 * 1024
+
+# Analyzer of the current worker process, created once by init_worker.
+_worker_analyzer: Optional[LogAnalyzer] = None
+
+
+def split_chunks(path: Union[str, Path], chunks: int) -> List[Tuple[int, int]]:
+    """
+    Splits a file into byte ranges that start and end on line boundaries.
+
+    Args:
+        path (Union[str, Path]): The trace file.
+        chunks (int): The desired number of chunks.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) byte offsets covering the whole file, in order.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges: List[Tuple[int, int]] = []
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        start = 0
+        for i in range(1, chunks):
+            target = max(start, size * i // chunks)
+            newline = mm.find(b"\n", target)
+            if newline == -1:
+                break
+            end = newline + 1
+            if end > start:
+                ranges.append((start, end))
+                start = end
+        if start < size:
+            ranges.append((start, size))
+    return ranges
+
+
+def analyze_parallel(
+    analyzer: LogAnalyzer,
+    path: Union[str, Path],
+    workers: Optional[int] = None,
+    chunks: Optional[int] = None,
+) -> None:
+    """
+    Analyzes one trace file on several cores and adds its events to the analyzer.
+
+    The file is split at newline boundaries and every worker memory-maps it
+    and parses only its own byte range, so the file is never copied as a
+    whole into a worker. Chunk results are concatenated in file order, which
+    gives exactly the events of a sequential ``process_stream`` run.
+    Compressed archives are analyzed sequentially instead.
+
+    Args:
+        analyzer (LogAnalyzer): The analyzer with loaded rules that receives the events.
+        path (Union[str, Path]): The trace file.
+        workers (Optional[int]): Number of worker processes, defaults to the CPU count.
+        chunks (Optional[int]): Number of chunks, defaults to one per worker
+                                (but no chunk smaller than MIN_CHUNK_SIZE).
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunks is None:
+        chunks = max(1, min(workers, os.path.getsize(path) // MIN_CHUNK_SIZE))
+
+    # A compressed archive cannot be split at byte offsets.
+    ranges = [] if compression_of(path) else split_chunks(path, chunks)
+    if len(ranges) <= 1:
+        analyzer.process_stream(path)
+        return
+
+    rules_data = {"rules": [rule.model_dump() for rule in analyzer.rules]}
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ranges)),
+        initializer=init_worker,
+        initargs=(rules_data,),
+    ) as executor:
+        futures = [
+            executor.submit(analyze_chunk, str(path), start, end)
+            for start, end in ranges
+        ]
+        for future in futures:
+            analyzer.extend_records(future.result())
+
+
+def init_worker(rules_data: Dict[str, Any]) -> None:
+    """
+    Initializer of a worker process: compiles the rules once.
+
+    Args:
+        rules_data (Dict[str, Any]): The ruleset, as accepted by LogAnalyzer.load_rules.
+    """
+    global _worker_analyzer
+    _worker_analyzer = LogAnalyzer()
+    _worker_analyzer.load_rules(rules_data)
+
+
+def analyze_chunk(path: str, start: int, end: int) -> List[EventRecord]:
+    """
+    Parses a byte range of a trace in a worker set up by init_worker.
+
+    Args:
+        path (str): The uncompressed trace file.
+        start (int): The first byte of the range, at a line start.
+        end (int): The byte after the range, at a line start or the file end.
+
+    Returns:
+        List[EventRecord]: The events of the range.
+    """
+    assert _worker_analyzer is not None
+    _worker_analyzer.events = []
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        _worker_analyzer.process_stream(_iter_blocks(mm, start, end))
+    return _worker_analyzer.records
+
+
+def analyze_file(path: str) -> List[EventRecord]:
+    """
+    Parses a whole trace, compressed or not, in a worker set up by init_worker.
+
+    Args:
+        path (str): The trace file.
+
+    Returns:
+        List[EventRecord]: The events of the trace.
+    """
+    assert _worker_analyzer is not None
+    _worker_analyzer.events = []
+    _worker_analyzer.process_stream(path)
+    return _worker_analyzer.records
+
+
+def _iter_blocks(mm: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    # Yields newline-aligned blocks so no line is split across two blocks.
+    position = start
+    while position < end:
+        block_end = min(position + BLOCK_SIZE, end)
+        if block_end < end:
+            newline = mm.find(b"\n", block_end, end)
+            block_end = end if newline == -1 else newline + 1
+        yield mm[position:block_end]
+        position = block_end
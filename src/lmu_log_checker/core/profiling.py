@@ -0,0 +1,134 @@
+from time import perf_counter_ns
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from lmu_log_checker.core.matcher import RuleMatcher
+from lmu_log_checker.core.models import AnalysisRule
+
+
+class RuleProfile(NamedTuple):
+    """
+    What one rule cost during an analysis.
+
+    Attributes:
+        rule_id (str): The rule.
+        attempts (int): How often its regex ran.
+        skipped (int): How often the literal prefilter rejected the line first.
+        hits (int): How often it produced an event.
+        seconds (float): Time spent in its prefilter check and regex.
+    """
+
+    rule_id: str
+    attempts: int
+    skipped: int
+    hits: int
+    seconds: float
+
+
+class _RuleStats:
+    __slots__ = ("attempts", "skipped", "hits", "ns")
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.skipped = 0
+        self.hits = 0
+        self.ns = 0
+
+
+class RuleProfiler:
+    """
+    Collects per-rule evaluation counts and timings.
+
+    A profiler is filled by ProfilingRuleMatcher, which the analyzer only
+    uses while profiling is enabled, so the regular matching path carries no
+    instrumentation at all.
+    """
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self._stats: Dict[str, _RuleStats] = {}
+
+    def stats_for(self, rule_id: str) -> _RuleStats:
+        """
+        Returns the (shared) counters of a rule, creating them on first use.
+        """
+        stats = self._stats.get(rule_id)
+        if stats is None:
+            stats = self._stats[rule_id] = _RuleStats()
+        return stats
+
+    def report(self) -> List[RuleProfile]:
+        """
+        Returns the profile of every evaluated rule, most expensive first.
+
+        Returns:
+            List[RuleProfile]: One entry per rule.
+        """
+        profiles = [
+            RuleProfile(rule_id, s.attempts, s.skipped, s.hits, s.ns / 1e9)
+            for rule_id, s in self._stats.items()
+        ]
+        return sorted(profiles, key=lambda profile: profile.seconds, reverse=True)
+
+    @property
+    def total_seconds(self) -> float:
+        """
+        The time spent in all rules together.
+        """
+        return sum(stats.ns for stats in self._stats.values()) / 1e9
+
+    def reset(self) -> None:
+        """
+        Clears all counters.
+        """
+        self.messages = 0
+        for stats in self._stats.values():
+            stats.attempts = stats.skipped = stats.hits = stats.ns = 0
+
+
+class ProfilingRuleMatcher(RuleMatcher):
+    """
+    A RuleMatcher that records every prefilter check and regex evaluation.
+
+    Matches are identical to RuleMatcher; only the bookkeeping differs.
+    """
+
+    __slots__ = ("profiler", "_profiled_entries")
+
+    def __init__(self, rules: Sequence[AnalysisRule], profiler: RuleProfiler):
+        """
+        Initializes the matcher for the given rules.
+
+        Args:
+            rules (Sequence[AnalysisRule]): The candidate rules in evaluation order.
+            profiler (RuleProfiler): Where the counters are recorded.
+        """
+        super().__init__(rules)
+        self.profiler = profiler
+        self._profiled_entries = [
+            (rule, literals, search, profiler.stats_for(rule.id))
+            for rule, literals, search in self._entries
+        ]
+
+    def match(self, message: str) -> Optional[Tuple[AnalysisRule, Dict[str, Any]]]:
+        self.profiler.messages += 1
+        lowered = message.lower() if message.isascii() else None
+        clock = perf_counter_ns
+
+        for rule, literals, search, stats in self._profiled_entries:
+            start = clock()
+            if lowered is not None and literals is not None:
+                for literal in literals:
+                    if literal in lowered:
+                        break
+                else:
+                    stats.skipped += 1
+                    stats.ns += clock() - start
+                    continue
+
+            match = search(message)
+            stats.ns += clock() - start
+            stats.attempts += 1
+            if match:
+                stats.hits += 1
+                return rule, match.groupdict()
+        return None
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pydantic
+
+from _helper.cache_dir import default_cache_dir
+from lmu_log_checker.core.log_analyzer import parse_rules
+from lmu_log_checker.core.models import AnalysisRule
+
+# Bump whenever AnalysisRule or the cached payload changes shape.
+CACHE_FORMAT_VERSION = 4
+
+CACHE_FILE_PREFIX = "rules-"
+CACHE_FILE_SUFFIX = ".pickle"
+
+
+def ruleset_hash(content: bytes) -> str:
+    """
+    Hashes a ruleset file together with everything its cached form depends on.
+
+    Args:
+        content (bytes): The raw content of patterns.yaml.
+
+    Returns:
+        str: A hex digest that changes whenever the cache must be invalidated.
+    """
+    digest = hashlib.sha256(content)
+    digest.update(f"|{CACHE_FORMAT_VERSION}|{pydantic.VERSION}|{sys.version}".encode())
+    return digest.hexdigest()
+
+
+def load_ruleset(
+    patterns_path: Union[str, Path],
+    cache_dir: Optional[Union[str, Path]] = None,
+    use_cache: bool = True,
+) -> List[AnalysisRule]:
+    """
+    Loads and validates the rules of a patterns.yaml, using the on-disk cache.
+
+    On a cache hit the YAML parsing and pydantic validation are skipped. The
+    cache entry is keyed by ``ruleset_hash`` of the file content, so editing
+    the ruleset or upgrading pydantic/Python invalidates it. Unreadable or
+    inconsistent entries are treated as a miss and rewritten.
+
+    Args:
+        patterns_path (Union[str, Path]): The path to patterns.yaml.
+        cache_dir (Optional[Union[str, Path]]): Where to store the cache, see default_cache_dir.
+        use_cache (bool): Set to False to always parse the YAML file.
+
+    Returns:
+        List[AnalysisRule]: The validated rules in declaration order.
+    """
+    content = Path(patterns_path).read_bytes()
+    if not use_cache:
+        return _parse(content)
+
+    key = ruleset_hash(content)
+    directory = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    cache_file = directory / f"{CACHE_FILE_PREFIX}{key}{CACHE_FILE_SUFFIX}"
+
+    rules = _read_cache(cache_file, key)
+    if rules is not None:
+        return rules
+
+    rules = _parse(content)
+    _write_cache(directory, cache_file, key, rules)
+    return rules
+
+
+def _parse(content: bytes) -> List[AnalysisRule]:
+    # PyYAML is only imported on a miss; warm starts never load it.
+    import yaml
+
+    # Only the static lint: the timing depends on the machine load and would
+    # give the same ruleset a different verdict from run to run.
+    return parse_rules(yaml.safe_load(content))
+
+
+def _read_cache(cache_file: Path, key: str) -> Optional[List[AnalysisRule]]:
+    try:
+        with open(cache_file, "rb") as file:
+            payload = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Truncated or foreign file: drop it and rebuild.
+        _unlink_quietly(cache_file)
+        return None
+
+    if (
+        not isinstance(payload, dict)
+        or payload.get("key") != key
+        or not isinstance(payload.get("rules"), list)
+        or not all(isinstance(rule, AnalysisRule) for rule in payload["rules"])
+    ):
+        _unlink_quietly(cache_file)
+        return None
+    return payload["rules"]
+
+
+def _write_cache(
+    directory: Path, cache_file: Path, key: str, rules: List[AnalysisRule]
+) -> None:
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never see a
+        # partially written cache entry.
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump({"key": key, "rules": rules}, file)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        return
+
+    for stale in directory.glob(f"{CACHE_FILE_PREFIX}*{CACHE_FILE_SUFFIX}"):
+        if stale != cache_file:
+            _unlink_quietly(stale)
+
+
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
@@ -0,0 +1,449 @@
+import re
+import warnings
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from lmu_log_checker.core.models import AnalysisRule
+
+# The structural checks walk the parse tree of CPython's private regex
+# parser. It may be missing or change shape in any release; the checks are
+# then skipped and reported as STRUCTURE_SKIPPED instead of failing.
+try:
+    from re import _constants, _parser  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - depends on the interpreter
+    _constants = _parser = None
+
+INFO = "info"
+WARNING = "warning"
+ERROR = "error"
+
+# Realistic trace messages the rules are timed against when no corpus is given.
+SAMPLE_MESSAGES = (
+    "Loading BMW_M4_GT3\\body_03.gmt (2048 KB)",
+    "Found 120 items in Porsche_963.veh",
+    "Opened MAS file Oreca_07.mas",
+    "Render target resized to 2560x1440",
+    "Frame 48213 presented",
+    "Changing camera to cockpit",
+    "Network packet 4411 received from 10.0.0.12",
+    "Device Simucube 2 Pro polled in 120us",
+    "Force feedback update 0.731",
+    "TextureManager::add: texture Ferrari_499P\\wheel_12.dds loaded",
+    "Failed voice allocation retried 2x",
+    'Error opening MAS file "HUD\\HUD.MAS"',
+    "Failed to load 3 double values for: FWLiftHeightPlus",
+    "Force feedback strength safety reduction engaged at 75.65% due to slow "
+    "physics ticks (302.63Hz).",
+    "Device - Name:Fanatec CSL DD VIPDID 0x0ed300006",
+    "Car with BMW_M4 uses RWDragBase. Please update it to use RWDragBaseV2",
+)
+
+# Repeated units appended to a rule's literal to provoke backtracking, and
+# the repeat counts tried. The input stops growing once a rule is over budget.
+ADVERSARIAL_UNITS = ("a", "a ", "1", "1.", "\\", " ", "-_")
+ADVERSARIAL_LENGTHS = (8, 12, 16, 20, 24)
+
+# An adversarial search over budget is timed this often; the best time counts,
+# so a single slow sample on a busy machine does not reject a rule.
+ADVERSARIAL_REPEATS = 3
+
+
+class LintIssue(NamedTuple):
+    """
+    A finding of the rule linter.
+
+    Attributes:
+        rule_id (str): The rule the finding is about.
+        code (str): A stable identifier, e.g. 'TRAILING_LAZY'.
+        severity (str): 'info', 'warning' or 'error'; errors reject the ruleset.
+        message (str): A human-readable explanation.
+    """
+
+    rule_id: str
+    code: str
+    severity: str
+    message: str
+
+
+class RuleCost(NamedTuple):
+    """
+    The measured cost of a rule's regex.
+
+    Attributes:
+        rule_id (str): The rule.
+        mean_us (float): Mean time per message of the sample corpus, in microseconds.
+        worst_ms (float): Slowest single search over the adversarial inputs, in milliseconds.
+    """
+
+    rule_id: str
+    mean_us: float
+    worst_ms: float
+
+
+class CostBudget(NamedTuple):
+    """
+    Limits for the measured cost of a rule.
+
+    Attributes:
+        warn_mean_us (float): Warn above this mean time per sample message.
+        reject_worst_ms (float): Reject a rule whose slowest adversarial search takes longer.
+    """
+
+    warn_mean_us: float = 20.0
+    reject_worst_ms: float = 50.0
+
+
+class RuleLintWarning(UserWarning):
+    """
+    Emitted for every lint warning of a loaded ruleset.
+    """
+
+
+class RuleLintError(ValueError):
+    """
+    Raised when a ruleset has lint errors; ``issues`` holds all findings.
+    """
+
+    def __init__(self, issues: List[LintIssue]):
+        self.issues = issues
+        errors = [issue for issue in issues if issue.severity == ERROR]
+        super().__init__(
+            "Ruleset rejected: "
+            + "; ".join(f"[{issue.rule_id}] {issue.message}" for issue in errors)
+        )
+
+
+def lint_rule(rule: AnalysisRule) -> List[LintIssue]:
+    """
+    Statically inspects the pattern of a rule.
+
+    Args:
+        rule (AnalysisRule): The rule to inspect.
+
+    Returns:
+        List[LintIssue]: The findings, empty for a clean rule.
+    """
+    issues: List[LintIssue] = []
+    if not rule.trigger_file:
+        issues.append(
+            LintIssue(
+                rule.id,
+                "UNSCOPED",
+                INFO,
+                "No trigger_file, so the rule is evaluated for every log line.",
+            )
+        )
+
+    try:
+        re.compile(rule.pattern)
+    except re.error as exc:
+        issues.append(LintIssue(rule.id, "INVALID", ERROR, f"Invalid pattern: {exc}"))
+        return issues
+
+    try:
+        issues.extend(_structural_issues(rule, _parse(rule.pattern)))
+    except Exception:
+        issues.append(
+            LintIssue(
+                rule.id,
+                "STRUCTURE_SKIPPED",
+                INFO,
+                "The regex parser of this Python is not supported, so the "
+                "structural checks were skipped.",
+            )
+        )
+    return issues
+
+
+def estimate_cost(
+    rule: AnalysisRule,
+    corpus: Sequence[str] = SAMPLE_MESSAGES,
+    budget: CostBudget = CostBudget(),
+) -> RuleCost:
+    """
+    Times a rule against a sample corpus and against adversarial inputs.
+
+    The adversarial inputs are the literal start of the pattern followed
+    by a growing run of a repeated unit and a character that fails the match.
+    They stop growing as soon as one search exceeds the budget (best of
+    ADVERSARIAL_REPEATS runs), so even a catastrophic pattern is only run for
+    a few times ``reject_worst_ms``.
+
+    Args:
+        rule (AnalysisRule): The rule to time.
+        corpus (Sequence[str]): Realistic log messages.
+        budget (CostBudget): Used to cut the adversarial search short.
+
+    Returns:
+        RuleCost: The measured cost.
+    """
+    search = rule.regex.search
+    mean_us = 0.0
+    if corpus:
+        best = min(_time_all(search, corpus) for _ in range(3))
+        mean_us = 1e6 * best / len(corpus)
+
+    worst = 0.0
+    for prefix in dict.fromkeys((_leading_literal(rule.pattern), "")):
+        for unit in ADVERSARIAL_UNITS:
+            for length in ADVERSARIAL_LENGTHS:
+                line = (f"{prefix}{unit * length}\x00",)
+                elapsed = _time_all(search, line)
+                if 1000 * elapsed > budget.reject_worst_ms:
+                    for _ in range(ADVERSARIAL_REPEATS - 1):
+                        elapsed = min(elapsed, _time_all(search, line))
+                worst = max(worst, elapsed)
+                if 1000 * elapsed > budget.reject_worst_ms:
+                    return RuleCost(rule.id, mean_us, 1000 * worst)
+    return RuleCost(rule.id, mean_us, 1000 * worst)
+
+
+def lint_rules(
+    rules: Iterable[AnalysisRule],
+    corpus: Sequence[str] = SAMPLE_MESSAGES,
+    budget: CostBudget = CostBudget(),
+    measure: bool = True,
+) -> List[LintIssue]:
+    """
+    Lints a ruleset: static checks, duplicate ids, exclusive groups and cost.
+
+    Exclusive groups are verified against the corpus: a message matched by
+    two rules of the same group rejects the ruleset, because reordering the
+    group would then change the result.
+
+    Args:
+        rules (Iterable[AnalysisRule]): The rules in declaration order.
+        corpus (Sequence[str]): Realistic log messages to time the rules against.
+        budget (CostBudget): The cost limits.
+        measure (bool): Set to False to skip the timing.
+
+    Returns:
+        List[LintIssue]: All findings, in rule order.
+    """
+    rules = list(rules)
+    issues: List[LintIssue] = []
+    seen = set()
+    for rule in rules:
+        if rule.id in seen:
+            issues.append(
+                LintIssue(rule.id, "DUPLICATE_ID", WARNING, "The id is used twice.")
+            )
+        seen.add(rule.id)
+
+        rule_issues = lint_rule(rule)
+        issues.extend(rule_issues)
+        if not measure or any(issue.severity == ERROR for issue in rule_issues):
+            continue
+
+        cost = estimate_cost(rule, corpus, budget)
+        if cost.worst_ms > budget.reject_worst_ms:
+            issues.append(
+                LintIssue(
+                    rule.id,
+                    "COST_REJECTED",
+                    ERROR,
+                    f"A single search took {cost.worst_ms:.1f} ms on an adversarial "
+                    f"line (budget {budget.reject_worst_ms:.1f} ms).",
+                )
+            )
+        elif cost.mean_us > budget.warn_mean_us:
+            issues.append(
+                LintIssue(
+                    rule.id,
+                    "COST_HIGH",
+                    WARNING,
+                    f"{cost.mean_us:.1f} us per message on the sample corpus "
+                    f"(budget {budget.warn_mean_us:.1f} us).",
+                )
+            )
+
+    issues.extend(_check_exclusive_groups(rules, corpus))
+    return issues
+
+
+def check_rules(
+    rules: Sequence[AnalysisRule],
+    corpus: Sequence[str] = SAMPLE_MESSAGES,
+    budget: CostBudget = CostBudget(),
+    measure: bool = False,
+) -> List[LintIssue]:
+    """
+    Lints a ruleset before it is used: warns about warnings, rejects errors.
+
+    Only the static checks run by default. Timing depends on the load of
+    the machine, so loading a ruleset never measures it; ``--lint-rules``
+    does.
+
+    Args:
+        rules (Sequence[AnalysisRule]): The rules in declaration order.
+        corpus (Sequence[str]): Realistic log messages to time the rules against.
+        budget (CostBudget): The cost limits.
+        measure (bool): Also time the rules and reject those over budget.
+
+    Returns:
+        List[LintIssue]: All findings, if there were no errors.
+
+    Raises:
+        RuleLintError: If any rule has an error-level finding.
+    """
+    issues = lint_rules(rules, corpus, budget, measure=measure)
+    if any(issue.severity == ERROR for issue in issues):
+        raise RuleLintError(issues)
+    for issue in issues:
+        if issue.severity == WARNING:
+            warnings.warn(
+                f"[{issue.rule_id}] {issue.code}: {issue.message}",
+                RuleLintWarning,
+                stacklevel=3,
+            )
+    return issues
+
+
+def _check_exclusive_groups(
+    rules: List[AnalysisRule], corpus: Sequence[str]
+) -> List[LintIssue]:
+    groups: Dict[str, List[AnalysisRule]] = {}
+    for rule in rules:
+        if rule.exclusive_group:
+            groups.setdefault(rule.exclusive_group, []).append(rule)
+
+    issues = []
+    for group, members in groups.items():
+        for message in corpus:
+            matching = [rule.id for rule in members if rule.regex.search(message)]
+            if len(matching) > 1:
+                issues.append(
+                    LintIssue(
+                        matching[1],
+                        "EXCLUSIVE_OVERLAP",
+                        ERROR,
+                        f"Rules {', '.join(matching)} of exclusive group '{group}' "
+                        f"all match {message!r}.",
+                    )
+                )
+    return issues
+
+
+def _structural_issues(
+    rule: AnalysisRule, items: List[Tuple[Any, Any]]
+) -> List[LintIssue]:
+    issues: List[LintIssue] = []
+    if _has_nested_quantifier(items):
+        issues.append(
+            LintIssue(
+                rule.id,
+                "NESTED_QUANTIFIER",
+                WARNING,
+                "An unbounded quantifier repeats a group that itself contains one, "
+                "which can backtrack exponentially on lines that almost match.",
+            )
+        )
+    if items and _is_unbounded_repeat(items[0]):
+        issues.append(
+            LintIssue(
+                rule.id,
+                "LEADING_WILDCARD",
+                WARNING,
+                "The pattern starts with an unbounded quantifier; re.search already "
+                "scans the whole message, so this only adds backtracking.",
+            )
+        )
+    trailing = _trailing_item(items)
+    if trailing is not None and trailing[0] is _constants.MIN_REPEAT:
+        issues.append(
+            LintIssue(
+                rule.id,
+                "TRAILING_LAZY",
+                WARNING,
+                "The pattern ends in a lazy quantifier, so it always matches as "
+                "little as possible and the capture is useless; use a greedy "
+                "quantifier or anchor the end.",
+            )
+        )
+    return issues
+
+
+def _parse(pattern: str) -> List[Tuple[Any, Any]]:
+    if _parser is None:
+        raise RuntimeError("re._parser is not available.")
+    return list(_parser.parse(pattern).data)
+
+
+def _leading_literal(pattern: str) -> str:
+    try:
+        items = _parse(pattern)
+    except Exception:
+        return ""
+    prefix = []
+    for op, av in items:
+        if op is not _constants.LITERAL:
+            break
+        prefix.append(chr(av))
+    return "".join(prefix)
+
+
+def _time_all(search: Any, messages: Iterable[str]) -> float:
+    start = perf_counter()
+    for message in messages:
+        search(message)
+    return perf_counter() - start
+
+
+def _is_unbounded_repeat(item: Tuple[Any, Any]) -> bool:
+    op, av = item
+    return (
+        op in (_constants.MAX_REPEAT, _constants.MIN_REPEAT)
+        and av[1] == _constants.MAXREPEAT
+    )
+
+
+def _children(item: Tuple[Any, Any]) -> List[List[Tuple[Any, Any]]]:
+    op, av = item
+    if op in (_constants.MAX_REPEAT, _constants.MIN_REPEAT):
+        return [list(av[2])]
+    if op is _constants.SUBPATTERN:
+        return [list(av[-1])]
+    if op is _constants.BRANCH:
+        return [list(branch) for branch in av[1]]
+    if op in (_constants.ASSERT, _constants.ASSERT_NOT):
+        return [list(av[1])]
+    return []
+
+
+def _contains_unbounded_repeat(items: List[Tuple[Any, Any]]) -> bool:
+    return any(
+        _is_unbounded_repeat(item)
+        or any(_contains_unbounded_repeat(child) for child in _children(item))
+        for item in items
+    )
+
+
+def _has_nested_quantifier(items: List[Tuple[Any, Any]]) -> bool:
+    for item in items:
+        if _is_unbounded_repeat(item) and _contains_unbounded_repeat(
+            _children(item)[0]
+        ):
+            return True
+        if any(_has_nested_quantifier(child) for child in _children(item)):
+            return True
+    return False
+
+
+def _trailing_item(items: List[Tuple[Any, Any]]) -> Optional[Tuple[Any, Any]]:
+    # The last element of the pattern, looking through trailing groups.
+    while items:
+        item = items[-1]
+        if item[0] is _constants.SUBPATTERN:
+            items = list(item[1][-1])
+            continue
+        return item
+    return None
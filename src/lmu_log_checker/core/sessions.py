@@ -0,0 +1,148 @@
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from lmu_log_checker.core.aggregators import Aggregator
+from lmu_log_checker.core.models import AnalysisRule
+
+# Phase of everything before the first state machine event.
+UNKNOWN_PHASE = "unknown"
+
+# Prefixes of LMU session types, mapped to the phase names we report.
+_SESSION_TYPE_PREFIXES = (
+    ("prac", "practice"),
+    ("qual", "qualify"),
+    ("warm", "warmup"),
+    ("race", "race"),
+)
+
+
+class PhaseInterval(NamedTuple):
+    """
+    A stretch of the trace spent in one phase.
+
+    Attributes:
+        phase (str): menu, loading, practice, qualify, warmup, race, session or shutdown.
+        start (float): Timestamp of the event that entered the phase.
+        end (Optional[float]): Timestamp of the event that left it, None while still open.
+    """
+
+    phase: str
+    start: float
+    end: Optional[float]
+
+
+class SessionSegmenter(Aggregator):
+    """
+    Single-pass state machine that splits a trace into session phases.
+
+    The state comes from the rules' ``payload.new_state`` (STATE_ENTER_GAME,
+    STATE_ENTER_TRACK, ...) or a captured ``new_state`` (STATE_SESSION_CHANGE),
+    the session type from a captured ``new_type`` (STATE_SESSION_TYPE). Every
+    event is attributed to the phase that is active when it arrives, and the
+    phase intervals are kept sorted by start so any timestamp can be mapped
+    back to its phase with a binary search.
+
+    Timestamps are expected to be non-decreasing, i.e. one game run per trace.
+    """
+
+    def __init__(self, rules: Iterable[AnalysisRule]):
+        """
+        Initializes the segmenter.
+
+        Args:
+            rules (Iterable[AnalysisRule]): The loaded rules; their payloads define state changes.
+        """
+        self._state_by_rule: Dict[str, str] = {
+            rule.id: str(rule.payload["new_state"])
+            for rule in rules
+            if rule.payload and rule.payload.get("new_state")
+        }
+        self.intervals: List[PhaseInterval] = []
+        self.phase_counts: Dict[str, Counter[str]] = {}
+        self.phase = UNKNOWN_PHASE
+        self.activity: Optional[str] = None
+        self.session_type: Optional[str] = None
+        self.last_timestamp: Optional[float] = None
+        self._starts: List[float] = []
+
+    def add(
+        self,
+        rule_id: str,
+        timestamp: float,
+        found_in_file: str,
+        message: str,
+        captured_data: Dict[str, Any],
+    ) -> None:
+        new_state = self._state_by_rule.get(rule_id) or captured_data.get("new_state")
+        new_type = captured_data.get("new_type")
+        if new_type:
+            self.session_type = _normalize_session_type(new_type)
+        if new_state:
+            self.activity = new_state
+        if new_state or new_type:
+            self._enter(self._derive_phase(), timestamp)
+
+        self.last_timestamp = timestamp
+        self.phase_counts.setdefault(self.phase, Counter())[rule_id] += 1
+
+    def phase_at(self, timestamp: float) -> str:
+        """
+        Returns the phase that was active at a timestamp, in O(log n).
+
+        Args:
+            timestamp (float): A timestamp from the trace.
+
+        Returns:
+            str: The phase name, or 'unknown' before the first state change.
+        """
+        index = bisect_right(self._starts, timestamp) - 1
+        return self.intervals[index].phase if index >= 0 else UNKNOWN_PHASE
+
+    def phase_durations(self, end: Optional[float] = None) -> Dict[str, float]:
+        """
+        Sums the time spent in every phase.
+
+        Args:
+            end (Optional[float]): Where an open interval ends, defaults to the last event.
+
+        Returns:
+            Dict[str, float]: phase -> seconds, in order of first appearance.
+        """
+        end = self.last_timestamp if end is None else end
+        durations: Dict[str, float] = {}
+        for interval in self.intervals:
+            stop = interval.end if interval.end is not None else end
+            if stop is None:
+                stop = interval.start
+            durations[interval.phase] = durations.get(interval.phase, 0.0) + (
+                stop - interval.start
+            )
+        return durations
+
+    def _enter(self, phase: str, timestamp: float) -> None:
+        if self.intervals and phase == self.phase:
+            return
+        if self.intervals:
+            self.intervals[-1] = self.intervals[-1]._replace(end=timestamp)
+        self.intervals.append(PhaseInterval(phase, timestamp, None))
+        self._starts.append(timestamp)
+        self.phase = phase
+
+    def _derive_phase(self) -> str:
+        activity = (self.activity or "").lower()
+        if activity in ("shutdown", "exit"):
+            return "shutdown"
+        if "load" in activity or activity == "on_track":
+            return "loading"
+        if "menu" in activity or activity == "in_game":
+            return "menu"
+        return self.session_type or "session"
+
+
+def _normalize_session_type(value: str) -> str:
+    lowered = value.lower()
+    for prefix, phase in _SESSION_TYPE_PREFIXES:
+        if lowered.startswith(prefix):
+            return phase
+    return lowered
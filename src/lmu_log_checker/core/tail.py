@@ -0,0 +1,159 @@
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Tuple, Union
+
+from lmu_log_checker.core.log_analyzer import LogAnalyzer
+from lmu_log_checker.core.models import AnalysisEvent
+
+# Bytes read per call while catching up; keeps memory bounded on the first
+# poll of a large trace.
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Number of leading bytes remembered to recognise a rewritten trace file.
+HEAD_SIGNATURE_SIZE = 256
+
+
+class TraceFollower:
+    """
+    Incrementally analyzes a trace file that is still being written.
+
+    The follower remembers the byte offset it has read up to and any trailing
+    partial line, so each poll only parses newly appended bytes. When the game
+    restarts the trace is truncated or replaced; this is detected via the file
+    size, its identity and a signature of its first bytes, and the file is
+    then read again from the start.
+    """
+
+    def __init__(
+        self,
+        analyzer: LogAnalyzer,
+        path: Union[str, Path],
+        path_resolver: Optional[Callable[[], Path]] = None,
+    ):
+        """
+        Initializes the follower.
+
+        Args:
+            analyzer (LogAnalyzer): The analyzer with loaded rules that receives the lines.
+            path (Union[str, Path]): The trace file to follow.
+            path_resolver (Optional[Callable[[], Path]]): Called on every poll to re-resolve
+                the trace path, e.g. ``resolve_trace_path`` to pick up a new trace*.txt.
+        """
+        self.analyzer = analyzer
+        self.path = Path(path)
+        self.path_resolver = path_resolver
+        self.offset = 0
+        self.restarts = 0
+        self._partial = b""
+        self._identity: Optional[Tuple[int, int]] = None
+        self._head = b""
+
+    def poll(self) -> List[AnalysisEvent]:
+        """
+        Parses everything appended since the last poll.
+
+        Returns:
+            List[AnalysisEvent]: The events detected in the new lines.
+        """
+        self._resolve_path()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        identity = (stat.st_dev, stat.st_ino)
+        if self._identity is not None and (
+            identity != self._identity or stat.st_size < self.offset
+        ):
+            self._reset()
+        self._identity = identity
+
+        if stat.st_size == self.offset:
+            return []
+
+        first_event = len(self.analyzer.events)
+        with open(self.path, "rb") as file:
+            if self.offset and not self._head_matches(file):
+                self._reset()
+            file.seek(self.offset)
+            while True:
+                chunk = file.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                self._feed(chunk)
+
+        return self.analyzer.events[first_event:]
+
+    def follow(
+        self,
+        on_events: Callable[[List[AnalysisEvent]], None],
+        interval: float = 1.0,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        Polls the trace until ``stop`` returns True (or forever).
+
+        Between polls the follower sleeps, so an idle trace only costs one
+        ``stat()`` call per interval.
+
+        Args:
+            on_events (Callable[[List[AnalysisEvent]], None]): Called with each batch of new events.
+            interval (float): Seconds to sleep between polls.
+            stop (Optional[Callable[[], bool]]): Checked after every poll.
+        """
+        while True:
+            events = self.poll()
+            if events:
+                on_events(events)
+            if stop is not None and stop():
+                return
+            time.sleep(interval)
+
+    def flush(self) -> List[AnalysisEvent]:
+        """
+        Parses a trailing line that was never terminated by a newline.
+
+        Returns:
+            List[AnalysisEvent]: The events detected in that line.
+        """
+        first_event = len(self.analyzer.events)
+        if self._partial:
+            partial, self._partial = self._partial, b""
+            self.analyzer.process_stream([partial])
+        return self.analyzer.events[first_event:]
+
+    def _feed(self, chunk: bytes) -> None:
+        if len(self._head) < HEAD_SIGNATURE_SIZE:
+            self._head += chunk[: HEAD_SIGNATURE_SIZE - len(self._head)]
+
+        data = self._partial + chunk
+        end = data.rfind(b"\n")
+        if end == -1:
+            self._partial = data
+            return
+        self._partial = data[end + 1 :]
+        self.analyzer.process_stream([data[: end + 1]])
+
+    def _head_matches(self, file: BinaryIO) -> bool:
+        file.seek(0)
+        return file.read(len(self._head)) == self._head
+
+    def _resolve_path(self) -> None:
+        if self.path_resolver is None:
+            return
+        try:
+            path = self.path_resolver()
+        except FileNotFoundError:
+            return
+        if path != self.path:
+            self.path = path
+            self._identity = None
+            self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self._partial = b""
+        self._head = b""
+        self.restarts += 1
@@ -0,0 +1,197 @@
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# The placeholder of a variable token in a template.
+WILDCARD = "<*>"
+
+# Whole tokens that contain a digit or a path separator are variables, e.g.
+# "123", "0x1f", "(VRAM:", "BMW_M4_GT3\body_12.dds" or "/tmp/a".
+_VARIABLE_TOKEN = re.compile(r"(?<!\S)[^\s\d\\/]*+[\d\\/]\S*+")
+
+
+class MinedTemplate(NamedTuple):
+    """
+    A cluster of similar unmatched messages.
+
+    Attributes:
+        template (str): The common message with ``<*>`` for the variable tokens.
+        occurrences (int): Number of messages in the cluster.
+        samples (List[str]): The first few messages of the cluster.
+        files (List[Tuple[str, int]]): The source files the messages came from,
+                                       most frequent first.
+        regex (str): A suggested rule pattern with a named group per variable.
+    """
+
+    template: str
+    occurrences: int
+    samples: List[str]
+    files: List[Tuple[str, int]]
+    regex: str
+
+
+class _Cluster:
+    __slots__ = ("tokens", "count", "samples", "files", "evicted")
+
+    def __init__(self, tokens: List[str]) -> None:
+        self.tokens = tokens
+        self.evicted = False
+        self.count = 0
+        self.samples: List[str] = []
+        self.files: Counter[str] = Counter()
+
+
+class TemplateMiner:
+    """
+    Clusters messages into templates with the Drain algorithm.
+
+    Tokens containing digits or path separators are masked first. Messages
+    are then grouped by token count and their first ``prefix_tokens`` tokens,
+    and within a group joined to the most similar template if at least
+    ``similarity`` of the tokens agree; tokens that differ become ``<*>``.
+    A memo of masked messages skips the search for shapes that were seen
+    before, which keeps mining close to parsing speed.
+
+    Memory stays bounded on traces of any size: at most ``max_clusters``
+    clusters (the least frequent one is evicted and its messages counted in
+    ``dropped``), ``max_samples`` samples per cluster and ``memo_size``
+    memoized shapes are kept.
+    """
+
+    def __init__(
+        self,
+        similarity: float = 0.5,
+        prefix_tokens: int = 2,
+        max_clusters: int = 1000,
+        max_samples: int = 3,
+        memo_size: int = 50_000,
+    ):
+        """
+        Initializes the miner.
+
+        Args:
+            similarity (float): Share of equal tokens needed to join a template.
+            prefix_tokens (int): Number of leading tokens that must match exactly.
+            max_clusters (int): The maximum number of clusters kept.
+            max_samples (int): Number of sample messages kept per cluster.
+            memo_size (int): Number of masked messages remembered.
+        """
+        self.similarity = similarity
+        self.prefix_tokens = prefix_tokens
+        self.max_clusters = max_clusters
+        self.max_samples = max_samples
+        self.memo_size = memo_size
+        self.messages = 0
+        self.dropped = 0
+        self._groups: Dict[Tuple[str, ...], List[_Cluster]] = {}
+        self._clusters = 0
+        self._memo: Dict[str, _Cluster] = {}
+
+    def add(self, found_in_file: str, message: str) -> None:
+        """
+        Adds one unmatched message.
+
+        Args:
+            found_in_file (str): The source file from the log line.
+            message (str): The message.
+        """
+        self.messages += 1
+        masked = _VARIABLE_TOKEN.sub(WILDCARD, message)
+        cluster = self._memo.get(masked)
+        if cluster is None or cluster.evicted:
+            cluster = self._match(masked.split())
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[masked] = cluster
+
+        cluster.count += 1
+        cluster.files[found_in_file] += 1
+        if len(cluster.samples) < self.max_samples:
+            cluster.samples.append(message)
+
+    def top(self, n: Optional[int] = 20) -> List[MinedTemplate]:
+        """
+        Returns the most frequent templates.
+
+        Args:
+            n (Optional[int]): How many to return, all by default.
+
+        Returns:
+            List[MinedTemplate]: The templates, most frequent first.
+        """
+        clusters = sorted(
+            (c for group in self._groups.values() for c in group if c.count),
+            key=lambda cluster: cluster.count,
+            reverse=True,
+        )
+        return [
+            MinedTemplate(
+                " ".join(cluster.tokens),
+                cluster.count,
+                list(cluster.samples),
+                cluster.files.most_common(),
+                suggest_regex(cluster.tokens),
+            )
+            for cluster in clusters[:n]
+        ]
+
+    def _match(self, tokens: List[str]) -> _Cluster:
+        key = (str(len(tokens)), *tokens[: self.prefix_tokens])
+        group = self._groups.setdefault(key, [])
+
+        best: Optional[_Cluster] = None
+        best_score = -1.0
+        for cluster in group:
+            equal = sum(1 for a, b in zip(cluster.tokens, tokens) if a == b)
+            score = equal / len(tokens) if tokens else 1.0
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is not None and best_score >= self.similarity:
+            best.tokens = [
+                a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)
+            ]
+            return best
+
+        if self._clusters >= self.max_clusters:
+            self._evict()
+        cluster = _Cluster(tokens)
+        group.append(cluster)
+        self._clusters += 1
+        return cluster
+
+    def _evict(self) -> None:
+        key, victim = min(
+            ((key, c) for key, group in self._groups.items() for c in group),
+            key=lambda item: item[1].count,
+        )
+        self._groups[key].remove(victim)
+        self._clusters -= 1
+        self.dropped += victim.count
+        # Memo entries that still point at it are replaced on their next use.
+        victim.evicted = True
+
+
+def suggest_regex(tokens: List[str]) -> str:
+    """
+    Builds a rule pattern from template tokens.
+
+    Literal tokens are escaped, every ``<*>`` becomes a named group matching
+    one token, and a trailing ``<*>`` matches the rest of the message.
+
+    Args:
+        tokens (List[str]): The tokens of a template.
+
+    Returns:
+        str: The pattern.
+    """
+    parts = []
+    variables = 0
+    for position, token in enumerate(tokens):
+        if token == WILDCARD:
+            variables += 1
+            value = ".+" if position == len(tokens) - 1 else r"\S+"
+            parts.append(f"(?P<value{variables}>{value})")
+        else:
+            parts.append(re.escape(token))
+    return r"\s+".join(parts)
@@ -1,10 +1,39 @@
-from collections import Counter, defaultdict
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Dict, Set
-
-import yaml
-from lmu_log_checker.core.log_analyzer import LogAnalyzer
-from settings.settings import settings
+from typing import Any, List, Dict, Optional, TextIO
+
+from _helper import resolve_trace_path
+from lmu_log_checker.core.aggregators import SummaryAggregator
+from lmu_log_checker.core.batch import analyze_batch
+from lmu_log_checker.core.export import (
+    NdjsonExporter,
+    check_fields,
+    parse_field_list,
+)
+from lmu_log_checker.core.ffb_episodes import DEFAULT_WINDOW, FfbEpisodeDetector
+from lmu_log_checker.core.fleet import FleetStats, FleetStatsAggregator
+from lmu_log_checker.core.history import HistoryStore, analyze_cached, file_hash
+from lmu_log_checker.core.log_analyzer import LogAnalyzer, parse_rules
+from lmu_log_checker.core.models import AnalysisEvent
+from lmu_log_checker.core.parallel import analyze_parallel
+from lmu_log_checker.core.profiling import RuleProfiler
+from lmu_log_checker.core.rule_cache import load_ruleset
+from lmu_log_checker.core.rule_lint import (
+    LintIssue,
+    RuleLintError,
+    estimate_cost,
+    lint_rules,
+)
+from lmu_log_checker.core.sessions import SessionSegmenter
+from lmu_log_checker.core.tail import TraceFollower
+from lmu_log_checker.core.templates import TemplateMiner
+from settings import get_settings
 
 
 def load_patterns(file_path: Path) -> Any:
@@ -17,10 +46,44 @@ def load_patterns(file_path: Path) -> Any:
     Returns:
         Any: The parsed YAML data.
     """
+    import yaml
+
     with open(file_path, "r", encoding="utf-8") as file:
         return yaml.safe_load(file)
 
 
+def load_order_profile(file_path: Path) -> Dict[str, int]:
+    """
+    Loads the rule hit counts saved by an earlier run.
+
+    Args:
+        file_path (Path): The JSON profile.
+
+    Returns:
+        Dict[str, int]: rule_id -> hits; empty if the file is unreadable.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(k): int(v) for k, v in data.items() if isinstance(v, int)}
+
+
+def save_order_profile(file_path: Path, counts: Dict[str, int]) -> None:
+    """
+    Saves rule hit counts for load_order_profile.
+
+    Args:
+        file_path (Path): The JSON profile.
+        counts (Dict[str, int]): rule_id -> hits.
+    """
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(counts, file, indent=2, sort_keys=True)
+
+
 def print_summary(events: List[Dict[str, Any]]) -> None:
     """
     Prints a formatted summary of the log analysis results.
@@ -28,57 +91,55 @@ def print_summary(events: List[Dict[str, Any]]) -> None:
     Args:
         events (List[Dict[str, Any]]): The list of detected log events.
     """
-    print("\n" + "=" * 40)
-    print("       LMU LOG ANALYSIS REPORT       ")
-    print("=" * 40 + "\n")
-
-    stats: Counter[str] = Counter()
-    unique_data: Dict[str, Set[str]] = defaultdict(set)
-    hardware_info: Dict[str, str] = {}
-    critical_events: List[Dict[str, Any]] = []
+    summary = SummaryAggregator()
+    summary.add_report(events)
+    episodes = FfbEpisodeDetector()
+    episodes.add_report(events)
+    print_aggregated_summary(summary, episodes)
 
-    for e in events:
-        rule_id = e["rule_id"]
-        data = e.get("captured_data", {})
 
-        stats[rule_id] += 1
-
-        if data:
-            info_str = ", ".join([str(v) for k, v in data.items() if v])
-            if info_str:
-                unique_data[rule_id].add(info_str)
+def print_aggregated_summary(
+    summary: SummaryAggregator, episodes: Optional[FfbEpisodeDetector] = None
+) -> None:
+    """
+    Prints a formatted summary from state aggregated during the analysis.
 
-        if rule_id == "HW_CPU_INFO":
-            hardware_info["CPU"] = (
-                f"{data.get('cpu_model')} ({data.get('cores')} cores)"
-            )
-        if rule_id == "HW_INPUT_DEVICE":
-            unique_data["DEVICES"].add(data.get("device_name").strip())
+    Args:
+        summary (SummaryAggregator): The aggregator that was fed the events.
+        episodes (Optional[FfbEpisodeDetector]): The throttling episodes, if detected.
+    """
+    print("\n" + "=" * 40)
+    print("       LMU LOG ANALYSIS REPORT       ")
+    print("=" * 40 + "\n")
 
-        if rule_id == "PHYS_FFB_THROTTLING":
-            critical_events.append(e)
+    stats = summary.rule_counts.counts
+    hardware = summary.hardware
+    critical = summary.critical
 
     # --- OUTPUT ---
 
     # SYSTEM SECTION
     print("--- SYSTEM INFO ---")
-    if "CPU" in hardware_info:
-        print(f"CPU: {hardware_info['CPU']}")
+    if hardware.cpu is not None:
+        print(f"CPU: {hardware.cpu}")
 
-    if "DEVICES" in unique_data:
-        print(f"Input Devices ({len(unique_data['DEVICES'])} found):")
-        for dev in sorted(unique_data["DEVICES"]):
+    if hardware.devices:
+        print(f"Input Devices ({len(hardware.devices)} found):")
+        for dev in sorted(hardware.devices):
             print(f"  - {dev}")
     print("")
 
     # CRITICAL SECTION
     if stats["PHYS_FFB_THROTTLING"] > 0:
         print(f"!!! CRITICAL PERFORMANCE ISSUES ({stats['PHYS_FFB_THROTTLING']}x) !!!")
-        for crit in critical_events:
-            d = crit["captured_data"]
+        for timestamp, d in critical.events:
             print(
-                f"  - At {crit['timestamp']}s: Physics dropped to {d.get('physics_hz')}Hz (FFB reduced by {d.get('reduction_pct')}%)"
+                f"  - At {timestamp}s: Physics dropped to {d.get('physics_hz')}Hz (FFB reduced by {d.get('reduction_pct')}%)"
             )
+        if critical.dropped:
+            print(f"  - ... and {critical.dropped} more.")
+        if episodes is not None and len(episodes):
+            print_episode_summary(episodes)
         print("")
 
     # ERRORS & WARNINGS SECTION
@@ -101,12 +162,14 @@ def print_summary(events: List[Dict[str, Any]]) -> None:
         print(f"[{rule_id}]: {count} occurrences")
 
         # Details anzeigen (aber limitiert auf z.B. die ersten 3, damit es nicht spammt)
-        details = list(unique_data[rule_id])
+        details = summary.details.sample(rule_id)
+        unique_count, is_lower_bound = summary.details.unique_count(rule_id)
         if details:
-            for i, detail in enumerate(details[:5]):  # Zeige max 5 Beispiele
+            for detail in details:  # Zeige max 5 Beispiele
                 print(f"    -> {detail}")
-            if len(details) > 5:
-                print(f"    -> ... and {len(details) - 5} more unique items.")
+            if unique_count > len(details):
+                more = f"{unique_count - len(details)}{'+' if is_lower_bound else ''}"
+                print(f"    -> ... and {more} more unique items.")
         print("")
 
 
@@ -114,30 +177,570 @@ def print_summary(events: List[Dict[str, Any]]) -> None:
 # print_summary(result_list)
 
 
-def main() -> None:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the log analyzer.
+
+    Args:
+        argv (Optional[List[str]]): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="LMU Log Checker")
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep watching trace.txt while LMU is running and report events live.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between polls in --follow mode (default: 1.0).",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="TARGET",
+        help="Analyze every trace*.txt in a directory (or matching a glob) in parallel.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Split a single large trace into chunks and parse them on all cores.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes for --batch/--parallel (default: CPU count).",
+    )
+    parser.add_argument(
+        "--no-rule-cache",
+        action="store_true",
+        help="Always parse patterns.yaml instead of using the compiled ruleset cache.",
+    )
+    parser.add_argument(
+        "--phases",
+        action="store_true",
+        help="Split the trace into session phases and break the events down per phase.",
+    )
+    parser.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help="Report the attempts, hits and time of every rule (runs sequentially).",
+    )
+    parser.add_argument(
+        "--mine-templates",
+        metavar="N",
+        type=int,
+        nargs="?",
+        const=20,
+        default=None,
+        help="Cluster the messages no rule matched and print the N most frequent "
+        "templates with suggested patterns (default: 20, runs sequentially).",
+    )
+    parser.add_argument(
+        "--order-profile",
+        metavar="FILE",
+        type=Path,
+        help="Seed the rule evaluation order from this hit-count profile and "
+        "update it after the analysis.",
+    )
+    parser.add_argument(
+        "--lint-rules",
+        action="store_true",
+        help="Print the linter findings and measured cost of every rule and exit.",
+    )
+    parser.add_argument(
+        "--history",
+        metavar="DB",
+        nargs="?",
+        const="",
+        default=None,
+        help="Keep results in a local SQLite history and reuse them for unchanged "
+        "traces (default location: next to the rule cache).",
+    )
+    parser.add_argument(
+        "--rig",
+        default=platform.node(),
+        help="Name of this machine in the history (default: the host name).",
+    )
+    parser.add_argument(
+        "--rule-history",
+        metavar="RULE_ID",
+        help="Print the count of a rule in every session in the history and exit.",
+    )
+    parser.add_argument(
+        "--throttling-per-week",
+        action="store_true",
+        help="Print the FFB throttling events per week from the history and exit.",
+    )
+    parser.add_argument(
+        "--fleet-stats",
+        metavar="FILE",
+        type=Path,
+        help="Save the mergeable distributions and hardware inventory of this "
+        "analysis as JSON.",
+    )
+    parser.add_argument(
+        "--fleet-report",
+        metavar="FILE",
+        type=Path,
+        nargs="+",
+        help="Merge saved --fleet-stats files, print the fleet percentiles and exit.",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="FILE",
+        help="Stream the detected events as NDJSON to FILE while analyzing "
+        "('-' for stdout; the report then goes to stderr).",
+    )
+    parser.add_argument(
+        "--export-fields",
+        metavar="FIELDS",
+        help="Comma separated fields to export, e.g. rule_id,timestamp (default: all).",
+    )
+    parser.add_argument(
+        "--export-rules",
+        metavar="RULE_IDS",
+        help="Comma separated rules whose events are exported (default: all).",
+    )
+    args = parser.parse_args(argv)
+
+    # Checked here so a typo never truncates an existing --export file.
+    try:
+        check_fields(parse_field_list(args.export_fields))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    # The history stores complete sequential runs of the configured trace.
+    _reject_combinations(
+        parser,
+        "--history",
+        args.history is not None,
+        {
+            "--follow": args.follow,
+            "--parallel": args.parallel,
+            "--profile-rules": args.profile_rules,
+            "--mine-templates": args.mine_templates is not None,
+        },
+    )
+    # Batch mode only reports per-file counts, the summary and fleet stats;
+    # it runs before the export file would be written.
+    _reject_combinations(
+        parser,
+        "--batch",
+        args.batch is not None,
+        {
+            "--export": args.export is not None,
+            "--history": args.history is not None,
+            "--phases": args.phases,
+            "--profile-rules": args.profile_rules,
+            "--mine-templates": args.mine_templates is not None,
+            "--follow": args.follow,
+            "--parallel": args.parallel,
+            "--order-profile": args.order_profile is not None,
+        },
+    )
+    return args
+
+
+def _reject_combinations(
+    parser: argparse.ArgumentParser,
+    option: str,
+    enabled: bool,
+    others: Dict[str, bool],
+) -> None:
+    # Exits with a usage error instead of silently ignoring options.
+    conflicting = [flag for flag, used in others.items() if used]
+    if enabled and conflicting:
+        parser.error(f"{option} cannot be combined with {', '.join(conflicting)}.")
+
+
+def print_live_events(events: List[AnalysisEvent]) -> None:
+    """
+    Prints events as they are detected in --follow mode.
+
+    Args:
+        events (List[AnalysisEvent]): The newly detected events.
+    """
+    for event in events:
+        marker = "!!!" if event.rule_id == "PHYS_FFB_THROTTLING" else "-->"
+        print(f"{marker} [{event.rule_id}] at {event.timestamp}s: {event.message}")
+
+
+def print_episode_summary(episodes: FfbEpisodeDetector) -> None:
+    """
+    Prints the throttling episodes and their session totals.
+
+    Args:
+        episodes (FfbEpisodeDetector): The detector that was fed the events.
+    """
+    session = episodes.stats()
+    print(
+        f"  Episodes: {session.episodes}, throttled for {session.throttled_time:.1f}s "
+        f"({session.episodes_per_minute:.2f} per minute)"
+    )
+    print(
+        f"  Worst {DEFAULT_WINDOW:.0f}s window: {session.worst_window_throttled:.1f}s "
+        f"throttled from {session.worst_window_start:.1f}s"
+    )
+    worst = sorted(episodes.episodes(), key=lambda e: e.duration, reverse=True)
+    for episode in worst[:5]:
+        end = f"{episode.end}s" if episode.end is not None else "session end"
+        print(
+            f"  - {episode.start}s -> {end}: {episode.duration:.1f}s, "
+            f"min {episode.min_physics_hz}Hz, max reduction {episode.max_reduction_pct}%"
+        )
+
+
+def print_rule_profile(profiler: RuleProfiler) -> None:
+    """
+    Prints what every rule cost, most expensive first.
+
+    Args:
+        profiler (RuleProfiler): The profiler that was active during the analysis.
+    """
+    print("--- RULE PROFILE ---")
+    print(f"{profiler.messages} messages, {profiler.total_seconds:.3f}s in rules")
+    print(
+        f"{'rule':<24} {'attempts':>10} {'skipped':>10} {'hits':>8} {'ms':>9} {'us/try':>7}"
+    )
+    for profile in profiler.report():
+        per_attempt = (
+            1e6 * profile.seconds / profile.attempts if profile.attempts else 0.0
+        )
+        print(
+            f"{profile.rule_id:<24} {profile.attempts:>10} {profile.skipped:>10} "
+            f"{profile.hits:>8} {1000 * profile.seconds:>9.1f} {per_attempt:>7.2f}"
+        )
+    print("")
+
+
+def print_templates(miner: TemplateMiner, limit: int) -> None:
+    """
+    Prints the most frequent templates of the messages no rule matched.
+
+    Args:
+        miner (TemplateMiner): The miner that was active during the analysis.
+        limit (int): Number of templates to print.
+    """
+    print("--- UNMATCHED MESSAGE TEMPLATES ---")
+    print(f"{miner.messages} unmatched messages")
+    for template in miner.top(limit):
+        files = ", ".join(file for file, _ in template.files[:3])
+        print(f"[{template.occurrences}x] {template.template}  ({files})")
+        for sample in template.samples:
+            print(f"    e.g. {sample}")
+        print(f"    suggested pattern: {template.regex}")
+    print("")
+
+
+def print_rule_lint(rules_data: Dict[str, Any]) -> None:
+    """
+    Prints the linter findings and the measured cost of every rule.
+
+    This is the only place the rules are timed against the cost budget;
+    loading them only runs the static checks.
+
+    Args:
+        rules_data (Dict[str, Any]): The raw ruleset, linted even if it would be rejected.
+    """
+    rules = parse_rules(rules_data, lint=False)
+    issues_by_rule: Dict[str, List[LintIssue]] = {}
+    for issue in lint_rules(rules, measure=True):
+        issues_by_rule.setdefault(issue.rule_id, []).append(issue)
+
+    print("--- RULE LINT ---")
+    print(f"{'rule':<24} {'us/msg':>7} {'worst ms':>9}")
+    for rule in rules:
+        cost = estimate_cost(rule)
+        print(f"{rule.id:<24} {cost.mean_us:>7.2f} {cost.worst_ms:>9.3f}")
+        for issue in issues_by_rule.get(rule.id, []):
+            print(f"    {issue.severity.upper()} {issue.code}: {issue.message}")
+    print("")
+
+
+def print_phase_summary(segmenter: SessionSegmenter) -> None:
+    """
+    Prints the session phases and the events detected in each of them.
+
+    Args:
+        segmenter (SessionSegmenter): The segmenter that was fed the events.
+    """
+    print("--- SESSION PHASES ---")
+    durations = segmenter.phase_durations()
+    for phase, counts in segmenter.phase_counts.items():
+        duration = durations.get(phase)
+        duration_text = f"{duration:.1f}s" if duration is not None else "n/a"
+        print(f"[{phase}] {duration_text}, {sum(counts.values())} events")
+        for rule_id, count in counts.most_common(5):
+            print(f"    -> {rule_id}: {count}")
+    print("")
+
+
+def print_fleet_report(stats: FleetStats) -> None:
+    """
+    Prints the percentiles and hardware inventory of merged fleet statistics.
+
+    Args:
+        stats (FleetStats): The merged statistics.
+    """
+    print(f"--- FLEET STATISTICS ({stats.traces} traces) ---")
+    for metric, histogram in stats.histograms.items():
+        if histogram.count == 0:
+            continue
+        percentiles = ", ".join(
+            f"p{q * 100:g} {value:.1f}"
+            for q, value in stats.percentiles(metric).items()
+            if value is not None
+        )
+        print(
+            f"{metric}: {histogram.count} values, {percentiles} "
+            f"(min {histogram.min}, max {histogram.max})"
+        )
+    for name, counts in stats.inventory.items():
+        if not counts.counts:
+            continue
+        print(f"[{name}]")
+        for value, traces in counts.most_common(5):
+            print(f"    -> {value}: {traces} traces")
+    print("")
+
+
+def follow_trace(
+    log_analyzer: LogAnalyzer,
+    interval: float,
+    exporter: Optional[NdjsonExporter] = None,
+) -> None:
+    """
+    Analyzes the trace incrementally until interrupted with Ctrl+C.
+
+    Args:
+        log_analyzer (LogAnalyzer): The analyzer with loaded rules.
+        interval (float): Seconds between polls.
+        exporter (Optional[NdjsonExporter]): Flushed after every batch of new events.
+    """
+
+    def on_events(events: List[AnalysisEvent]) -> None:
+        print_live_events(events)
+        if exporter is not None:
+            exporter.flush()
+
+    trace_path = get_settings().trace_path
+    follower = TraceFollower(
+        log_analyzer, trace_path, path_resolver=_resolve_live_trace_path
+    )
+    print(f"Following {trace_path} (press Ctrl+C to stop)...")
+    try:
+        follower.follow(on_events, interval=interval)
+    except KeyboardInterrupt:
+        on_events(follower.flush())
+
+
+def run_batch(
+    target: str,
+    rules_data: Dict[str, Any],
+    workers: Optional[int],
+    fleet_stats_path: Optional[Path] = None,
+) -> None:
+    """
+    Analyzes many trace files and prints a per-file overview and a merged summary.
+
+    Args:
+        target (str): A directory or glob pattern.
+        rules_data (Dict[str, Any]): The loaded ruleset.
+        workers (Optional[int]): Number of worker processes.
+        fleet_stats_path (Optional[Path]): Where to save the merged fleet statistics.
+    """
+    batch_report = analyze_batch(target, rules_data, max_workers=workers)
+
+    print(f"Analyzed {len(batch_report.event_counts)} trace files.")
+    for trace_file, counts in batch_report.event_counts.items():
+        print(f"  {trace_file}: {sum(counts.values())} events")
+    for trace_file, error in batch_report.errors.items():
+        print(f"  {trace_file}: FAILED ({error})")
+
+    print_aggregated_summary(batch_report.summary)
+    print_fleet_report(batch_report.fleet)
+    if fleet_stats_path is not None:
+        batch_report.fleet.save(fleet_stats_path)
+
+
+def print_history_report(history: HistoryStore, args: argparse.Namespace) -> None:
+    """
+    Prints the cross-session queries requested on the command line.
+
+    Args:
+        history (HistoryStore): The opened history.
+        args (argparse.Namespace): The parsed arguments.
+    """
+    if args.rule_history:
+        print(f"--- {args.rule_history} ON {args.rig} ---")
+        for row in history.rule_counts(args.rule_history, rig=args.rig):
+            when = datetime.fromtimestamp(row.session_time).strftime("%Y-%m-%d %H:%M")
+            print(f"{when}  {row.events:>6}  {row.trace_path}")
+    if args.throttling_per_week:
+        print(f"--- FFB THROTTLING PER WEEK ON {args.rig} ---")
+        for week in history.weekly_counts(rig=args.rig):
+            print(
+                f"{week.week}: {week.events} events in "
+                f"{week.affected_sessions}/{week.sessions} sessions"
+            )
+
+
+def _resolve_live_trace_path() -> Path:
+    # Only re-resolve when the configured trace is gone, e.g. after the game
+    # restarted and wrote a new trace*.txt.
+    trace_path = get_settings().trace_path
+    if trace_path.is_file():
+        return trace_path
+    return resolve_trace_path()
+
+
+def _is_yaml_error(exc: Exception) -> bool:
+    # yaml is only imported once patterns.yaml is parsed, i.e. on a rule
+    # cache miss, so there is nothing to compare against before that.
+    yaml = sys.modules.get("yaml")
+    return yaml is not None and isinstance(exc, yaml.YAMLError)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Main entry point for the log analyzer.
     """
+    args = parse_args(argv)
+    if args.export == "-":
+        export_target = sys.stdout
+        # stdout only carries the events, so it can be piped to other tools.
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                run(args, export_target)
+        except BrokenPipeError:
+            # The reading end was closed early, e.g. by `| head`.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    elif args.export:
+        with open(args.export, "w", encoding="utf-8") as export_target:
+            run(args, export_target)
+    else:
+        run(args)
+
+
+def run(args: argparse.Namespace, export_target: Optional[TextIO] = None) -> None:
+    """
+    Runs the analysis selected on the command line.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+        export_target (Optional[TextIO]): Where the events are streamed as NDJSON, if at all.
+    """
     # Resolve the path to patterns.yaml relative to this script
     base_path = Path(__file__).parent
     patterns_path = base_path / "core" / "patterns.yaml"
 
     log_analyzer = LogAnalyzer()
 
+    rules_loaded = False
     try:
-        rules_data = load_patterns(patterns_path)
-        log_analyzer.load_rules(rules_data)
-        print(f"Successfully loaded {len(rules_data.get('rules', []))} rules.")
+        log_analyzer.add_rules(
+            load_ruleset(patterns_path, use_cache=not args.no_rule_cache)
+        )
+        print(f"Successfully loaded {len(log_analyzer.rules)} rules.")
+        rules_loaded = True
     except FileNotFoundError:
         print(f"Error: Could not find patterns file at {patterns_path}")
-    except yaml.YAMLError as exc:
+    except RuleLintError as exc:
+        print(f"Error: {exc}")
+    except Exception as exc:
+        if not _is_yaml_error(exc):
+            raise
         print(f"Error parsing YAML file: {exc}")
 
-    with open(settings.trace_path, "r", encoding="utf-8") as trace_file:
-        log_analyzer.process_log_file(trace_file.read())
-
-    report = log_analyzer.generate_report_json()
-    print_summary(report)
+    if args.lint_rules:
+        print_rule_lint(load_patterns(patterns_path))
+        return
+
+    if args.fleet_report:
+        print_fleet_report(
+            FleetStats.combine(FleetStats.load(path) for path in args.fleet_report)
+        )
+        return
+
+    if args.rule_history or args.throttling_per_week:
+        with HistoryStore(args.history or None) as history:
+            print_history_report(history, args)
+        return
+
+    # An analysis without rules would look clean while detecting nothing.
+    if not rules_loaded:
+        sys.exit(1)
+
+    if args.batch:
+        rules_data = {"rules": [rule.model_dump() for rule in log_analyzer.rules]}
+        run_batch(args.batch, rules_data, args.workers, args.fleet_stats)
+        return
+
+    summary = SummaryAggregator()
+    log_analyzer.add_aggregator(summary)
+    episodes = FfbEpisodeDetector()
+    log_analyzer.add_aggregator(episodes)
+    segmenter = SessionSegmenter(log_analyzer.rules)
+    if args.phases:
+        log_analyzer.add_aggregator(segmenter)
+    fleet = FleetStatsAggregator()
+    if args.fleet_stats is not None:
+        log_analyzer.add_aggregator(fleet)
+    exporter = None
+    if export_target is not None:
+        # The fields were already checked by parse_args.
+        exporter = NdjsonExporter(
+            export_target,
+            fields=parse_field_list(args.export_fields),
+            rule_ids=parse_field_list(args.export_rules),
+        )
+        log_analyzer.add_aggregator(exporter)
+    profiler = log_analyzer.enable_rule_profiling() if args.profile_rules else None
+    miner = None
+    if args.mine_templates is not None:
+        miner = log_analyzer.enable_template_mining()
+    # Profiling and mining only see the lines matched in this process.
+    sequential = profiler is not None or miner is not None
+    if args.order_profile is not None and args.order_profile.is_file():
+        log_analyzer.set_rule_priors(load_order_profile(args.order_profile))
+
+    # Batch, fleet and history reports never touch the configured trace, so
+    # the settings are only resolved from here on.
+    if args.follow:
+        follow_trace(log_analyzer, args.interval, exporter)
+    elif args.parallel and not sequential:
+        analyze_parallel(log_analyzer, get_settings().trace_path, workers=args.workers)
+    elif args.history is not None:
+        with HistoryStore(args.history or None) as history:
+            if analyze_cached(
+                log_analyzer,
+                history,
+                get_settings().trace_path,
+                file_hash(patterns_path),
+                rig=args.rig,
+            ):
+                print("Reusing the stored results of this trace.")
+    else:
+        # Only the aggregated summary is printed, so the events need not be kept.
+        log_analyzer.keep_events = False
+        log_analyzer.process_stream(get_settings().trace_path)
+
+    print_aggregated_summary(summary, episodes)
+    if args.phases:
+        print_phase_summary(segmenter)
+    if profiler is not None:
+        print_rule_profile(profiler)
+    if miner is not None:
+        print_templates(miner, args.mine_templates)
+    if args.order_profile is not None:
+        save_order_profile(args.order_profile, log_analyzer.rule_hit_counts())
+    if args.fleet_stats is not None:
+        fleet.stats().save(args.fleet_stats)
 
 
 """
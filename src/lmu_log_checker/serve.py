@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import List, Optional
+
+from lmu_log_checker.core.daemon import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    MAX_BODY_SIZE,
+    AnalysisDaemon,
+)
+from lmu_log_checker.core.rule_cache import load_ruleset
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the daemon.
+
+    Args:
+        argv (Optional[List[str]]): The arguments to parse, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="LMU Log Checker analysis daemon")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP."
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=8,
+        help="Submissions admitted at once; more are answered with 503.",
+    )
+    parser.add_argument(
+        "--patterns",
+        type=Path,
+        default=Path(__file__).parent / "core" / "patterns.yaml",
+        help="The ruleset to serve.",
+    )
+    parser.add_argument(
+        "--max-body-size",
+        type=int,
+        default=MAX_BODY_SIZE,
+        metavar="BYTES",
+        help="Largest accepted upload; bigger ones are answered with 413.",
+    )
+    parser.add_argument(
+        "--trace-dir",
+        type=Path,
+        default=None,
+        help="Allow POST /analyze?path= for files inside this directory.",
+    )
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """
+    Runs the daemon until it is cancelled.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    daemon = AnalysisDaemon(
+        load_ruleset(args.patterns),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        max_body_size=args.max_body_size,
+        trace_dir=args.trace_dir,
+    )
+    if args.unix:
+        server = await daemon.start_unix(args.unix)
+        print(f"Serving {len(daemon.rules)} rules on {args.unix}")
+    else:
+        server = await daemon.start(args.host, args.port)
+        port = server.sockets[0].getsockname()[1]
+        print(f"Serving {len(daemon.rules)} rules on http://{args.host}:{port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await daemon.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entry point of ``python -m lmu_log_checker.serve``.
+    """
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
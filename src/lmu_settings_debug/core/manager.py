@@ -3,7 +3,7 @@ import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
-from settings import settings
+from settings import get_settings
 
 
 class DeviceControlManager:
@@ -11,13 +11,16 @@ class DeviceControlManager:
     Manages device configurations stored in a JSON file.
     """
 
-    def __init__(self, file_path: Union[str, Path] = settings.direct_input):
+    def __init__(self, file_path: Optional[Union[str, Path]] = None):
         """
         Initializes the DeviceControlManager with a given file path.
 
         Args:
-            file_path (Union[str, Path]): The path to the JSON configuration file.
+            file_path (Optional[Union[str, Path]]): The path to the JSON configuration file,
+                                                    defaults to the configured direct input.json.
         """
+        if file_path is None:
+            file_path = get_settings().direct_input
         self.file_path = Path(file_path)
         self.raw_data = self._read_json(self.file_path)
         self._config_path = self._get_config_path()
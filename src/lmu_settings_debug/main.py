@@ -1,7 +1,7 @@
 import pprint
 from time import sleep
 from lmu_settings_debug.core.manager import DeviceControlManager
-from settings import settings
+from settings import get_settings
 
 _first_step_explanation = """Your devices likely have a few default settings, that are causing cpu usage while lowering your game's overall performance.
 If you are experiencing slight stutters here and there, there is likely a chance, that your 'direct input.json' is a bit corrupted.
@@ -12,6 +12,7 @@ If you want to see what's going on behind, open the src/lmu_settings_debug/main_
 
 
 def main():
+    settings = get_settings()
     manager = DeviceControlManager()
 
     print("Welcome to LMU Device-Settings Debugger!")
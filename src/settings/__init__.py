@@ -1,3 +1,32 @@
-from .settings import settings
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["settings"]
+if TYPE_CHECKING:
+    from .settings import Settings
+
+
+def get_settings() -> "Settings":
+    """
+    Returns the cached settings, loading them on the first call.
+
+    Importing this package is cheap: pydantic-settings, python-dotenv and the
+    path resolution are only loaded here.
+    """
+    from .settings import get_settings as _get_settings
+
+    return _get_settings()
+
+
+# Before the settings were loaded lazily, `from settings import settings`
+# returned the loaded instance. It now returns the `settings.settings`
+# submodule, which would shadow any alias defined here. Call get_settings()
+# instead; `from settings.settings import settings` still works but is
+# deprecated.
+def __getattr__(name: str) -> Any:
+    if name == "Settings":
+        from .settings import Settings
+
+        return Settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Settings", "get_settings"]
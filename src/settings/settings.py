@@ -1,12 +1,14 @@
 import sys
+import warnings
+from functools import lru_cache
+from typing import Any
 
-from dotenv import load_dotenv, find_dotenv
 from pydantic import ValidationError, field_validator
 from pydantic_settings import BaseSettings
 from pathlib import Path
-from _helper.create_env import create_env
 
-load_dotenv(find_dotenv())
+# Plain traces and the archives the log checker decompresses on the fly.
+TRACE_SUFFIXES = (".txt", ".gz", ".xz", ".bz2")
 
 
 class Settings(BaseSettings):
@@ -16,8 +18,10 @@ class Settings(BaseSettings):
     @field_validator("trace_path", mode="before")
     @classmethod
     def _validate_trace_path(cls, value: str) -> Path:
-        if not value.endswith(".txt"):
-            raise ValueError(f"File: {value} is not a .txt file.")
+        if not value.endswith(TRACE_SUFFIXES):
+            raise ValueError(
+                f"File: {value} is not a .txt file or a .gz/.xz/.bz2 archive."
+            )
 
         _trace_path: Path = Path(value)
         if _trace_path.is_file():
@@ -38,13 +42,24 @@ class Settings(BaseSettings):
         raise ValueError(f"Path: {_direct_input} does not exist.")
 
 
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
     """
     Loads settings with a fallback to interactive creation.
+
+    Nothing is resolved when the module is imported: the .env file is read,
+    the paths are validated and, if that fails, the interactive setup is
+    started on the first call only. Later calls return the same object;
+    ``get_settings.cache_clear()`` forces a reload.
     """
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv())
     try:
         return Settings()  # type: ignore
     except (ValidationError, ValueError):
+        from _helper.create_env import create_env
+
         print("\nConfiguration missing or invalid. Starting setup...")
         create_env()
 
@@ -58,9 +73,20 @@ def get_settings() -> Settings:
             sys.exit(1)
 
 
-settings = get_settings()
+def __getattr__(name: str) -> Any:
+    # Keeps `from settings.settings import settings` working, resolved on use.
+    if name == "settings":
+        warnings.warn(
+            "`from settings.settings import settings` is deprecated; "
+            "call settings.get_settings() instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
+    settings = get_settings()
     print(settings.trace_path)
     print(settings.direct_input)
@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+from lmu_log_checker.bench.harness import (
+    find_regressions,
+    load_baselines,
+    measure_startup,
+    relative_metrics,
+    run_benchmarks,
+    STARTUP_COMMANDS,
+)
+from lmu_log_checker.bench.synthetic import (
+    NOISE_SAMPLES,
+    RULE_SAMPLES,
+    generate_trace,
+    parse_size,
+)
+from lmu_log_checker.core.log_analyzer import LogAnalyzer, parse_rules
+
+PATTERNS_PATH = (
+    Path(__file__).parent.parent / "src" / "lmu_log_checker" / "core" / "patterns.yaml"
+)
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+BASELINE_SIZE = "1MB"
+
+
+def _rules() -> list:
+    return parse_rules(yaml.safe_load(PATTERNS_PATH.read_text(encoding="utf-8")))
+
+
+def test_every_rule_has_a_matching_sample_and_noise_matches_nothing() -> None:
+    rules = _rules()
+    assert set(RULE_SAMPLES) == {rule.id for rule in rules}
+
+    rng = random.Random(0)
+    for rule in rules:
+        _, factory = RULE_SAMPLES[rule.id]
+        for _ in range(20):
+            assert rule.regex.search(factory(rng)), rule.id
+    for _, factory in NOISE_SAMPLES:
+        for _ in range(20):
+            message = factory(rng)
+            assert not any(rule.regex.search(message) for rule in rules), message
+
+
+def test_generate_trace_is_deterministic_and_sized() -> None:
+    first, second = io.BytesIO(), io.BytesIO()
+    trace = generate_trace(first, 64 * 1024, seed=7)
+    generate_trace(second, 64 * 1024, seed=7)
+
+    assert first.getvalue() == second.getvalue()
+    assert trace.size == len(first.getvalue())
+    assert 64 * 1024 <= trace.size < 64 * 1024 + 1024
+
+    analyzer = LogAnalyzer()
+    analyzer.load_rules(yaml.safe_load(PATTERNS_PATH.read_text(encoding="utf-8")))
+    analyzer.process_stream(io.BytesIO(first.getvalue()))
+    # Every planted line is detected (by its own rule or one declared before
+    # it for the same file) and no noise line is.
+    assert len(analyzer.events) == sum(trace.planted.values())
+
+
+def test_parse_size() -> None:
+    assert parse_size("512") == 512
+    assert parse_size("1MB") == 1024**2
+    assert parse_size("1.5gb") == int(1.5 * 1024**3)
+
+
+def test_find_regressions_respects_direction_and_tolerance() -> None:
+    baseline = {"lines": 10.0, "lines_per_sec": 1000.0, "cli_seconds": 1.0}
+
+    assert (
+        find_regressions({"lines_per_sec": 600.0, "cli_seconds": 1.9}, baseline) == []
+    )
+    regressions = find_regressions(
+        {"lines_per_sec": 400.0, "cli_seconds": 2.5}, baseline
+    )
+    assert [text.split(":")[0] for text in regressions] == [
+        "lines_per_sec",
+        "cli_seconds",
+    ]
+
+
+def test_imports_do_not_resolve_settings_or_load_heavy_dependencies(
+    tmp_path,
+) -> None:
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("TRACE_PATH", "DIRECT_INPUT")
+    }
+    env["PYTHONPATH"] = str(PATTERNS_PATH.parents[2])
+    script = (
+        "import sys, json, lmu_log_checker, lmu_log_checker.core.ingest, settings, "
+        "lmu_settings_debug.main; print(json.dumps([m for m in ("
+        "'pydantic', 'pydantic_settings', 'dotenv', 'yaml', 'psutil') "
+        "if m in sys.modules]))"
+    )
+    # No paths configured and stdin closed: resolving the settings would fail.
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        cwd=tmp_path,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert json.loads(output) == []
+
+
+def test_relative_metrics_divide_by_the_host_reference() -> None:
+    results = {
+        "reference_ms": 20.0,
+        "analysis_ms": 40.0,
+        "cli_seconds": 0.4,
+        "startup_python_ms": 10.0,
+        "startup_cli_ms": 200.0,
+    }
+    ratios = relative_metrics(results)
+    assert ratios == {
+        "analysis_ratio": 2.0,
+        "cli_ratio": 20.0,
+        "startup_cli_ratio": 20.0,
+    }
+    # A machine twice as slow in every respect yields the same ratios.
+    slower = {metric: value * 2 for metric, value in results.items()}
+    assert relative_metrics(slower) == ratios
+
+
+@pytest.mark.benchmark
+def test_startup_commands_run_without_settings(tmp_path) -> None:
+    startup = measure_startup(tmp_path, repeats=1)
+    assert set(startup) == set(STARTUP_COMMANDS)
+    assert all(value > 0 for value in startup.values())
+
+
+@pytest.mark.benchmark
+def test_no_performance_regression_against_baseline(tmp_path) -> None:
+    baseline = load_baselines(BASELINE_PATH)[BASELINE_SIZE]
+    tolerance = float(os.environ.get("LMU_BENCH_TOLERANCE", "1.0"))
+    results = run_benchmarks(parse_size(BASELINE_SIZE), tmp_path, repeats=5)
+    assert find_regressions(relative_metrics(results), baseline, tolerance) == []
@@ -1,6 +1,60 @@
+import asyncio
+import bz2
+import gzip
 import json
+import lzma
+import pickle
+import random
+import re
+from pathlib import Path
 
-from lmu_log_checker.core.log_analyzer import LogAnalyzer
+import pytest
+import yaml
+
+from lmu_log_checker import main as cli
+from lmu_log_checker import serve
+from lmu_log_checker.core import history as history_module
+from lmu_log_checker.core import rule_lint
+from lmu_log_checker.core.aggregators import (
+    RuleCountAggregator,
+    SummaryAggregator,
+    UniqueDetailAggregator,
+)
+from lmu_log_checker.core.batch import analyze_batch, collect_trace_files
+from lmu_log_checker.core.daemon import AnalysisDaemon
+from lmu_log_checker.core.event_store import EventStore
+from lmu_log_checker.core.export import NdjsonExporter, read_ndjson, write_ndjson
+from lmu_log_checker.core.ffb_episodes import FfbEpisodeDetector
+from lmu_log_checker.core.fleet import (
+    CountMap,
+    FleetStats,
+    FleetStatsAggregator,
+    LogHistogram,
+)
+from lmu_log_checker.core.history import (
+    HistoryStore,
+    analyze_cached,
+    file_hash,
+    results_key,
+)
+from lmu_log_checker.core.log_analyzer import LogAnalyzer, parse_rules
+from lmu_log_checker.core.matcher import AdaptiveRuleMatcher, required_literals
+from lmu_log_checker.core.models import AnalysisEvent, EventRecord
+from lmu_log_checker.core.parallel import analyze_parallel, split_chunks
+from lmu_log_checker.core.rule_cache import load_ruleset
+from lmu_log_checker.core.rule_lint import (
+    LintIssue,
+    RuleLintError,
+    RuleLintWarning,
+    lint_rules,
+)
+from lmu_log_checker.core.sessions import SessionSegmenter
+from lmu_log_checker.core.tail import TraceFollower
+from lmu_log_checker.core.templates import TemplateMiner
+
+PATTERNS_PATH = (
+    Path(__file__).parent.parent / "src" / "lmu_log_checker" / "core" / "patterns.yaml"
+)
 
 
 def _build_rules_data() -> dict:
@@ -69,3 +123,1169 @@ def test_process_log_file_creates_events() -> None:
 
     # Sanity check JSON serializability
     json.dumps(report)
+
+
+def _sample_log() -> str:
+    return "\r\n".join(
+        [
+            "12.34s ContentLoadi 123: Missing texture.dds",
+            "15.00s OtherFile 200: Missing mesh.msh",
+            "20.00s Render 10: Warning: high latency",
+            "not a log line",
+            "21.50s ContentLoadi 124: Missing Ä-sound.wav",
+        ]
+    )
+
+
+def test_process_stream_matches_process_log_file(tmp_path) -> None:
+    trace = tmp_path / "trace.txt"
+    trace.write_bytes(_sample_log().encode("utf-8"))
+
+    expected = _make_analyzer()
+    expected.load_rules(_build_rules_data())
+    expected.process_log_file(_sample_log())
+
+    with trace.open("rb") as binary_file:
+        for source in (
+            trace,
+            str(trace),
+            binary_file,
+            iter(_sample_log().splitlines(keepends=True)),
+        ):
+            analyzer = _make_analyzer()
+            analyzer.load_rules(_build_rules_data())
+            analyzer.process_stream(source)
+            assert analyzer.generate_report_json() == expected.generate_report_json()
+
+    assert len(expected.events) == 3
+
+
+def test_dispatch_index_keeps_declaration_order() -> None:
+    analyzer = _make_analyzer()
+    analyzer.load_rules(
+        {
+            "rules": [
+                {
+                    "id": "ANY_WARNING",
+                    "category": "warning",
+                    "description": "Unscoped, declared first",
+                    "pattern": r"Warning: (?P<text>.+)",
+                },
+                {
+                    "id": "GAME_WARNING",
+                    "category": "warning",
+                    "description": "Scoped, declared second",
+                    "pattern": r"Warning: (?P<text>.+)",
+                    "trigger_file": "game.cpp",
+                },
+                {
+                    "id": "GAME_STATE",
+                    "category": "state",
+                    "description": "Scoped to game.cpp",
+                    "pattern": r"Entered (?P<state>\w+)",
+                    "trigger_file": "game.cpp",
+                },
+            ]
+        }
+    )
+
+    analyzer.process_log_file(
+        "\n".join(
+            [
+                "1.00s game.cpp 1: Warning: shadowed by unscoped rule",
+                "2.00s game.cpp 2: Entered Track",
+                "3.00s hwinput.cpp 3: Entered Track",
+                "4.00s hwinput.cpp 4: Warning: unscoped only",
+            ]
+        )
+    )
+
+    assert [(e.rule_id, e.timestamp) for e in analyzer.events] == [
+        ("ANY_WARNING", 1.0),
+        ("GAME_STATE", 2.0),
+        ("ANY_WARNING", 4.0),
+    ]
+
+
+def test_required_literals_are_conservative() -> None:
+    assert required_literals(r"Error opening (?P<file_name>.*)") == ("error opening ",)
+    assert required_literals("Resetting gamepad|Resetting FFB device") == (
+        "resetting gamepad",
+        "resetting ffb device",
+    )
+    assert required_literals(r"Entered Game::Enter\(\)") == ("entered game::enter()",)
+    # Quantified characters are not part of the literal.
+    assert required_literals("abcd?e") == ("abc",)
+    # Nothing usable: no prefilter, the rule is always evaluated.
+    assert required_literals(r"(?P<ms>\d+)ms|spike") is None
+    assert required_literals("a{2}bc") is None
+
+
+@pytest.mark.parametrize(
+    "pattern, message",
+    [
+        (r"Device\x20Name: (?P<n>\w+)", "Device Name: Wheel"),
+        (r"Err\101r opening", "ErrAr opening"),
+        (r"k\x41bc", "kAbc"),
+        (r"Err\u0041r opening", "ErrAr opening"),
+        (r"Err\U00000041r opening", "ErrAr opening"),
+        (r"Err\N{LATIN CAPITAL LETTER A}r opening", "ErrAr opening"),
+        (r"Err[\x41\u0042]r opening", "ErrBr opening"),
+    ],
+)
+def test_prefilter_keeps_matches_of_numeric_escapes(pattern, message) -> None:
+    literals = required_literals(pattern)
+    assert literals is None or any(lit in message.lower() for lit in literals)
+
+    analyzer = LogAnalyzer()
+    analyzer.load_rules(
+        {
+            "rules": [
+                {
+                    "id": "ESCAPED",
+                    "category": "test",
+                    "description": "Numeric escapes",
+                    "pattern": pattern,
+                }
+            ]
+        }
+    )
+    analyzer.process_stream([f"1.00s Game.cpp 10: {message}"])
+    assert [event.rule_id for event in analyzer.events] == ["ESCAPED"]
+
+
+def test_prefilter_does_not_change_matches() -> None:
+    rules_data = {
+        "rules": [
+            {
+                "id": "ERR_OPENING",
+                "category": "asset_error",
+                "description": "Unscoped",
+                "pattern": r"Error opening (?P<file_name>.*)",
+            },
+            {
+                "id": "NO_LITERAL",
+                "category": "test",
+                "description": "Cannot be prefiltered",
+                "pattern": r"^(?P<value>\d+)$",
+            },
+        ]
+    }
+    analyzer = _make_analyzer()
+    analyzer.load_rules(rules_data)
+
+    analyzer.process_log_file(
+        "\n".join(
+            [
+                "1.00s main.cpp 1: ERROR OPENING foo.mas",
+                "2.00s main.cpp 2: nothing to see",
+                "3.00s main.cpp 3: 12345",
+                # Non-ASCII lines bypass the prefilter.
+                "4.00s main.cpp 4: Error opening föö.mas",
+            ]
+        )
+    )
+
+    assert [(e.rule_id, e.captured_data) for e in analyzer.events] == [
+        ("ERR_OPENING", {"file_name": "foo.mas"}),
+        ("NO_LITERAL", {"value": "12345"}),
+        ("ERR_OPENING", {"file_name": "föö.mas"}),
+    ]
+
+
+def test_events_are_built_lazily_from_records() -> None:
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    analyzer.process_log_file(_sample_log())
+
+    events = analyzer.events
+    assert all(isinstance(event, AnalysisEvent) for event in events)
+    assert analyzer.events is events
+    assert [event.model_dump() for event in events] == analyzer.generate_report_json()
+
+    analyzer.process_log_file("30.00s Render 11: Warning: again")
+    assert len(analyzer.events) == 4
+    assert analyzer.events[-1].captured_data == {"message": "again"}
+
+
+def test_trace_follower_reads_only_appended_lines(tmp_path) -> None:
+    trace = tmp_path / "trace.txt"
+    trace.write_bytes(b"12.34s ContentLoadi 123: Missing texture.dds\n20.00s Ren")
+
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    follower = TraceFollower(analyzer, trace)
+
+    assert [e.rule_id for e in follower.poll()] == ["ERR_MISSING"]
+    assert follower.poll() == []
+
+    with trace.open("ab") as file:
+        file.write(b"der 10: Warning: high latency\n21.00s Render 11: Warn")
+    events = follower.poll()
+    assert [e.captured_data for e in events] == [{"message": "high latency"}]
+
+    with trace.open("ab") as file:
+        file.write(b"ing: unterminated")
+    assert follower.poll() == []
+    assert [e.captured_data for e in follower.flush()] == [{"message": "unterminated"}]
+
+
+def test_trace_follower_restarts_on_truncation(tmp_path) -> None:
+    trace = tmp_path / "trace.txt"
+    trace.write_bytes(b"1.00s Render 1: Warning: first session, long line\n")
+
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    follower = TraceFollower(analyzer, trace)
+    follower.poll()
+
+    # The game restarted and rewrote a shorter trace.
+    trace.write_bytes(b"0.50s Render 1: Warning: second\n")
+    events = follower.poll()
+
+    assert follower.restarts == 1
+    assert [e.captured_data for e in events] == [{"message": "second"}]
+
+    # A rewrite that grew past the old offset is caught by the head signature.
+    trace.write_bytes(b"0.50s Render 1: Warning: thirds\n0.60s Render 2: Warning: x\n")
+    events = follower.poll()
+    assert follower.restarts == 2
+    assert [e.captured_data["message"] for e in events] == ["thirds", "x"]
+
+
+def test_analyze_batch_keeps_results_per_file(tmp_path) -> None:
+    (tmp_path / "rig1").mkdir()
+    (tmp_path / "rig2").mkdir()
+    (tmp_path / "rig1" / "trace.txt").write_text(_sample_log(), encoding="utf-8")
+    (tmp_path / "rig2" / "trace_2.txt").write_text(
+        "1.00s Render 1: Warning: rig two\n", encoding="utf-8"
+    )
+    (tmp_path / "rig2" / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    batch_report = analyze_batch(tmp_path, _build_rules_data(), max_workers=2)
+
+    expected = _make_analyzer()
+    expected.load_rules(_build_rules_data())
+    expected.keep_events = False
+    summary = SummaryAggregator()
+    expected.add_aggregator(summary)
+    expected.process_log_file(_sample_log())
+    expected.process_log_file("1.00s Render 1: Warning: rig two\n")
+
+    rig1 = str(tmp_path / "rig1" / "trace.txt")
+    rig2 = str(tmp_path / "rig2" / "trace_2.txt")
+    assert batch_report.event_counts == {
+        rig1: {"ERR_MISSING": 2, "WARN_LATENCY": 1},
+        rig2: {"WARN_LATENCY": 1},
+    }
+    assert batch_report.rule_counts()["WARN_LATENCY"] == {rig1: 1, rig2: 1}
+    assert batch_report.errors == {}
+    assert batch_report.fleet.traces == 2
+
+    # The merged summaries equal one summary fed every event.
+    merged = batch_report.summary
+    assert merged.rule_counts.counts == summary.rule_counts.counts
+    for rule_id in summary.rule_counts.counts:
+        assert merged.details.sample(rule_id) == summary.details.sample(rule_id)
+        assert merged.details.unique_count(rule_id) == summary.details.unique_count(
+            rule_id
+        )
+
+
+@pytest.mark.parametrize(
+    "suffix, compress",
+    [(".gz", gzip.compress), (".xz", lzma.compress), (".bz2", bz2.compress)],
+)
+def test_compressed_traces_are_streamed(tmp_path, suffix, compress) -> None:
+    plain = tmp_path / "trace.txt"
+    plain.write_bytes(_sample_log().encode("utf-8") * 50)
+    archive = tmp_path / f"trace_archived.txt{suffix}"
+    archive.write_bytes(compress(plain.read_bytes()))
+
+    expected = _make_analyzer()
+    expected.load_rules(_build_rules_data())
+    expected.process_stream(plain)
+
+    for analyze in (
+        lambda analyzer: analyzer.process_stream(archive),
+        lambda analyzer: analyze_parallel(analyzer, archive, workers=2, chunks=4),
+    ):
+        analyzer = _make_analyzer()
+        analyzer.load_rules(_build_rules_data())
+        analyze(analyzer)
+        assert analyzer.generate_report_json() == expected.generate_report_json()
+
+    assert collect_trace_files(tmp_path) == [plain, archive]
+    report = analyze_batch(tmp_path, _build_rules_data(), max_workers=1)
+    assert report.event_counts[str(archive)] == report.event_counts[str(plain)]
+
+    # The history hashes the raw archive while it is parsed, like file_hash.
+    with HistoryStore(":memory:") as history:
+        cached = _make_analyzer()
+        cached.load_rules(_build_rules_data())
+        assert not analyze_cached(cached, history, archive, "rules-v1")
+        assert cached.generate_report_json() == expected.generate_report_json()
+        assert history.lookup(file_hash(archive), results_key("rules-v1"))
+
+    # A truncated archive is reported instead of aborting the batch.
+    archive.write_bytes(archive.read_bytes()[:-20])
+    assert str(archive) in analyze_batch([archive], _build_rules_data()).errors
+
+
+def test_analyze_parallel_matches_sequential(tmp_path) -> None:
+    trace = tmp_path / "trace.txt"
+    lines = [
+        (
+            f"{i}.00s ContentLoadi {i}: Missing asset_{i}.dds\r\n"
+            if i % 3
+            else f"{i}.00s Render {i}: Warning: spike {i}\n"
+        )
+        for i in range(200)
+    ]
+    trace.write_bytes("".join(lines).encode("utf-8"))
+
+    assert split_chunks(trace, 4)[0][0] == 0
+    assert split_chunks(trace, 4)[-1][1] == trace.stat().st_size
+
+    sequential = _make_analyzer()
+    sequential.load_rules(_build_rules_data())
+    sequential.process_stream(trace)
+
+    parallel = _make_analyzer()
+    parallel.load_rules(_build_rules_data())
+    analyze_parallel(parallel, trace, workers=2, chunks=4)
+
+    assert parallel.generate_report_json() == sequential.generate_report_json()
+    assert len(parallel.events) == 200
+
+
+def test_ndjson_export_streams_filters_and_reads_back(tmp_path) -> None:
+    reference = _make_analyzer()
+    reference.load_rules(_build_rules_data())
+    reference.process_log_file(_sample_log())
+
+    export = tmp_path / "events.ndjson"
+    with export.open("w", encoding="utf-8") as target:
+        streaming = _make_analyzer()
+        streaming.load_rules(_build_rules_data())
+        streaming.keep_events = False
+        exporter = NdjsonExporter(target)
+        streaming.add_aggregator(exporter)
+        streaming.process_stream(iter(_sample_log().splitlines()))
+        exporter.flush()
+        # A reader tailing the export sees the lines before it is closed.
+        assert len(export.read_text(encoding="utf-8").splitlines()) == 3
+
+    assert exporter.written == 3 and streaming.records == []
+    assert list(read_ndjson(export)) == reference.generate_report_json()
+
+    archive = tmp_path / "events.ndjson.gz"
+    with gzip.open(archive, "wt", encoding="utf-8") as target:
+        written = write_ndjson(
+            reference.event_store,
+            target,
+            fields=["rule_id", "captured_data"],
+            rule_ids=["ERR_MISSING"],
+        )
+    assert written == 2
+    assert list(read_ndjson(archive)) == [
+        {"rule_id": "ERR_MISSING", "captured_data": {"asset": "texture.dds"}},
+        {"rule_id": "ERR_MISSING", "captured_data": {"asset": "Ä-sound.wav"}},
+    ]
+
+    with pytest.raises(ValueError, match="Unknown export field"):
+        NdjsonExporter(target, fields=["rule", "timestamp"])
+    export.write_text('{"rule_id": "A"}\n\nnot json\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="Line 3"):
+        list(read_ndjson(export))
+
+
+def test_event_store_queries() -> None:
+    store = EventStore(
+        [
+            EventRecord("ERR_OPENING", 1.0, "main.cpp", "Error opening a", {"f": "a"}),
+            EventRecord("ERR_OPENING", 2.5, "main.cpp", "Error opening a", {"f": "a"}),
+            EventRecord("SLOW", 3.0, "game.cpp", "Frame time spike", {"ms": None}),
+            EventRecord("ERR_OPENING", 10.0, "main.cpp", "Error opening b", {"f": "b"}),
+        ]
+    )
+
+    assert len(store) == 4
+    assert store.counts() == {"ERR_OPENING": 3, "SLOW": 1}
+    assert store.record(2).captured_data == {"ms": None}
+    assert store.count_between(1.0, 3.0) == 2
+    assert [r.timestamp for r in store.between(0.0, 20.0, "ERR_OPENING")] == [
+        1.0,
+        2.5,
+        10.0,
+    ]
+    assert store.max_window_count(5.0, "ERR_OPENING") == (1.0, 2)
+    assert store.window_rates(5.0) == [(1.0, 0.6), (6.0, 0.2)]
+
+    # Out-of-order timestamps (e.g. a restarted game) fall back to a scan.
+    store.append("SLOW", 0.5, "game.cpp", "Frame time spike", {"ms": "40"})
+    assert not store.is_sorted
+    assert store.count_between(0.0, 1.5) == 2
+
+    for window in (0.0, -1.0):
+        with pytest.raises(ValueError, match="positive"):
+            store.window_rates(window)
+        with pytest.raises(ValueError, match="positive"):
+            store.max_window_count(window)
+    # A non-string capture would come back as a string, so it is refused
+    # before anything is stored.
+    with pytest.raises(TypeError, match="int"):
+        store.append("SLOW", 11.0, "game.cpp", "Frame time spike", {"ms": 40})
+    assert len(store) == 5
+
+
+def test_analyzer_events_are_backed_by_event_store() -> None:
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    analyzer.process_log_file(_sample_log())
+
+    assert analyzer.event_store.counts() == {"ERR_MISSING": 2, "WARN_LATENCY": 1}
+    assert list(analyzer.event_store) == analyzer.records
+    assert pickle.loads(pickle.dumps(analyzer.event_store)).counts() == (
+        analyzer.event_store.counts()
+    )
+
+
+def test_load_ruleset_uses_and_invalidates_cache(tmp_path, monkeypatch) -> None:
+    patterns = tmp_path / "patterns.yaml"
+    patterns.write_text(yaml.safe_dump(_build_rules_data()), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    cold = load_ruleset(patterns, cache_dir=cache_dir)
+    assert [rule.id for rule in cold] == ["ERR_MISSING", "WARN_LATENCY"]
+    assert len(list(cache_dir.glob("rules-*.pickle"))) == 1
+
+    # A warm start must not parse the YAML again.
+    def fail(*args, **kwargs):
+        raise AssertionError("YAML parsed on a warm start")
+
+    monkeypatch.setattr(yaml, "safe_load", fail)
+    warm = load_ruleset(patterns, cache_dir=cache_dir)
+    assert [rule.model_dump() for rule in warm] == [rule.model_dump() for rule in cold]
+    monkeypatch.undo()
+
+    # Editing the ruleset invalidates the entry and removes the stale one.
+    data = _build_rules_data()
+    data["rules"].pop()
+    patterns.write_text(yaml.safe_dump(data), encoding="utf-8")
+    assert [rule.id for rule in load_ruleset(patterns, cache_dir=cache_dir)] == [
+        "ERR_MISSING"
+    ]
+    (cache_file,) = cache_dir.glob("rules-*.pickle")
+
+    # A corrupt entry is treated as a miss and rewritten.
+    cache_file.write_bytes(b"not a pickle")
+    assert len(load_ruleset(patterns, cache_dir=cache_dir)) == 1
+    assert cache_file.read_bytes() != b"not a pickle"
+
+
+def test_aggregators_are_fed_while_matching() -> None:
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    analyzer.keep_events = False
+    summary = SummaryAggregator()
+    analyzer.add_aggregator(summary)
+
+    analyzer.process_log_file(_sample_log())
+
+    assert analyzer.events == []
+    assert summary.rule_counts.counts == {"ERR_MISSING": 2, "WARN_LATENCY": 1}
+    assert sorted(summary.details.sample("ERR_MISSING")) == [
+        "texture.dds",
+        "Ä-sound.wav",
+    ]
+
+
+def test_unique_detail_aggregator_stays_bounded() -> None:
+    details = UniqueDetailAggregator(samples=3, max_tracked=10)
+    for i in range(1000):
+        details.add("ERR_OPENING", float(i), "main.cpp", "", {"file_name": f"f{i}"})
+        details.add("ERR_OPENING", float(i), "main.cpp", "", {"file_name": "same"})
+
+    assert len(details.sample("ERR_OPENING")) == 3
+    assert details.unique_count("ERR_OPENING") == (10, True)
+
+    # Repeats past max_tracked do not change which distinct details are shown.
+    once = UniqueDetailAggregator(samples=3, max_tracked=10)
+    for i in range(1000):
+        once.add("ERR_OPENING", float(i), "main.cpp", "", {"file_name": f"f{i}"})
+    once.add("ERR_OPENING", 0.0, "main.cpp", "", {"file_name": "same"})
+    assert details.sample("ERR_OPENING") == once.sample("ERR_OPENING")
+
+    # Merging the details of two halves gives the same sample and bound.
+    halves = [UniqueDetailAggregator(samples=3, max_tracked=10) for _ in range(2)]
+    for i in range(1000):
+        halves[i % 2].add("ERR_OPENING", 0.0, "main.cpp", "", {"file_name": f"f{i}"})
+    halves[1].add("ERR_OPENING", 0.0, "main.cpp", "", {"file_name": "same"})
+    halves[0].merge(halves[1])
+    assert halves[0].sample("ERR_OPENING") == once.sample("ERR_OPENING")
+    assert halves[0].unique_count("ERR_OPENING") == (10, True)
+
+
+def test_session_segmenter_builds_phase_intervals() -> None:
+    analyzer = _make_analyzer()
+    analyzer.add_rules(load_ruleset(PATTERNS_PATH, use_cache=False))
+    segmenter = SessionSegmenter(analyzer.rules)
+    analyzer.add_aggregator(segmenter)
+
+    analyzer.process_log_file(
+        "\n".join(
+            [
+                "1.0s main.cpp 1: Error opening startup.cfg",
+                "2.0s game.cpp 10: Entered Game::Enter()",
+                "5.0s game.cpp 11: Entered Track::Enter()",
+                "6.0s Masfile.cpp 3: Error opening MAS file foo.mas",
+                "9.0s game.cpp 12: Changing session from None to Practice1",
+                "10.0s game.cpp 13: Changing session state from Loading to Driving",
+                "12.0s hwinput.cpp 7: Resetting FFB device",
+                "40.0s game.cpp 14: Changing session from Practice1 to Race",
+                "55.0s hwinput.cpp 8: Resetting FFB device",
+            ]
+        )
+    )
+
+    assert [(i.phase, i.start, i.end) for i in segmenter.intervals] == [
+        ("menu", 2.0, 5.0),
+        ("loading", 5.0, 10.0),
+        ("practice", 10.0, 40.0),
+        ("race", 40.0, None),
+    ]
+    assert segmenter.phase_at(0.5) == "unknown"
+    assert segmenter.phase_at(7.0) == "loading"
+    assert segmenter.phase_at(40.0) == "race"
+    assert segmenter.phase_counts["practice"]["PHYS_FFB_RESET"] == 1
+    assert segmenter.phase_counts["loading"]["ERR_OPENING"] == 1
+    assert segmenter.phase_durations()["race"] == 15.0
+
+
+def test_ffb_episode_detector_pairs_engage_and_disengage() -> None:
+    detector = FfbEpisodeDetector()
+
+    def engage(ts: float, pct: str, hz: str) -> None:
+        detector.add(
+            "PHYS_FFB_THROTTLING",
+            ts,
+            "hwinput.cpp",
+            "",
+            {"reduction_pct": pct, "physics_hz": hz},
+        )
+
+    def restore(ts: float) -> None:
+        detector.add("PHYS_FFB_RESTORED", ts, "hwinput.cpp", "", {})
+
+    detector.add("ERR_OPENING", 0.0, "main.cpp", "", {})
+    engage(10.0, "20.0", "380.0")
+    engage(12.0, "75.5", "302.5")
+    restore(20.0)
+    restore(21.0)  # A stray disengage does not open anything.
+    engage(100.0, "10.0", "390.0")
+    detector.add("ERR_OPENING", 120.0, "main.cpp", "", {})
+
+    episodes = detector.episodes()
+    assert episodes[0] == (10.0, 20.0, 10.0, 302.5, 75.5, 8.0)
+    assert episodes[1].end is None
+    assert episodes[1].duration == 20.0
+    # The episode never recovered; the session end is no recovery time.
+    assert episodes[1].time_to_recovery is None
+
+    stats = detector.stats(window=60.0)
+    assert stats.episodes == 2
+    assert stats.throttled_time == 30.0
+    assert stats.episodes_per_minute == 1.0
+    assert (stats.worst_window_start, stats.worst_window_throttled) == (100.0, 20.0)
+    assert detector.stats(window=110.0).worst_window_throttled == 30.0
+
+
+def test_fleet_sketches_merge_associatively_in_bounded_memory(tmp_path) -> None:
+    rng = random.Random(7)
+    parts = [[rng.lognormvariate(5, 1) for _ in range(2000)] for _ in range(3)]
+    for max_buckets in (2048, 16):
+        a, b, c = (LogHistogram(max_buckets=max_buckets) for _ in range(3))
+        for histogram, values in zip((a, b, c), parts):
+            for value in values:
+                histogram.add(value)
+        left = a.model_copy(deep=True)
+        left.merge(b)
+        left.merge(c)
+        right = b.model_copy(deep=True)
+        right.merge(c)
+        right.merge(a)
+        assert left == right
+        assert len(left.buckets) <= max_buckets and left.count == 6000
+
+    exact = sorted(value for values in parts for value in values)
+    full = LogHistogram()
+    for value in exact:
+        full.add(value)
+    for q in (0.5, 0.9, 0.99):
+        expected = exact[int(q * (len(exact) - 1))]
+        assert abs(full.quantile(q) - expected) <= 0.01 * expected
+
+    counts = CountMap(max_keys=2)
+    for key in ("a", "b", "a", "c", "a", "b"):
+        counts.add(key)
+    assert counts.most_common() == [("a", 3), ("b", 2)] and counts.other == 1
+
+    def trace_stats(lines: list) -> FleetStats:
+        aggregator = FleetStatsAggregator()
+        analyzer = _make_analyzer()
+        analyzer.add_rules(load_ruleset(PATTERNS_PATH, cache_dir=tmp_path))
+        analyzer.add_aggregator(aggregator)
+        analyzer.process_stream(iter(lines))
+        return aggregator.stats()
+
+    throttled = "1.0s hwinput.cpp 1: Force feedback strength safety reduction engaged at {}% due to slow physics ticks ({}Hz)."
+    first = trace_stats(
+        [
+            throttled.format("25.00", "300.00"),
+            throttled.format("50.00", "350.00"),
+            '2.0s main.cpp 9: Hardware info: CPU: "Ryzen" 8 cores',
+            '3.0s main.cpp 9: Hardware info: CPU: "Ryzen" 8 cores',
+        ]
+    )
+    second = trace_stats(
+        [
+            "4.0s Render.cpp 2: Frame time spike: 80ms",
+            '5.0s main.cpp 9: Hardware info: CPU: "Xeon" 16 cores',
+        ]
+    )
+    fleet = FleetStats.combine([first, second])
+    fleet.save(tmp_path / "fleet.json")
+    fleet = FleetStats.load(tmp_path / "fleet.json")
+
+    assert fleet.traces == 2
+    assert fleet.histograms["physics_hz"].count == 2
+    assert abs(fleet.percentiles("physics_hz", [1.0])[1.0] - 350) <= 3.5
+    assert fleet.percentiles("slow_frame_ms", [0.5]) == {0.5: 80.0}
+    assert fleet.inventory["cpu"].most_common() == [("Ryzen", 1), ("Xeon", 1)]
+
+
+def test_history_reuses_results_and_answers_queries(tmp_path, monkeypatch) -> None:
+    trace = tmp_path / "trace.txt"
+    trace.write_bytes(_sample_log().encode("utf-8"))
+    history = HistoryStore(tmp_path / "history.sqlite3")
+
+    first = _make_analyzer()
+    first.load_rules(_build_rules_data())
+    assert not analyze_cached(first, history, trace, "rules-v1", rig="sim-1")
+
+    replay = _make_analyzer()
+    replay.load_rules(_build_rules_data())
+    counts = RuleCountAggregator()
+    replay.add_aggregator(counts)
+    # An unchanged trace is replayed without reading it.
+    with monkeypatch.context() as patch:
+        patch.setattr(history_module, "iter_file_blocks", None)
+        assert analyze_cached(replay, history, trace, "rules-v1", rig="sim-1")
+    assert replay.generate_report_json() == first.generate_report_json()
+    assert counts.counts["ERR_MISSING"] == 2
+
+    # A different ruleset is a miss, another rig's trace is a separate session.
+    history.record_run("other-trace", "rules-v1", [], rig="sim-2", session_time=0.0)
+    assert history.lookup(file_hash(trace), "rules-v2") is None
+
+    rows = history.rule_counts("ERR_MISSING", rig="sim-1")
+    assert [row.events for row in rows] == [2]
+    assert [row.events for row in history.rule_counts("ERR_MISSING")] == [0, 2]
+    weeks = history.weekly_counts("ERR_MISSING")
+    assert weeks[0] == ("1970-W01", 1, 0, 0)
+    assert (weeks[-1].sessions, weeks[-1].events) == (1, 2)
+
+    # ISO weeks: 2024-12-30 (Monday) already belongs to 2025-W01, and
+    # 2021-01-03 (Sunday) to 2020-W53.
+    history.record_run("new-year", "rules-v1", [], session_time=1735560000.0)
+    history.record_run("old-year", "rules-v1", [], session_time=1609675200.0)
+    weeks = {week.week for week in history.weekly_counts("ERR_MISSING")}
+    assert {"2025-W01", "2020-W53"} <= weeks
+
+    # Results of older code are analyzed again, and the new run replaces the
+    # old one instead of counting the session twice.
+    monkeypatch.setattr(history_module, "RESULTS_FORMAT_VERSION", 2)
+    upgraded = _make_analyzer()
+    upgraded.load_rules(_build_rules_data())
+    assert not analyze_cached(upgraded, history, trace, "rules-v1", rig="sim-1")
+    assert [row.events for row in history.rule_counts("ERR_MISSING", rig="sim-1")] == [
+        2
+    ]
+
+    # A trace that changed is parsed and stored under the hash of its content.
+    with trace.open("a", encoding="utf-8") as file:
+        file.write("9.00s Game.cpp 10: Session ended\n")
+    grown = _make_analyzer()
+    grown.load_rules(_build_rules_data())
+    assert not analyze_cached(grown, history, trace, "rules-v1", rig="sim-1")
+    assert history.lookup(file_hash(trace), results_key("rules-v1")) is not None
+    history.close()
+
+
+def test_cli_rejects_options_the_mode_cannot_serve(capsys) -> None:
+    for argv, option in (
+        (["--history", "--follow"], "--history"),
+        (["--history", "--mine-templates"], "--history"),
+        (["--batch", "logs", "--export", "events.ndjson"], "--batch"),
+        (["--batch", "logs", "--phases"], "--batch"),
+        (["--history", "--batch", "logs"], "--batch"),
+        (["--batch", "logs", "--profile-rules"], "--batch"),
+    ):
+        with pytest.raises(SystemExit):
+            cli.parse_args(argv)
+        assert f"{option} cannot be combined with" in capsys.readouterr().err
+    assert (
+        cli.parse_args(["--batch", "logs", "--fleet-stats", "f.json"]).batch == "logs"
+    )
+    assert cli.parse_args(["--history", "--phases"]).history == ""
+
+
+def test_cli_checks_export_fields_before_truncating_the_export(
+    tmp_path, capsys
+) -> None:
+    export = tmp_path / "events.ndjson"
+    export.write_text('{"rule_id": "A"}\n', encoding="utf-8")
+
+    with pytest.raises(SystemExit):
+        cli.main(["--export", str(export), "--export-fields", "rule,timestamp"])
+
+    assert "Unknown export field(s) rule" in capsys.readouterr().err
+    assert export.read_text(encoding="utf-8") == '{"rule_id": "A"}\n'
+
+
+def test_rule_profiling_counts_without_changing_matches() -> None:
+    expected = _make_analyzer()
+    expected.load_rules(_build_rules_data())
+    expected.process_log_file(_sample_log())
+
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    assert analyzer.rule_profiler is None
+    profiler = analyzer.enable_rule_profiling()
+    analyzer.process_log_file(_sample_log())
+
+    assert analyzer.generate_report_json() == expected.generate_report_json()
+    profiles = {profile.rule_id: profile for profile in profiler.report()}
+    assert profiler.messages == 4
+    assert profiles["ERR_MISSING"].hits == 2
+    assert sum(profile.hits for profile in profiles.values()) == 3
+    assert all(profile.attempts + profile.skipped > 0 for profile in profiles.values())
+
+    analyzer.disable_rule_profiling()
+    analyzer.process_log_file(_sample_log())
+    assert profiler.messages == 4
+
+
+def test_template_miner_clusters_unmatched_messages() -> None:
+    analyzer = _make_analyzer()
+    analyzer.load_rules(_build_rules_data())
+    miner = analyzer.enable_template_mining(TemplateMiner(max_samples=2))
+    lines = [f"{i}.0s ContentLoadi 1: Missing asset_{i}.dds" for i in range(3)]
+    for i in range(40):
+        lines.append(f"{i}.5s Render 7: Frame {i * 7} took {i % 5}ms on GPU{i % 2}")
+        lines.append(f"{i}.6s net.cpp 9: Packet from host-{'ab'[i % 2]} dropped")
+        if i % 4 == 0:
+            lines.append(f"{i}.7s Sound.cpp 3: Opened C:\\sfx\\engine_{i}.wav")
+    analyzer.process_stream(iter(lines))
+
+    assert len(analyzer.events) == 3
+    assert miner.messages == 90
+    top = miner.top()
+    assert [(t.template, t.occurrences) for t in top] == [
+        ("Frame <*> took <*> on <*>", 40),
+        ("Packet from <*> dropped", 40),
+        ("Opened <*>", 10),
+    ]
+    assert top[0].files == [("Render", 40)]
+    for template in top:
+        assert len(template.samples) == 2
+        for sample in template.samples:
+            assert re.search(template.regex, sample)
+
+    bounded = TemplateMiner(max_clusters=2)
+    for i in range(50):
+        bounded.add("x.cpp", f"event kind{'abc'[i % 3]} happened")
+        bounded.add("x.cpp", f"event {'xyz'[i % 3]}")
+    assert len(bounded.top(None)) == 2
+    assert bounded.messages == 100 and bounded.dropped > 0
+
+    analyzer.disable_template_mining()
+    analyzer.process_stream(iter(lines))
+    assert miner.messages == 90
+
+
+def test_rule_linter_flags_and_rejects_patterns() -> None:
+    def rule(rule_id: str, pattern: str, trigger_file: str = "x.cpp") -> dict:
+        return {
+            "id": rule_id,
+            "category": "test",
+            "description": "test",
+            "pattern": pattern,
+            "trigger_file": trigger_file,
+        }
+
+    rules = parse_rules(
+        {
+            "rules": [
+                rule("LAZY", r"Error opening MAS file (?P<mas_file>.*?)"),
+                rule("NESTED", r"Failed to load (\w+\s?)+ for:"),
+                rule("UNSCOPED", r"Frame time spike: (?P<ms>\d+)ms", ""),
+            ]
+        },
+        lint=False,
+    )
+    codes = {(issue.rule_id, issue.code) for issue in lint_rules(rules, measure=False)}
+    assert codes == {
+        ("LAZY", "TRAILING_LAZY"),
+        ("NESTED", "NESTED_QUANTIFIER"),
+        ("UNSCOPED", "UNSCOPED"),
+    }
+
+    # The nested quantifier backtracks exponentially and is over the budget;
+    # only a measured load rejects it, a plain load just warns.
+    nested = {"rules": [rule("NESTED", r"Failed to load (\w+\s?)+ for:")]}
+    with pytest.warns(RuleLintWarning):
+        assert [rule.id for rule in parse_rules(nested)] == ["NESTED"]
+    with pytest.raises(RuleLintError) as excinfo:
+        parse_rules(nested, measure=True)
+    assert [
+        issue.code for issue in excinfo.value.issues if issue.severity == "error"
+    ] == ["COST_REJECTED"]
+
+
+@pytest.mark.parametrize(
+    "parser", [None, type("ChangedParser", (), {"parse": staticmethod(len)})]
+)
+def test_linter_skips_structural_checks_without_the_regex_parser(
+    monkeypatch, parser
+) -> None:
+    # re._parser missing (other interpreters) or returning something else.
+    monkeypatch.setattr(rule_lint, "_parser", parser)
+    [nested] = parse_rules(
+        {
+            "rules": [
+                {
+                    "id": "NESTED",
+                    "category": "test",
+                    "description": "test",
+                    "pattern": r"Failed to load (\w+\s?)+ for:",
+                    "trigger_file": "ContentLoadi",
+                }
+            ]
+        },
+        lint=False,
+    )
+    assert [issue.code for issue in rule_lint.lint_rule(nested)] == [
+        "STRUCTURE_SKIPPED"
+    ]
+    assert rule_lint._leading_literal(nested.pattern) == ""
+    # Invalid patterns are still rejected through the public re module.
+    invalid = nested.model_copy(update={"pattern": "(unclosed"})
+    assert [issue.code for issue in rule_lint.lint_rule(invalid)] == ["INVALID"]
+
+
+def test_loading_rules_never_times_them(tmp_path, monkeypatch) -> None:
+    def no_timing(*args, **kwargs):
+        raise AssertionError("rules were timed while loading")
+
+    monkeypatch.setattr(rule_lint, "estimate_cost", no_timing)
+    # A cache miss and an uncached load give the same, static verdict.
+    assert load_ruleset(PATTERNS_PATH, cache_dir=tmp_path)
+    assert load_ruleset(PATTERNS_PATH, use_cache=False)
+
+
+def test_cli_exits_when_the_rules_fail_to_load(monkeypatch, capsys) -> None:
+    def rejected(*args, **kwargs):
+        raise RuleLintError([LintIssue("BAD", "COST_REJECTED", "error", "Too slow.")])
+
+    monkeypatch.setattr(cli, "load_ruleset", rejected)
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main([])
+    assert excinfo.value.code == 1
+    assert "Ruleset rejected" in capsys.readouterr().out
+
+
+def test_shipped_rules_lint_without_warnings() -> None:
+    rules = parse_rules(yaml.safe_load(PATTERNS_PATH.read_text()), lint=False)
+    assert [issue for issue in lint_rules(rules) if issue.severity != "info"] == []
+
+
+def test_adaptive_order_reorders_only_exclusive_runs() -> None:
+    def rule(rule_id: str, pattern: str, group=None) -> dict:
+        return {
+            "id": rule_id,
+            "category": "test",
+            "description": "test",
+            "pattern": pattern,
+            "trigger_file": "hw.cpp",
+            "exclusive_group": group,
+        }
+
+    rules_data = {
+        "rules": [
+            rule("RARE", r"Resetting FFB", "hw"),
+            rule("COMMON", r"reduction engaged at (?P<pct>[\d.]+)%", "hw"),
+            rule("ANY_ENGAGED", r"engaged"),
+            rule("RESTORED", r"reduction disengaged", "hw"),
+        ]
+    }
+    lines = [
+        f"{i}.00s hw.cpp 1: "
+        + ("Resetting FFB" if i % 50 == 0 else "reduction engaged at 5.0%")
+        for i in range(1, 600)
+    ]
+    lines.append("600.00s hw.cpp 1: reduction disengaged")
+
+    expected = _make_analyzer()
+    expected.adaptive_order = False
+    expected.load_rules(rules_data)
+    expected.process_log_file("\n".join(lines))
+
+    analyzer = _make_analyzer()
+    analyzer.load_rules(rules_data)
+    analyzer.process_log_file("\n".join(lines))
+
+    assert analyzer.generate_report_json() == expected.generate_report_json()
+    matcher = analyzer._matchers_by_file["hw.cpp"]
+    assert isinstance(matcher, AdaptiveRuleMatcher)
+    # ANY_ENGAGED is outside the group and splits it into two runs.
+    assert matcher.evaluation_order == ["COMMON", "RARE", "ANY_ENGAGED", "RESTORED"]
+    assert analyzer.rule_hit_counts() == {"RARE": 11, "COMMON": 588, "RESTORED": 0}
+
+    seeded = _make_analyzer()
+    seeded.load_rules(rules_data)
+    seeded.set_rule_priors({"RARE": 1, "COMMON": 5})
+    assert seeded._matchers_by_file["hw.cpp"].evaluation_order[0] == "COMMON"
+    assert seeded.rule_hit_counts()["COMMON"] == 5
+
+
+def test_linter_rejects_overlapping_exclusive_group() -> None:
+    rules = parse_rules(
+        {
+            "rules": [
+                {
+                    "id": rule_id,
+                    "category": "test",
+                    "description": "test",
+                    "pattern": pattern,
+                    "exclusive_group": "g",
+                }
+                for rule_id, pattern in (("A", r"Error opening"), ("B", r"MAS file"))
+            ]
+        },
+        lint=False,
+    )
+    issues = lint_rules(rules, corpus=['Error opening MAS file "x"'], measure=False)
+    assert [issue.code for issue in issues if issue.severity == "error"] == [
+        "EXCLUSIVE_OVERLAP"
+    ]
+
+
+# One real trace line per member of an exclusive group in patterns.yaml.
+EXCLUSIVE_GROUP_LINES = {
+    "STATE_ENTER_GAME": "12.40s game.cpp 1310: Entered Game::Enter()",
+    "STATE_ENTER_TRACK": "31.02s game.cpp 1874: Entered Track::Enter()",
+    "STATE_EXIT_GAME": "2210.55s game.cpp 1402: Entered Game::Exit()",
+    "STATE_SESSION_CHANGE": (
+        "98.10s game.cpp 2950: Changing session state from Practice1 to Qualify1"
+    ),
+    "STATE_SESSION_TYPE": "98.10s game.cpp 2962: Changing session from 1 to 5",
+    "STATE_GAME_PHASE": "95.33s game.cpp 3021: Changing state from Garage to Driving",
+    "HW_CPU_INFO": (
+        '0.31s main.cpp 512: Hardware info: CPU: "AMD Ryzen 7 7800X3D 8-Core '
+        'Processor" 16 cores'
+    ),
+    "HW_RAM_INFO": "0.31s main.cpp 518: Memory: virtual: 131072MB physical: 32768MB",
+    "HW_INPUT_DEVICE": (
+        "1.82s hwinput.cpp 640: Device - Name:Fanatec CSL DD VIPDID 0x0ed300006"
+    ),
+    "HW_STEER_RANGE_FAIL": (
+        "33.10s hwinput.cpp 2284: Failed to read steering wheel range from driver"
+    ),
+    "HW_STEER_RANGE_SET": (
+        "33.10s hwinput.cpp 2291: Setting steering wheel range to 900 degrees"
+    ),
+    "PHYS_FFB_RESET": "34.00s hwinput.cpp 1795: Resetting FFB device",
+    "PHYS_FFB_THROTTLING": (
+        "412.80s hwinput.cpp 3310: Force feedback strength safety reduction "
+        "engaged at 75.65% due to slow physics ticks (302.63Hz)."
+    ),
+    "PHYS_FFB_RESTORED": (
+        "415.20s hwinput.cpp 3318: Force feedback strength safety reduction "
+        "disengaged"
+    ),
+    "ERR_ITEM_MISSING": "20.51s ContentLoadi 377: Failed to find item: BMW_M4_GT3",
+    "ERR_AUDIO_MISSING": (
+        "21.08s ContentLoadi 902: Could not find audio file: "
+        "sounds\\cars\\LMP2 Oreca\\onboard gear up.wav"
+    ),
+    "PHYS_PARAM_DEPRECATED": (
+        "21.40s ContentLoadi 1180: Car with Oreca_07 uses RWDragBase. "
+        "Please update it to use RWDragBaseV2"
+    ),
+    "PHYS_PARAM_LOAD_FAIL": (
+        "21.40s ContentLoadi 1192: Failed to load 3 double values for: "
+        "FWLiftHeightPlus"
+    ),
+}
+
+
+def test_exclusive_groups_of_shipped_rules_do_not_overlap() -> None:
+    rules = load_ruleset(PATTERNS_PATH, use_cache=False)
+    grouped = {rule.id: rule for rule in rules if rule.exclusive_group}
+    assert set(EXCLUSIVE_GROUP_LINES) == set(grouped)
+
+    messages = {
+        rule_id: line.partition(": ")[2]
+        for rule_id, line in EXCLUSIVE_GROUP_LINES.items()
+    }
+    assert not [
+        issue
+        for issue in lint_rules(rules, corpus=list(messages.values()), measure=False)
+        if issue.code == "EXCLUSIVE_OVERLAP"
+    ]
+
+    # The analyzer stops at the first matching rule, so an overlap would go
+    # unnoticed there; every member regex is checked on its own instead.
+    for rule_id, message in messages.items():
+        group = grouped[rule_id].exclusive_group
+        matching = [
+            rule.id
+            for rule in grouped.values()
+            if rule.exclusive_group == group and rule.regex.search(message)
+        ]
+        assert matching == [rule_id]
+
+    analyzer = _make_analyzer()
+    analyzer.add_rules(rules)
+    analyzer.process_log_file("\n".join(EXCLUSIVE_GROUP_LINES.values()))
+    assert [event["rule_id"] for event in analyzer.generate_report_json()] == list(
+        EXCLUSIVE_GROUP_LINES
+    )
+
+
+def test_greedy_asset_captures_keep_the_whole_name() -> None:
+    rules = {rule.id: rule for rule in load_ruleset(PATTERNS_PATH, use_cache=False)}
+    mas_file = '"Installed\\Vehicles\\Oreca_07\\1.31\\Oreca 07 Upgrades.mas"'
+    audio_file = "sounds\\cars\\LMP2 Oreca\\onboard gear up.wav"
+
+    match = rules["ERR_MAS_FILE_MISSING"].regex.search(
+        f"Error opening MAS file {mas_file}"
+    )
+    assert match is not None and match.groupdict() == {"mas_file": mas_file}
+
+    analyzer = _make_analyzer()
+    analyzer.add_rules(list(rules.values()))
+    analyzer.process_log_file(EXCLUSIVE_GROUP_LINES["ERR_AUDIO_MISSING"])
+    [event] = analyzer.generate_report_json()
+    assert event["captured_data"] == {"audio_file": audio_file}
+
+
+async def _http(port: int, request: bytes) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    if b"Transfer-Encoding: chunked" in head:
+        data = b""
+        while True:
+            size, _, body = body.partition(b"\r\n")
+            if int(size, 16) == 0:
+                break
+            data += body[: int(size, 16)]
+            body = body[int(size, 16) + 2 :]
+        body = data
+    return status, head.decode(), body
+
+
+def test_daemon_cli_serves_the_bundled_rules() -> None:
+    args = serve.parse_args(["--port", "0", "--trace-dir", "traces"])
+
+    assert args.patterns.is_file() and args.port == 0
+    assert args.trace_dir == Path("traces") and args.unix is None
+
+
+def test_daemon_streams_results_and_applies_backpressure(tmp_path) -> None:
+    trace = tmp_path / "trace.txt"
+    lines = [
+        (
+            f"{i}.00s ContentLoadi {i}: Missing asset_{i}.dds\r\n"
+            if i % 3
+            else f"{i}.00s Render {i}: Warning: spike {i}\n"
+        )
+        for i in range(300)
+    ]
+    payload = "".join(lines).encode("utf-8")
+    trace.write_bytes(payload)
+
+    sequential = _make_analyzer()
+    sequential.load_rules(_build_rules_data())
+    sequential.process_stream(trace)
+    expected = sequential.generate_report_json()
+
+    rules = parse_rules(_build_rules_data())
+
+    async def scenario() -> None:
+        daemon = AnalysisDaemon(
+            rules,
+            workers=2,
+            max_pending=2,
+            chunk_size=1024,
+            spool_dir=tmp_path,
+            max_body_size=len(payload),
+            trace_dir=tmp_path,
+        )
+        server = await daemon.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        upload = (
+            b"POST /analyze HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(payload)
+            + payload
+        )
+        by_path = f"POST /analyze?path={trace} HTTP/1.1\r\n\r\n".encode()
+        try:
+            responses = await asyncio.gather(_http(port, upload), _http(port, by_path))
+            for status, _, body in responses:
+                assert status == 200
+                *events, summary = [json.loads(line) for line in body.splitlines()]
+                assert events == expected
+                assert summary["done"] and summary["events"] == len(expected)
+
+            outside = tmp_path / ".." / "outside.txt"
+            request = f"POST /analyze?path={outside} HTTP/1.1\r\n\r\n".encode()
+            status, _, _ = await _http(port, request)
+            assert status == 403
+            request = b"POST /analyze HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (
+                len(payload) + 1
+            )
+            status, _, _ = await _http(port, request)
+            assert status == 413
+
+            # Two submissions stall while uploading; the third is turned away.
+            stalled = []
+            for _ in range(2):
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /analyze HTTP/1.1\r\nContent-Length: 10\r\n\r\n")
+                await writer.drain()
+                stalled.append(writer)
+            while daemon.pending < 2:
+                await asyncio.sleep(0.01)
+            status, head, _ = await _http(port, upload)
+            assert status == 503 and "Retry-After: 1" in head
+
+            for writer in stalled:
+                writer.close()
+            while daemon.pending:
+                await asyncio.sleep(0.01)
+            status, _, body = await _http(port, b"GET /health HTTP/1.1\r\n\r\n")
+            health = json.loads(body)
+            assert status == 200
+            assert health["completed"] == 2 and health["rejected"] == 1
+        finally:
+            await daemon.close()
+
+    asyncio.run(scenario())
+    assert not [p for p in tmp_path.iterdir() if p != trace]
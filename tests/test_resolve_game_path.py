@@ -0,0 +1,174 @@
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from _helper import resolve_game_path
+from _helper.vdf import find_key, parse_vdf
+
+
+@pytest.fixture
+def drives(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """
+    Fake drive roots D and E under tmp_path, no Program Files and an empty cache.
+    """
+    for drive in ("D", "E"):
+        (tmp_path / drive).mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("PROGRAMFILES", raising=False)
+    monkeypatch.delenv("PROGRAMFILES(X86)", raising=False)
+    monkeypatch.setenv("LMU_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(
+        resolve_game_path,
+        "_iter_drive_roots",
+        lambda: [tmp_path / "D", tmp_path / "E"],
+    )
+    resolve_game_path.resolve_path.cache_clear()
+    yield tmp_path
+    resolve_game_path.resolve_path.cache_clear()
+
+
+def test_discovery_skips_slow_drives_and_caches_the_root(
+    drives: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    game_root = drives / "E" / "SteamLibrary" / "steamapps" / "common"
+    game_root = game_root / "Le Mans Ultimate"
+    game_root.mkdir(parents=True)
+
+    probed = []
+    is_dir = resolve_game_path._is_dir
+
+    def slow_on_d(path: Path) -> bool:
+        probed.append(path)
+        if drives / "D" in path.parents:
+            time.sleep(5)  # A sleeping disk.
+        return is_dir(path)
+
+    monkeypatch.setattr(resolve_game_path, "_is_dir", slow_on_d)
+    monkeypatch.setattr(resolve_game_path, "PROBE_TIMEOUT", 0.2)
+    drive_scans = []
+    iter_drive_roots = resolve_game_path._iter_drive_roots
+
+    def count_drive_scans() -> list:
+        drive_scans.append(True)
+        return list(iter_drive_roots())
+
+    monkeypatch.setattr(resolve_game_path, "_iter_drive_roots", count_drive_scans)
+
+    start = time.monotonic()
+    assert resolve_game_path.resolve_path() == game_root
+    assert time.monotonic() - start < 2
+    # The drives are enumerated once per search.
+    assert len(drive_scans) == 1
+    # Memoized within the process.
+    probed.clear()
+    assert resolve_game_path.resolve_path() == game_root
+    assert probed == []
+
+    # A new process only confirms the stored root.
+    resolve_game_path.resolve_path.cache_clear()
+    assert resolve_game_path.resolve_path() == game_root
+    assert probed == [game_root]
+
+    # A root that no longer exists is dropped and the drives searched again.
+    game_root.rmdir()
+    resolve_game_path.resolve_path.cache_clear()
+    with pytest.raises(FileNotFoundError):
+        resolve_game_path.resolve_path()
+    assert not (drives / "cache" / resolve_game_path.GAME_ROOT_CACHE_FILE).exists()
+
+
+def _write_library_folders(steam_root: Path, libraries: dict) -> None:
+    lines = ['"libraryfolders"', "{"]
+    for index, (path, apps) in enumerate(libraries.items()):
+        lines += [f'\t"{index}"', "\t{", f'\t\t"path"\t\t"{path}"', '\t\t"apps"\t\t{']
+        lines += [f'\t\t\t"{app_id}"\t\t"1024"' for app_id in apps]
+        lines += ["\t\t}", "\t}"]
+    lines.append("}")
+    (steam_root / "steamapps").mkdir(parents=True, exist_ok=True)
+    (steam_root / "steamapps" / "libraryfolders.vdf").write_text(
+        "\n".join(lines), encoding="utf-8"
+    )
+
+
+@pytest.fixture
+def steam(drives: Path) -> Path:
+    """
+    A Steam install on D with a second library on E that has LMU installed
+    under the directory named in its app manifest.
+    """
+    steam_root = drives / "D" / "Steam"
+    library = drives / "E" / "Library"
+    _write_library_folders(
+        steam_root,
+        {steam_root: ["228980"], library: ["228980", resolve_game_path.LMU_APP_ID]},
+    )
+    manifest = library / "steamapps" / f"appmanifest_{resolve_game_path.LMU_APP_ID}.acf"
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text(
+        '"AppState"\n{\n'
+        f'\t"appid"\t\t"{resolve_game_path.LMU_APP_ID}"\n'
+        '\t"name"\t\t"Le Mans Ultimate"\n'
+        '\t"installdir"\t\t"LMU"\n}\n',
+        encoding="utf-8",
+    )
+    (library / "steamapps" / "common" / "LMU").mkdir(parents=True)
+    return drives
+
+
+def test_parse_vdf_tokenizes_keyvalues() -> None:
+    text = r"""
+    // Written by Steam
+    "LibraryFolders"
+    {
+        "TimeNextStatsReport"   "1700000000"
+        "1"     "D:\\SteamLibrary"   [$WIN32]
+        bare    { "quote" "say \"hi\"\n" "1" "replaced" }
+        bare    { "1" "last" }
+    }
+    """
+    data = parse_vdf(text)
+
+    assert data == {
+        "LibraryFolders": {
+            "TimeNextStatsReport": "1700000000",
+            "1": "D:\\SteamLibrary",
+            "bare": {"1": "last"},
+        }
+    }
+    assert find_key(data, "libraryfolders", "BARE", "1") == "last"
+    assert find_key(data, "libraryfolders", "missing") is None
+    for broken in ['"a" {', '"a"', "}", '{ "a" "b" }', '"a" "b']:
+        with pytest.raises(ValueError):
+            parse_vdf(broken)
+
+
+def test_discovery_looks_up_the_library_by_app_id(
+    steam: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A leftover directory in a library Steam does not list LMU in.
+    (steam / "D" / "Steam" / "steamapps" / "common" / "Le Mans Ultimate").mkdir(
+        parents=True
+    )
+
+    def no_probing(path: Path) -> bool:
+        raise AssertionError(f"Probed {path} instead of using the index.")
+
+    monkeypatch.setattr(resolve_game_path, "_is_dir", no_probing)
+    assert resolve_game_path.resolve_path() == (
+        steam / "E" / "Library" / "steamapps" / "common" / "LMU"
+    )
+
+
+def test_old_library_folders_fall_back_to_probing(steam: Path) -> None:
+    steam_root = steam / "D" / "Steam"
+    (steam_root / "steamapps" / "libraryfolders.vdf").write_text(
+        f'"LibraryFolders"\n{{\n\t"TimeNextStatsReport"\t"0"\n'
+        f'\t"1"\t"{steam / "F"}"\n}}\n',
+        encoding="utf-8",
+    )
+    game_dir = steam / "F" / "steamapps" / "common" / "Le Mans Ultimate"
+    game_dir.mkdir(parents=True)
+
+    assert resolve_game_path.resolve_path() == game_dir
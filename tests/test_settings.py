@@ -1,6 +1,8 @@
+import sys
+
 import pytest
 from pathlib import Path
-from settings.settings import Settings
+from settings.settings import Settings, get_settings
 
 
 def test_settings_valid_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -49,3 +51,68 @@ def test_settings_invalid_file_type(
 
     with pytest.raises(ValueError):
         Settings()  # type: ignore[call-arg]
+
+
+def test_settings_accepts_compressed_trace(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Tests if Settings accepts a compressed trace archive.
+    """
+    fake_trace = tmp_path / "trace.txt.gz"
+    fake_trace.write_bytes(b"")
+    fake_direct_input = tmp_path / "direct_input.json"
+    fake_direct_input.write_text("{}")
+    monkeypatch.setenv("TRACE_PATH", str(fake_trace))
+    monkeypatch.setenv("DIRECT_INPUT", str(fake_direct_input))
+
+    assert Settings().trace_path == fake_trace  # type: ignore[call-arg]
+
+
+def test_get_settings_is_lazy_and_cached(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Tests if the settings are loaded once, on the first call.
+    """
+    fake_trace = tmp_path / "trace.txt"
+    fake_trace.write_text("test content")
+    fake_direct_input = tmp_path / "direct_input.json"
+    fake_direct_input.write_text("{}")
+    monkeypatch.setenv("TRACE_PATH", str(fake_trace))
+    monkeypatch.setenv("DIRECT_INPUT", str(fake_direct_input))
+
+    get_settings.cache_clear()
+    try:
+        first = get_settings()
+        assert first.trace_path == fake_trace
+        assert get_settings() is first
+    finally:
+        get_settings.cache_clear()
+
+
+def test_deprecated_settings_alias_returns_the_instance(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Tests if `from settings.settings import settings` still yields the loaded
+    settings, while `from settings import settings` is the submodule.
+    """
+    fake_trace = tmp_path / "trace.txt"
+    fake_trace.write_text("test content")
+    fake_direct_input = tmp_path / "direct_input.json"
+    fake_direct_input.write_text("{}")
+    monkeypatch.setenv("TRACE_PATH", str(fake_trace))
+    monkeypatch.setenv("DIRECT_INPUT", str(fake_direct_input))
+
+    get_settings.cache_clear()
+    try:
+        with pytest.warns(DeprecationWarning):
+            from settings.settings import settings
+        assert settings is get_settings()
+
+        from settings import settings as submodule
+
+        assert submodule is sys.modules["settings.settings"]
+    finally:
+        get_settings.cache_clear()